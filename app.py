@@ -8,12 +8,32 @@ import pandas as pd
 from gtts import gTTS
 import os
 import tempfile
-from datetime import datetime
 import threading
 import time
 import subprocess
 import json
 import traceback
+import hashlib
+
+from features import N_FEATURES, features_do_frame
+from backends import carregar_lote_validacao, escolher_backend
+from classificador_maos import (CAMINHO_INFO_DUAS_MAOS, CAMINHO_MODELO_DUAS_MAOS,
+                                ClassificadorPorMaos, combinar_model_info)
+from cache_modelos import CacheModelos, caminhos_escola
+from cache_predicoes import CachePredicoes
+from sombra import CAMINHO_MODELO_CANDIDATO, AvaliadorSombra, carregar_candidato, validar_caminho
+from vizinhos import (CAMINHO_INDICE, CapturaAmostras, ClassificadorComVizinhos, IndiceVizinhos,
+                      combinar_info_vizinhos, incorporar_amostras)
+from cascata import encontrar_cascata
+from modelo_servido import escolher_arquivos
+from sessoes import SESSAO_ANONIMA, ConfiguracoesUsuarios, GerenciadorSessoes, validar_configuracoes
+from fontes_video import criar_fonte
+from roi import DetectorMao
+from correcao import Lexico, corrigir_texto
+from decodificador import DecodificadorBeam, ModeloLinguagem
+from metricas import REGISTRO
+from tracing import ProfilerAmostragem, Rastreador
+from saude import MonitorSaude
 
 # Tente importar o auth de forma mais segura
 try:
@@ -63,23 +83,194 @@ login_manager.login_message = 'Por favor, faça login para acessar esta página.
 login_manager.login_message_category = 'info'
 
 # Variáveis globais para compartilhamento entre threads
+camera = None
 camera_frame = None
 camera_lock = threading.Lock()
 camera_running = False
 camera_initialized = False
-camera_index = 0
+# None: dispositivo da sondagem em cache (camera_dispositivo.json)
+camera_index = None
+# Negociação da webcam (formato vazio: MJPG, depois YUYV)
+camera_fps = float(os.environ.get('TRADULIBRAS_CAMERA_FPS', '30'))
+camera_format = os.environ.get('TRADULIBRAS_CAMERA_FORMATO') or None
+# Detecção só no recorte em volta da mão do frame anterior (roi.py) e
+# largura do frame inteiro entregue ao MediaPipe (vazio: resolução da câmera)
+hand_roi = os.environ.get('TRADULIBRAS_ROI', '0') == '1'
+detection_width = int(os.environ.get('TRADULIBRAS_LARGURA_DETECCAO', '0')) or None
+hand_detector = None
+# Modo duas mãos: MediaPipe com max_num_hands=2 e, com duas mãos no frame,
+# o classificador de 126 features (modelos/modelo_libras_duas_maos.pkl).
+# Custa mais por frame: o MediaPipe procura a segunda mão a cada frame
+two_hands = os.environ.get('TRADULIBRAS_DUAS_MAOS', '0') == '1'
+two_hand_model_loaded = False
+# Modelos do modo de features invariante (invariantes.py) recebem mãos
+# canonizadas: uma mão esquerda é espelhada antes das features
+canonical_hands = False
+# Número de frames publicados em camera_frame e último frame enviado a cada
+# cliente do /video_feed (profundidade da fila e frames descartados)
+camera_frame_seq = 0
+stream_clients = {}
+# Fonte de frames: webcam, vídeo em loop, sintética ou landmarks gravados
+video_source = os.environ.get('TRADULIBRAS_FONTE', 'camera')
 
 # Variáveis do modelo (serão inicializadas depois)
 model = None
 model_info = {'classes': []}
+# Modelo candidato avaliado em sombra em uma fração dos frames e, opcionalmente,
+# servido a uma fração das sessões (sombra.py); resumos em sombra.jsonl
+candidate_path = os.environ.get('TRADULIBRAS_CANDIDATO') or None
+candidate_info_path = os.environ.get('TRADULIBRAS_CANDIDATO_INFO') or None
+shadow_fraction = float(os.environ.get('TRADULIBRAS_SOMBRA_FRACAO', '0.1'))
+ab_fraction = float(os.environ.get('TRADULIBRAS_AB_FRACAO', '0'))
+# Vocabulário instantâneo (vizinhos.py): amostras adicionadas pelo admin em
+# /admin/vocabulario servidas por k vizinhos junto do modelo principal até
+# serem incorporadas a um modelo re-treinado (raio 0: aprendido das amostras)
+try:
+    neighbour_index = IndiceVizinhos.carregar(
+        CAMINHO_INDICE,
+        capacidade=int(os.environ.get('TRADULIBRAS_VIZINHOS_CAPACIDADE', '2000')),
+        por_classe=int(os.environ.get('TRADULIBRAS_VIZINHOS_POR_CLASSE', '200')))
+except Exception as e:
+    print(f"❌ Erro ao carregar índice de vizinhos: {e}")
+    neighbour_index = IndiceVizinhos(caminho=CAMINHO_INDICE)
+neighbour_radius = float(os.environ.get('TRADULIBRAS_VIZINHOS_RAIO', '0')) or None
+neighbour_capture = None
+neighbour_fold = {'rodando': False, 'inicio': None, 'resultado': None, 'erro': None}
+# Backend de inferência (backends.py): 'auto' mede os disponíveis na
+# inicialização e fica com o mais rápido que concorda com o sklearn
+backend_choice = os.environ.get('TRADULIBRAS_BACKEND', 'auto')
+inference_backend = {'backend': 'sklearn', 'latencia_ms': None, 'lote': None, 'candidatos': []}
 
-# Global variables for text formation
-current_letter = ""
-formed_text = ""
-corrected_text = ""
-last_prediction_time = datetime.now()
+# Intervalo padrão entre letras confirmadas (cada usuário pode ajustar o seu)
 prediction_cooldown = 2.5  # segundos
-letter_detected = False
+# Limiar de confiança das classes sem limiar aprendido no treino
+# (model_info['limiares']); abaixo dele a predição vira "sem letra"
+confidence_threshold = float(os.environ.get('TRADULIBRAS_LIMIAR', '0.4'))
+
+# Léxico da correção incremental do texto (só a palavra aberta é reprocessada)
+try:
+    lexico = Lexico.carregar()
+    print(f"📚 Léxico carregado: {len(lexico)} palavras")
+except Exception as e:
+    print(f"❌ Erro ao carregar léxico: {e}")
+    lexico = Lexico()
+# Modelo de linguagem do decodificador por beam search (o decodificador de
+# cada sessão é criado em load_model, pois depende das classes do modelo)
+modelo_linguagem = ModeloLinguagem(lexico)
+
+# Letra, cooldown e texto por sessão (visitantes sem login compartilham uma)
+user_settings = ConfiguracoesUsuarios('configuracoes_usuarios.json', prediction_cooldown)
+# Predições memoizadas por vetor de features quantizado (passo 0 desliga)
+prediction_cache = CachePredicoes(
+    passo=float(os.environ.get('TRADULIBRAS_CACHE_PASSO', '0.1')),
+    capacidade=int(os.environ.get('TRADULIBRAS_CACHE_CAPACIDADE', '4096')))
+# Modelos por escola (modelos/escolas/<escola>/), carregados sob demanda
+# para usuários com "escola" em users.json e descartados em LRU
+tenant_models = CacheModelos(
+    orcamento_mb=float(os.environ.get('TRADULIBRAS_MODELOS_MB', '512')),
+    preparar=lambda tenant_model: prepare_model(tenant_model))
+sessions = GerenciadorSessoes(lexico, user_settings, cache=prediction_cache, modelos=tenant_models)
+
+# Linhas do tempo dos últimos frames do camera_worker e profiler sob demanda
+tracer = Rastreador(int(os.environ.get('TRADULIBRAS_TRACE_FRAMES', '300')))
+profiler = ProfilerAmostragem()
+
+# Autoteste do modelo em cache (roda ao carregar o modelo e a cada
+# TRADULIBRAS_AUTOTESTE_S segundos; /status e as sondas só leem o cache)
+health = MonitorSaude()
+HEALTH_CHECK_INTERVAL = float(os.environ.get('TRADULIBRAS_AUTOTESTE_S', '300'))
+# Instante (time.monotonic) do último frame publicado pelo camera_worker
+last_frame_at = None
+# Sem frames novos há mais que isso, o servidor não está pronto
+FRAME_STALE_SECONDS = 5.0
+
+# Cache dos áudios do gTTS (um arquivo por texto, os mais antigos são removidos)
+TTS_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'tradulibras_tts')
+TTS_CACHE_MAX_FILES = 200
+
+# =========================================
+# Métricas (/metrics, formato Prometheus)
+# =========================================
+metric_frames = REGISTRO.contador(
+    'tradulibras_frames_capturados_total', 'Frames lidos da fonte de video')
+metric_read_failures = REGISTRO.contador(
+    'tradulibras_falhas_leitura_total', 'Leituras da fonte de video sem frame')
+metric_capture_fps = REGISTRO.medidor(
+    'tradulibras_captura_fps', 'FPS de captura medido no ultimo segundo')
+# Rótulo max_maos separa o custo por frame do modo duas mãos
+metric_mediapipe = REGISTRO.histograma(
+    'tradulibras_mediapipe_segundos', 'Tempo do MediaPipe Hands por frame',
+    {'max_maos': '2' if two_hands else '1'})
+metric_hands = [REGISTRO.contador(
+    'tradulibras_frames_por_maos_total', 'Frames por numero de maos detectadas', {'maos': str(n)})
+    for n in range(3)]
+metric_classifier = REGISTRO.histograma(
+    'tradulibras_classificador_segundos', 'Tempo de features e classificador por predicao')
+metric_frame_to_letter = REGISTRO.histograma(
+    'tradulibras_frame_ate_letra_segundos', 'Da leitura do frame a letra registrada no texto')
+metric_letters = REGISTRO.contador(
+    'tradulibras_letras_confirmadas_total', 'Letras registradas no texto')
+metric_rejected = REGISTRO.contador(
+    'tradulibras_sem_letra_total', 'Predicoes abaixo do limiar de confianca')
+metric_encode = REGISTRO.histograma(
+    'tradulibras_codificacao_jpeg_segundos', 'Tempo de codificacao JPEG por frame enviado')
+metric_dropped = REGISTRO.contador(
+    'tradulibras_frames_descartados_total', 'Frames substituidos antes de chegar a um cliente do stream')
+metric_video_clients = REGISTRO.medidor(
+    'tradulibras_clientes_stream', 'Clientes conectados por stream', {'stream': 'video'})
+metric_event_clients = REGISTRO.medidor(
+    'tradulibras_clientes_stream', 'Clientes conectados por stream', {'stream': 'eventos'})
+REGISTRO.medidor(
+    'tradulibras_fila_profundidade', 'Itens aguardando o consumidor mais atrasado', {'fila': 'frames'},
+    funcao=lambda: max((camera_frame_seq - s for s in list(stream_clients.values())), default=0))
+metric_tts_hits = REGISTRO.contador(
+    'tradulibras_tts_cache_total', 'Consultas ao cache de audio do TTS', {'resultado': 'acerto'})
+metric_tts_misses = REGISTRO.contador(
+    'tradulibras_tts_cache_total', 'Consultas ao cache de audio do TTS', {'resultado': 'falha'})
+REGISTRO.contador(
+    'tradulibras_cache_predicoes_total', 'Consultas ao cache de predicoes', {'resultado': 'acerto'},
+    funcao=lambda: prediction_cache.acertos)
+REGISTRO.contador(
+    'tradulibras_cache_predicoes_total', 'Consultas ao cache de predicoes', {'resultado': 'falha'},
+    funcao=lambda: prediction_cache.falhas)
+REGISTRO.medidor(
+    'tradulibras_cache_predicoes_entradas', 'Vetores guardados no cache de predicoes',
+    funcao=lambda: prediction_cache.estatisticas()['entradas'])
+REGISTRO.contador(
+    'tradulibras_cascata_frames_total', 'Frames classificados por estagio da cascata', {'estagio': 'rapido'},
+    funcao=lambda: getattr(encontrar_cascata(model), 'frames_rapido', 0))
+REGISTRO.contador(
+    'tradulibras_cascata_frames_total', 'Frames classificados por estagio da cascata', {'estagio': 'completo'},
+    funcao=lambda: getattr(encontrar_cascata(model), 'frames_completo', 0))
+REGISTRO.medidor(
+    'tradulibras_modelos_escola_mb', 'Memoria estimada dos modelos de escola carregados',
+    funcao=lambda: tenant_models.estatisticas()['uso_mb'])
+REGISTRO.contador(
+    'tradulibras_modelos_escola_total', 'Eventos do cache de modelos de escola', {'evento': 'carga'},
+    funcao=lambda: tenant_models.cargas)
+REGISTRO.contador(
+    'tradulibras_modelos_escola_total', 'Eventos do cache de modelos de escola', {'evento': 'descarte'},
+    funcao=lambda: tenant_models.descartes)
+REGISTRO.medidor(
+    'tradulibras_fila_profundidade', 'Itens aguardando o consumidor mais atrasado', {'fila': 'sombra'},
+    funcao=lambda: sessions.sombra.fila.qsize() if sessions.sombra is not None else 0)
+REGISTRO.medidor(
+    'tradulibras_sombra_concordancia', 'Concordancia entre candidato e principal nos frames amostrados',
+    funcao=lambda: ((sessions.sombra.estatisticas()['concordancia'] or 0.0)
+                    if sessions.sombra is not None else 0.0))
+REGISTRO.medidor(
+    'tradulibras_sombra_diferenca_latencia_ms', 'Latencia p50 do candidato menos a do principal',
+    funcao=lambda: ((sessions.sombra.estatisticas()['diferenca_latencia_p50_ms'] or 0.0)
+                    if sessions.sombra is not None else 0.0))
+REGISTRO.medidor(
+    'tradulibras_vizinhos_amostras', 'Amostras no indice de vizinhos do vocabulario instantaneo',
+    funcao=lambda: len(neighbour_index))
+REGISTRO.contador(
+    'tradulibras_vizinhos_frames_total', 'Frames classificados pelo indice de vizinhos',
+    funcao=lambda: neighbour_index.atendidas)
+REGISTRO.medidor(
+    'tradulibras_tts_cache_taxa_acerto', 'Fracao das falas servidas do cache',
+    funcao=lambda: metric_tts_hits.valor / max(metric_tts_hits.valor + metric_tts_misses.valor, 1))
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -101,22 +292,15 @@ mp_draw = mp.solutions.drawing_utils
 
 def load_model():
     """Carregar o modelo de forma segura"""
-    global model, model_info
-    
+    global model, model_info, two_hand_model_loaded, canonical_hands
+
+    # O modelo compacto (destilacao.py) é servido por padrão quando existe e
+    # foi destilado da floresta atual; TRADULIBRAS_MODELO=completo força a
+    # floresta original e TRADULIBRAS_MODELO=cascata serve a cascata do cascata.py
+    selected_model_path, selected_info_path = escolher_arquivos()
+
     # Load the trained model (procurando em múltiplos caminhos e ignorando arquivos vazios)
     try:
-        import os
-        candidate_model_paths = [
-            'modelos/modelo_libras_expandido.pkl',
-            'modelo_libras_expandido.pkl',
-            'modelos/modelo_libras.pkl',
-            'modelo_libras.pkl'
-        ]
-        selected_model_path = None
-        for path in candidate_model_paths:
-            if os.path.exists(path) and os.path.getsize(path) > 0:
-                selected_model_path = path
-                break
         if selected_model_path is None:
             raise FileNotFoundError("Nenhum arquivo de modelo válido encontrado (todos ausentes ou vazios)")
 
@@ -135,18 +319,6 @@ def load_model():
 
     # Load model info (mesma estratégia de múltiplos caminhos)
     try:
-        import os
-        candidate_info_paths = [
-            'modelos/modelo_info_expandido.pkl',
-            'modelo_info_expandido.pkl',
-            'modelos/modelo_info.pkl',
-            'modelo_info.pkl'
-        ]
-        selected_info_path = None
-        for path in candidate_info_paths:
-            if os.path.exists(path) and os.path.getsize(path) > 0:
-                selected_info_path = path
-                break
         if selected_info_path is None:
             raise FileNotFoundError("Nenhum arquivo de info de modelo válido encontrado (ausente ou vazio)")
 
@@ -159,24 +331,205 @@ def load_model():
         print(f"❌ Erro ao carregar info do modelo: {e}")
         model_info = {'classes': []}
 
-def find_working_camera():
-    """Encontrar uma câmera que funcione"""
-    print("🔍 Procurando câmera disponível...")
-    for i in range(3):  # Testar índices 0, 1, 2
+    canonical_hands = bool(model_info.get('canonizar_mao'))
+    if canonical_hands:
+        print("🪞 Modelo de features invariantes: mãos esquerdas são espelhadas")
+
+    if model is not None and hasattr(model, 'predict_proba'):
+        select_inference_backend()
+
+    two_hand_model_loaded = False
+    if two_hands:
+        load_two_hand_model()
+    apply_neighbour_index()
+
+    health.atualizar(model)
+    if model_info.get('limiares'):
+        print(f"🎚️ Limiares de confiança por classe: {len(model_info['limiares'])} classes")
+    else:
+        print(f"🎚️ Sem limiares aprendidos: limiar único de {confidence_threshold:.2f}")
+    sessions.definir_modelo(model, model_info.get('limiares'), confidence_threshold,
+                            decoder_factory(), decoder_factory)
+
+    # Candidato em sombra/A-B desde a inicialização (TRADULIBRAS_CANDIDATO)
+    if candidate_path and sessions.sombra is None:
         try:
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                ret, frame = cap.read()
-                if ret and frame is not None:
-                    print(f"✅ Câmera encontrada no índice {i}")
-                    cap.release()
-                    return i
-                cap.release()
+            start_shadow(candidate_path, candidate_info_path, shadow_fraction, ab_fraction)
         except Exception as e:
-            print(f"❌ Erro com câmera {i}: {e}")
-    
-    print("❌ Nenhuma câmera funcionando encontrada")
-    return 0  # Retornar 0 como padrão mesmo que não funcione
+            print(f"❌ Erro ao carregar o candidato {candidate_path}: {e} (servindo sem sombra)")
+
+def start_shadow(path, info_path=None, fraction=0.1, session_fraction=0.0):
+    """Liga a avaliação em sombra (e o A/B) de um modelo candidato"""
+    stop_shadow()
+    candidate, candidate_info = carregar_candidato(path, info_path)
+    backend, candidate = prepare_model(candidate)
+    shadow = AvaliadorSombra(candidate, candidate_info, fraction, session_fraction,
+                             origem=f"{path} ({backend})", backend=backend)
+    sessions.definir_sombra(shadow)
+    print(f"🕶️ Candidato em sombra: {path} ({backend}), {fraction:.0%} dos frames, "
+          f"{session_fraction:.0%} das sessões no A/B")
+    return shadow
+
+def stop_shadow():
+    """Desliga a sombra/A-B; sessões do A/B voltam ao modelo principal"""
+    shadow = sessions.sombra
+    if shadow is None:
+        return None
+    sessions.definir_sombra(None)
+    shadow.parar()
+    return shadow.estatisticas()
+
+def prepare_model(candidate):
+    """Backend de inferência de um modelo de escola (mesmos critérios do global)"""
+    n_features = int(getattr(candidate, 'n_features_in_', None) or N_FEATURES)
+    lote, _ = carregar_lote_validacao(n_features=n_features)
+    nome, preditor, _ = escolher_backend(
+        candidate, lote, None if backend_choice == 'auto' else [backend_choice])
+    return nome, preditor
+
+def select_inference_backend():
+    """Troca o modelo pelo backend mais rápido que reproduz as predições do sklearn"""
+    global model, inference_backend
+
+    try:
+        n_features = int(getattr(model, 'n_features_in_', None) or N_FEATURES)
+        lote, origem = carregar_lote_validacao(n_features=n_features)
+        nome, model, relatorio = escolher_backend(
+            model, lote, None if backend_choice == 'auto' else [backend_choice])
+        latencia = next((e['latencia_ms'] for e in relatorio if e['backend'] == nome), None)
+        inference_backend = {'backend': nome, 'latencia_ms': latencia, 'lote': origem,
+                             'candidatos': relatorio}
+        print(f"⚙️ Backend de inferência: {nome}"
+              + (f" ({latencia:.3f} ms por amostra)" if latencia is not None else ""))
+        for entrada in relatorio:
+            if entrada['erro']:
+                print(f"   {entrada['backend']}: {entrada['erro']}")
+    except Exception as e:
+        print(f"❌ Erro ao escolher backend de inferência: {e}")
+
+def load_two_hand_model():
+    """Combina o modelo de duas mãos com o de uma mão (ClassificadorPorMaos)"""
+    global model, model_info, two_hand_model_loaded
+
+    if model is None or not hasattr(model, 'predict_proba'):
+        print("⚠️  Modo duas mãos requer um modelo de uma mão com predict_proba")
+        return
+    try:
+        with open(CAMINHO_MODELO_DUAS_MAOS, 'rb') as f:
+            two_hand_model = pickle.load(f)
+        two_hand_info = {}
+        if os.path.exists(CAMINHO_INFO_DUAS_MAOS):
+            with open(CAMINHO_INFO_DUAS_MAOS, 'rb') as f:
+                two_hand_info = pickle.load(f)
+        model = ClassificadorPorMaos(model, two_hand_model)
+        model_info = combinar_model_info(model, model_info, two_hand_info)
+        two_hand_model_loaded = True
+        print(f"✅ Modelo de duas mãos carregado de: {CAMINHO_MODELO_DUAS_MAOS}")
+        print(f"🤲 Classes de duas mãos: {[str(c) for c in two_hand_model.classes_]}")
+    except Exception as e:
+        print(f"❌ Erro ao carregar modelo de duas mãos: {e}")
+        print("⚠️  Frames com duas mãos usam o classificador de uma mão")
+
+def apply_neighbour_index():
+    """Envolve o modelo com o índice de vizinhos (ou o desembrulha com o índice vazio)"""
+    global model, model_info
+
+    base = model.principal if isinstance(model, ClassificadorComVizinhos) else model
+    if base is None or not hasattr(base, 'predict_proba'):
+        return
+    if len(neighbour_index):
+        model = ClassificadorComVizinhos(base, neighbour_index, neighbour_radius)
+        model_info = combinar_info_vizinhos(model, model_info)
+        novas = sorted(set(neighbour_index.classes()) - {str(c) for c in base.classes_})
+        print(f"🗂️ Índice de vizinhos: {len(neighbour_index)} amostras"
+              + (f", letras novas: {', '.join(novas)}" if novas else ""))
+    else:
+        model = base
+
+def refresh_neighbour_model():
+    """Serve as amostras atuais do índice em todas as sessões"""
+    apply_neighbour_index()
+    health.atualizar(model)
+    sessions.definir_modelo(model, model_info.get('limiares'), confidence_threshold,
+                            decoder_factory(), decoder_factory)
+
+def finish_neighbour_capture(capture):
+    """Amostras capturadas do camera_worker entram no índice"""
+    global neighbour_capture
+
+    try:
+        neighbour_index.adicionar(capture.letra, capture.amostras)
+        print(f"✅ {len(capture.amostras)} amostras de {capture.letra} no índice de vizinhos")
+        refresh_neighbour_model()
+    except Exception as e:
+        print(f"❌ Erro ao adicionar amostras capturadas: {e}")
+    finally:
+        if neighbour_capture is capture:
+            neighbour_capture = None
+
+def start_neighbour_fold():
+    """Incorpora as amostras do índice a um modelo re-treinado em segundo plano"""
+    if neighbour_fold['rodando']:
+        return False
+    neighbour_fold.update(rodando=True, inicio=time.time(), erro=None)
+
+    def _fold():
+        try:
+            summary = incorporar_amostras(neighbour_index)
+            if summary is not None:
+                load_model()
+                base = model.principal if isinstance(model, ClassificadorComVizinhos) else model
+                known = {str(c) for c in getattr(base, 'classes_', [])}
+                # Só saem do índice as letras que o modelo servido agora reconhece
+                # (o compacto desatualizado já é trocado pela floresta no load_model;
+                # com uma cascata desatualizada, o índice continua servindo)
+                _, letters, ids = neighbour_index.amostras()
+                folded_ids = set(neighbour_index.incorporadas)
+                summary['removidas'] = neighbour_index.remover(ids=[
+                    i for i, letra in zip(ids.tolist(), letters.tolist())
+                    if i in folded_ids and letra in known])
+                missing = sorted(set(summary['letras']) - known)
+                if missing:
+                    print(f"⚠️  Modelo servido sem as letras incorporadas {', '.join(missing)} "
+                          "(cascata desatualizada? rode cascata.py)")
+                refresh_neighbour_model()
+            neighbour_fold['resultado'] = summary
+        except Exception as e:
+            print(f"❌ Erro ao incorporar amostras do índice: {e}")
+            neighbour_fold['erro'] = str(e)
+        finally:
+            neighbour_fold['rodando'] = False
+
+    threading.Thread(target=_fold, name='incorporar_vizinhos', daemon=True).start()
+    return True
+
+def decoder_factory(decoder_model=None, decoder_info=None):
+    """Função que cria um decodificador para as classes do modelo carregado
+
+    Sem argumentos usa o modelo global; modelos de escola passam os seus.
+    """
+    if decoder_model is None:
+        decoder_model, decoder_info = model, model_info
+    if decoder_model is None or not (hasattr(decoder_model, 'predict_proba')
+                                     and hasattr(decoder_model, 'classes_')):
+        print("⚠️  Modelo sem predict_proba: correção apenas pelo léxico")
+        return None
+
+    classes = [str(c) for c in decoder_model.classes_]
+    # A matriz só vale se foi medida com as mesmas classes, na mesma ordem
+    confusao = None
+    if (decoder_info.get('confusion_matrix')
+            and [str(c) for c in decoder_info.get('classes', [])] == classes):
+        confusao = decoder_info['confusion_matrix']
+    else:
+        print("⚠️  model_info sem matriz de confusão: decodificador assume classificador sem confusões")
+    return lambda: DecodificadorBeam(classes, modelo_linguagem, confusao)
+
+def current_session():
+    """Sessão de reconhecimento do usuário logado (ou a anônima)"""
+    if current_user.is_authenticated:
+        return sessions.obter(current_user.get_id(), getattr(current_user, 'escola', None))
+    return sessions.obter(SESSAO_ANONIMA)
 
 # =========================================
 # Inicialização do MediaPipe ajustada
@@ -190,114 +543,119 @@ hands = mp_hands.Hands(
 )
 mp_draw = mp.solutions.drawing_utils
 
-# =========================================
-# Função de processamento de landmarks melhorada
-# =========================================
-def process_landmarks(hand_landmarks):
-    """Processar landmarks normalizando pela mão e mantendo 63 features"""
-    try:
-        if not hand_landmarks or len(hand_landmarks.landmark) != 21:
-            return None
-        
-        # Ponto de referência (pulso)
-        p0 = hand_landmarks.landmark[0]
-        points = []
-        for lm in hand_landmarks.landmark:
-            points.extend([lm.x - p0.x, lm.y - p0.y, lm.z - p0.z])
-        
-        # Normalizar pelo tamanho da mão
-        points_np = np.array(points).reshape(-1, 3)
-        max_dist = np.max(np.linalg.norm(points_np, axis=1))
-        if max_dist > 0:
-            points_np /= max_dist
-        
-        points_flat = points_np.flatten()
-        if len(points_flat) == 63:
-            return points_flat
-        else:
-            print(f"⚠️ Número incorreto de pontos após normalização: {len(points_flat)}")
-            return None
-        
-    except Exception as e:
-        print(f"❌ Erro no processamento de landmarks: {e}")
-        return None
-
 # =========================================
 # Loop da câmera ajustado para cooldown confiável
 # =========================================
 def init_camera():
-    global camera_running, camera_initialized, camera_index, last_prediction_time, prediction_cooldown
-
-    if 'last_prediction_time' not in globals():
-        last_prediction_time = datetime.now()
-    if 'prediction_cooldown' not in globals():
-        prediction_cooldown = 1.2  # menor cooldown, detecta letras mais rápido
+    global camera_running, camera_initialized
 
     def camera_worker():
-        global camera, camera_running, camera_frame, current_letter, letter_detected, last_prediction_time
+        global camera, camera_running, camera_frame, camera_frame_seq, last_frame_at, hand_detector
 
         hands_instance = mp_hands.Hands(
             static_image_mode=False,
-            max_num_hands=1,
+            max_num_hands=2 if two_hands else 1,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
         )
+        if two_hands and hand_roi:
+            print("⚠️  Recorte ROI desligado no modo duas mãos")
+        hand_detector = DetectorMao(hands_instance, roi=hand_roi and not two_hands,
+                                    largura_deteccao=detection_width)
 
-        camera = cv2.VideoCapture(camera_index)
-        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        try:
+            camera = criar_fonte(video_source, camera_index, fps=camera_fps, formato=camera_format)
+        except Exception as e:
+            print(f"❌ Erro ao abrir a fonte de vídeo '{video_source}': {e}")
+            hands_instance.close()
+            camera_running = False
+            return
+        print(f"📹 Fonte de vídeo: {video_source}")
+
+        fps_window_start = time.perf_counter()
+        fps_window_frames = 0
 
         while camera_running:
-            success, frame = camera.read()
+            timeline = tracer.iniciar_frame()
+            with timeline.span('leitura'):
+                success, frame = camera.ler()
             if not success or frame is None:
+                metric_read_failures.inc()
                 time.sleep(0.05)
                 continue
+            frame_time = time.perf_counter()
+            metric_frames.inc()
+            fps_window_frames += 1
+            if frame_time - fps_window_start >= 1.0:
+                metric_capture_fps.set(fps_window_frames / (frame_time - fps_window_start))
+                fps_window_start = frame_time
+                fps_window_frames = 0
 
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands_instance.process(rgb_frame)
-
-            if results and results.multi_hand_landmarks:
-                hand_landmarks = results.multi_hand_landmarks[0]
-                landmarks = process_landmarks(hand_landmarks)
-
-                if landmarks is not None and model is not None:
-                    now = datetime.now()
-                    elapsed = (now - last_prediction_time).total_seconds()
-                    if elapsed >= prediction_cooldown:
-                        try:
-                            landmarks_np = np.array(landmarks).reshape(1, -1)
-                            prediction = model.predict(landmarks_np)
-                            current_letter = prediction[0]
-                            letter_detected = True
-                            last_prediction_time = now
-                        except Exception as e:
-                            print(f"❌ Erro na predição: {e}")
-                            current_letter = ""
-                            letter_detected = False
-                    else:
-                        letter_detected = False
-                else:
-                    current_letter = ""
-                    letter_detected = False
+            if camera.espelhar:
+                with timeline.span('flip'):
+                    frame = cv2.flip(frame, 1)
 
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            hand_sides = None
+            if camera.fornece_landmarks:
+                hand_landmarks = camera.landmarks_atuais()
+                detected_hands = [hand_landmarks] if hand_landmarks is not None else []
             else:
-                current_letter = ""
-                letter_detected = False
+                with timeline.span('cvtColor'):
+                    detector_input = hand_detector.preparar(frame)
+                with timeline.span('mediapipe'), metric_mediapipe.cronometrar():
+                    hand_detector.detectar(detector_input)
+                detected_hands = hand_detector.maos
+                if canonical_hands:
+                    hand_sides = hand_detector.lados
+            metric_hands[min(len(detected_hands), 2)].inc()
+
+            landmarks = None
+            if detected_hands:
+                with timeline.span('features'):
+                    landmarks = features_do_frame(detected_hands, two_hand_model_loaded,
+                                                  hand_sides)
+
+            # Captura de amostras para o índice de vizinhos (/admin/vocabulario)
+            capture = neighbour_capture
+            if capture is not None and landmarks is not None and capture.oferecer(landmarks):
+                threading.Thread(target=finish_neighbour_capture, args=(capture,),
+                                 name='captura_vizinhos', daemon=True).start()
+
+            # Classificação (no máximo uma por frame) e texto de cada sessão ativa
+            inicio_classificacao = time.perf_counter()
+            with timeline.span('classificador'):
+                classified, rejections, letters = sessions.processar(landmarks)
+            if classified:
+                metric_classifier.observar(time.perf_counter() - inicio_classificacao)
+            if rejections:
+                metric_rejected.inc(rejections)
+            if letters:
+                metric_letters.inc(letters)
+                metric_frame_to_letter.observar(time.perf_counter() - frame_time)
+
+            if detected_hands:
+                with timeline.span('desenho'):
+                    for hand_landmarks in detected_hands:
+                        mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+            with timeline.span('publicacao'):
+                with camera_lock:
+                    camera_frame = frame
+                    camera_frame_seq += 1
+                last_frame_at = time.monotonic()
 
-            with camera_lock:
-                camera_frame = frame
+            timeline.anotar(maos=len(detected_hands), classificou=classified, letras=letters)
+            tracer.finalizar(timeline)
 
             time.sleep(0.02)
 
-        camera.release()
+        camera.liberar()
         hands_instance.close()
 
     if not camera_running:
         camera_running = True
         camera_initialized = True
-        threading.Thread(target=camera_worker, daemon=True).start()
+        threading.Thread(target=camera_worker, name='camera_worker', daemon=True).start()
 
 
 
@@ -313,8 +671,20 @@ def generate_frames():
     while not camera_initialized and (time.time() - wait_start) < 10:
         time.sleep(0.1)
     
+    client_id = object()
+    metric_video_clients.inc()
+    try:
+        yield from _stream_frames(client_id)
+    finally:
+        stream_clients.pop(client_id, None)
+        metric_video_clients.dec()
+
+def _stream_frames(client_id):
+    """Laço do /video_feed de um cliente"""
+    last_seq = None
     while camera_running:
         with camera_lock:
+            seq = camera_frame_seq
             if camera_frame is not None:
                 frame = camera_frame.copy()
             else:
@@ -322,9 +692,15 @@ def generate_frames():
                 frame = np.zeros((480, 640, 3), dtype=np.uint8)
                 cv2.putText(frame, "Camera não disponivel", (50, 240), 
                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        # Frames publicados entre duas leituras deste cliente nunca serão enviados
+        if last_seq is not None and seq > last_seq + 1:
+            metric_dropped.inc(seq - last_seq - 1)
+        last_seq = seq
+        stream_clients[client_id] = seq
         
         # Codificar frame
-        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        with metric_encode.cronometrar():
+            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
         if ret:
             frame_bytes = buffer.tobytes()
             yield (b'--frame\r\n'
@@ -423,20 +799,18 @@ def video_feed():
 
 @app.route('/get_text')
 def get_text():
-    global formed_text, corrected_text, current_letter
-    return jsonify({
-        'current_letter': current_letter,
-        'formed_text': formed_text,
-        'corrected_text': corrected_text
-    })
+    session_state = current_session()
+    with session_state.lock:
+        return jsonify({
+            'current_letter': str(session_state.letra_atual),
+            'formed_text': session_state.texto,
+            'corrected_text': session_state.texto_corrigido,
+            'text_confidence': session_state.confianca_texto
+        })
 
 @app.route('/clear_text', methods=['POST'])
 def clear_text():
-    global formed_text, corrected_text, current_letter, letter_detected
-    formed_text = ""
-    corrected_text = ""
-    current_letter = ""
-    letter_detected = False
+    current_session().limpar_texto()
     return jsonify({
         'status': 'success',
         'message': 'Texto limpo com sucesso'
@@ -444,115 +818,377 @@ def clear_text():
 
 @app.route('/letra_atual')
 def letra_atual():
-    global current_letter, letter_detected
-    letra_para_retornar = current_letter if current_letter and current_letter.strip() else "-"
-    
+    return jsonify(current_session().estado())
+
+@app.route('/eventos')
+def eventos():
+    """Server-Sent Events com o estado do reconhecimento a cada mudança"""
+    # A sessão é resolvida aqui: o gerador roda fora do contexto da requisição
+    session_state = current_session()
+
+    def gerar():
+        ultimo = None
+        ultimo_envio = time.time()
+        metric_event_clients.inc()
+        try:
+            while True:
+                session_state.tocar()
+                estado = json.dumps(session_state.estado())
+                if estado != ultimo:
+                    ultimo = estado
+                    ultimo_envio = time.time()
+                    yield f"data: {estado}\n\n"
+                elif time.time() - ultimo_envio > 15:
+                    # Comentário SSE mantém a conexão aberta através de proxies
+                    ultimo_envio = time.time()
+                    yield ": keep-alive\n\n"
+                time.sleep(0.05)
+        finally:
+            metric_event_clients.dec()
+
+    return Response(gerar(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/corrigir_texto', methods=['POST'])
+def corrigir_texto_route():
+    """Corrige um texto avulso com o mesmo léxico do reconhecimento"""
+    data = request.get_json(silent=True) or {}
+    texto = data.get('texto', '')
     return jsonify({
-        'letra': letra_para_retornar,
-        'detectada': letter_detected
+        'texto': texto,
+        'texto_corrigido': corrigir_texto(texto, lexico)
     })
 
+def synthesize_speech(texto, lang='pt-br', slow=False):
+    """Arquivo MP3 do gTTS para o texto, reaproveitando falas já sintetizadas"""
+    os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+    normalized = f"{lang}|{int(bool(slow))}|{' '.join(texto.split()).casefold()}"
+    key = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+    cached_file = os.path.join(TTS_CACHE_DIR, f'{key}.mp3')
+    if os.path.exists(cached_file):
+        metric_tts_hits.inc()
+        os.utime(cached_file)  # mais recente na ordem de remoção
+        return cached_file
+
+    metric_tts_misses.inc()
+    tts = gTTS(text=texto, lang=lang, slow=slow)
+    partial_file = f'{cached_file}.{threading.get_ident()}.tmp'
+    tts.save(partial_file)
+    os.replace(partial_file, cached_file)
+
+    cached = sorted((os.path.join(TTS_CACHE_DIR, n) for n in os.listdir(TTS_CACHE_DIR)
+                     if n.endswith('.mp3')), key=os.path.getmtime)
+    for old_file in cached[:-TTS_CACHE_MAX_FILES]:
+        try:
+            os.remove(old_file)
+        except OSError:
+            pass
+    return cached_file
+
 @app.route('/falar_texto', methods=['POST'])
 def falar_texto():
-    global corrected_text, formed_text
+    session_state = current_session()
     
-    data = request.get_json()
+    data = request.get_json(silent=True)
     texto = data.get('texto', '') if data else ''
     
     if not texto:
-        texto = corrected_text if corrected_text else formed_text
+        texto = session_state.texto_corrigido or session_state.texto
     
     if not texto or texto.strip() == "":
         return jsonify({'error': 'Nenhum texto para falar'})
     
     try:
-        tts = gTTS(text=texto, lang='pt-br', slow=False)
-        temp_dir = tempfile.gettempdir()
-        timestamp = int(time.time())
-        temp_file = os.path.join(temp_dir, f'speech_{timestamp}.mp3')
-        tts.save(temp_file)
-        
+        settings = session_state.configuracoes
+        temp_file = synthesize_speech(texto, settings['voice'], settings['slow'])
+        return send_file(temp_file, mimetype='audio/mpeg', as_attachment=False)
+    except Exception as e:
+        return jsonify({'error': f'Erro na síntese de voz: {str(e)}'})
+
+@app.route('/configuracoes')
+@login_required
+def configuracoes():
+    return render_template('configuracoes.html')
+
+def settings_response(settings):
+    """Configurações do usuário com o intervalo também em letras por minuto"""
+    return dict(settings, letras_por_minuto=round(60.0 / settings['cooldown'], 1))
+
+@app.route('/carregar_configuracoes')
+@login_required
+def carregar_configuracoes():
+    return jsonify(settings_response(current_session().configuracoes))
+
+@app.route('/salvar_configuracoes', methods=['POST'])
+@login_required
+def salvar_configuracoes():
+    """Grava as configurações do usuário e aplica na sessão dele na hora"""
+    data = request.get_json(silent=True) or {}
+    try:
+        settings = sessions.salvar_configuracoes(current_user.get_id(), data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    return jsonify(dict(settings_response(settings), status='ok'))
+
+@app.route('/testar_voz', methods=['POST'])
+@login_required
+def testar_voz():
+    """Fala uma frase de exemplo com a voz escolhida (sem gravar)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        settings = validar_configuracoes(data, current_session().configuracoes)
+        temp_file = synthesize_speech('Olá! Esta é a voz do TraduLibras.',
+                                      settings['voice'], settings['slow'])
         return send_file(temp_file, mimetype='audio/mpeg', as_attachment=False)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erro na síntese de voz: {str(e)}'})
 
 @app.route('/status')
 def status():
-    """Rota para verificar o status da aplicação"""
+    """Diagnóstico detalhado (autoteste do modelo vem do cache)"""
     try:
-        model_loaded = model is not None
-        model_classes = []
-        model_features = 0
-        
-        if model_loaded:
-            if hasattr(model, 'classes_'):
-                model_classes = list(model.classes_)
-            if hasattr(model, 'n_features_in_'):
-                model_features = model.n_features_in_
-        
-        # Testar predição simples
-        test_prediction = None
-        if model_loaded and model_features > 0:
-            try:
-                dummy_data = np.zeros((1, model_features))
-                test_prediction = model.predict(dummy_data)[0]
-            except Exception as e:
-                test_prediction = f"Erro: {e}"
+        self_test = health.resultado()
+        session_state = current_session()
+        cascade = encontrar_cascata(model)
+        test_prediction = self_test['prediction'] if self_test['ok'] else f"Erro: {self_test['error']}"
         
         return jsonify({
             'status': 'online',
-            'model_loaded': model_loaded,
-            'model_classes': model_classes,
-            'model_features': model_features,
+            'model_loaded': model is not None,
+            'model_classes': self_test['model_classes'],
+            'model_features': self_test['model_features'],
             'test_prediction': test_prediction,
+            'self_test_ok': self_test['ok'],
+            'self_test_at': self_test['checked_at'],
             'model_info_classes': model_info.get('classes', []),
             'camera_available': camera_running,
             'camera_initialized': camera_initialized,
-            'current_letter': current_letter,
-            'formed_text': formed_text,
-            'prediction_cooldown': prediction_cooldown
+            'current_letter': str(session_state.letra_atual),
+            'formed_text': session_state.texto,
+            'prediction_cooldown': session_state.reconhecedor.cooldown,
+            'confidence_threshold': confidence_threshold,
+            'two_hand_model_loaded': two_hand_model_loaded,
+            'inference_backend': inference_backend,
+            'school': session_state.escola,
+            'school_model_loaded': (session_state.escola is not None
+                                    and session_state.modelo_proprio is not None),
+            'ab_candidate': (sessions.sombra is not None
+                             and session_state.modelo_proprio is sessions.sombra.modelo),
+            'prediction_cache': prediction_cache.estatisticas(),
+            'cascade': cascade.estatisticas() if cascade else None,
+            'neighbour_index': {k: v for k, v in neighbour_index.estatisticas().items()
+                                if k in ('amostras', 'classes', 'atendidas')},
+            'class_thresholds': session_state.reconhecedor.limiares,
+            'active_sessions': len(sessions.ativas())
         })
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)})
 
+def frame_age():
+    """Segundos desde o último frame publicado (None se nenhum)"""
+    return None if last_frame_at is None else time.monotonic() - last_frame_at
+
+@app.route('/health/live')
+def health_live():
+    """Sonda de vida: o processo responde (sem tocar no modelo nem na câmera)"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/health/ready')
+def health_ready():
+    """Sonda de prontidão: modelo carregado, autoteste ok e frames chegando"""
+    self_test = health.resultado()
+    age = frame_age()
+    checks = {
+        'model': self_test['ok'],
+        'camera': camera_running and age is not None and age < FRAME_STALE_SECONDS,
+    }
+    ready = all(checks.values())
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'checks': checks,
+        'frame_age_s': age,
+        'self_test_at': self_test['checked_at'],
+    }), 200 if ready else 503
+
+@app.route('/metrics')
+def metrics():
+    """Métricas do pipeline no formato de texto do Prometheus"""
+    return Response(REGISTRO.exportar(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def _admin_required_json():
+    """Resposta 403 para rotas de diagnóstico quando o usuário não é admin"""
+    if not (hasattr(current_user, 'is_admin') and current_user.is_admin()):
+        return jsonify({'error': 'Acesso negado: apenas administradores'}), 403
+    return None
+
+@app.route('/admin/trace')
+@login_required
+def admin_trace():
+    """Linhas do tempo dos últimos frames (Chrome Trace; ?formato=resumo para médias)"""
+    denied = _admin_required_json()
+    if denied:
+        return denied
+    if request.args.get('formato') == 'resumo':
+        return jsonify(tracer.resumo())
+    filename = f"tradulibras-trace-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    return Response(json.dumps(tracer.exportar_chrome()), mimetype='application/json',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/admin/modelos', methods=['GET', 'POST'])
+@login_required
+def admin_models():
+    """Modelos por escola: estatísticas, escola de um usuário e descarga do cache"""
+    denied = _admin_required_json()
+    if denied:
+        return denied
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        action = data.get('acao')
+        school = data.get('escola') or None
+        if action == 'atribuir':
+            if school is not None:
+                try:
+                    caminhos_escola(school)
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+            if not user_manager.update_user(data.get('usuario'), escola=school):
+                return jsonify({'error': f"Usuário desconhecido: {data.get('usuario')}"}), 404
+            return jsonify({'usuario': data.get('usuario'), 'escola': school})
+        if action == 'descarregar':
+            return jsonify({'escola': school, 'descarregado': tenant_models.descarregar(school)})
+        return jsonify({'error': f'Ação desconhecida: {action}'}), 400
+    return jsonify(dict(tenant_models.estatisticas(),
+                        disponiveis=tenant_models.escolas_disponiveis()))
+
+@app.route('/admin/sombra', methods=['GET', 'POST'])
+@login_required
+def admin_shadow():
+    """Avaliação em sombra/A-B do candidato: estatísticas, iniciar e parar"""
+    denied = _admin_required_json()
+    if denied:
+        return denied
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        action = data.get('acao')
+        if action == 'iniciar':
+            try:
+                fraction = float(data.get('fracao', shadow_fraction))
+                session_fraction = float(data.get('fracao_sessoes', ab_fraction))
+                if not (0 <= fraction <= 1 and 0 <= session_fraction <= 1):
+                    raise ValueError("Frações devem ficar entre 0 e 1")
+                # Só pickles de modelos/ (mesma regra dos modelos de escola)
+                path = validar_caminho(data.get('modelo') or CAMINHO_MODELO_CANDIDATO)
+                info_path = validar_caminho(data['info']) if data.get('info') else None
+                shadow = start_shadow(path, info_path, fraction, session_fraction)
+            except Exception as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify(shadow.estatisticas())
+        if action == 'parar':
+            return jsonify({'parado': True, 'resumo': stop_shadow()})
+        return jsonify({'error': f'Ação desconhecida: {action}'}), 400
+    shadow = sessions.sombra
+    return jsonify(shadow.estatisticas() if shadow is not None else {'ativo': False})
+
+@app.route('/admin/vocabulario', methods=['GET', 'POST'])
+@login_required
+def admin_vocabulary():
+    """Vocabulário instantâneo: amostras do índice de vizinhos, captura e incorporação"""
+    global neighbour_capture
+
+    denied = _admin_required_json()
+    if denied:
+        return denied
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        action = data.get('acao')
+        letter = str(data.get('letra') or '').strip()
+        if action == 'adicionar':
+            try:
+                added = neighbour_index.adicionar(letter, data.get('amostras') or [])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            refresh_neighbour_model()
+            return jsonify({'letra': letter, 'adicionadas': added, 'indice': neighbour_index.estatisticas()})
+        if action == 'capturar':
+            if not letter:
+                return jsonify({'error': 'Letra vazia'}), 400
+            if not camera_running:
+                return jsonify({'error': 'Câmera parada'}), 409
+            try:
+                quantity = int(data.get('quantidade', 30))
+                if not 1 <= quantity <= neighbour_index.por_classe:
+                    raise ValueError(f"Quantidade deve ficar entre 1 e {neighbour_index.por_classe}")
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+            neighbour_capture = CapturaAmostras(letter, quantity)
+            return jsonify({'captura': neighbour_capture.estado()}), 202
+        if action == 'remover':
+            removed = neighbour_index.remover(letra=letter)
+            refresh_neighbour_model()
+            return jsonify({'letra': letter, 'removidas': removed})
+        if action == 'incorporar':
+            if not start_neighbour_fold():
+                return jsonify({'error': 'Incorporação já em andamento'}), 409
+            return jsonify({'incorporacao': neighbour_fold}), 202
+        return jsonify({'error': f'Ação desconhecida: {action}'}), 400
+    capture = neighbour_capture
+    return jsonify({'indice': neighbour_index.estatisticas(),
+                    'captura': capture.estado() if capture is not None else None,
+                    'incorporacao': neighbour_fold})
+
+@app.route('/admin/profiler', methods=['GET', 'POST'])
+@login_required
+def admin_profiler():
+    """Liga/desliga o profiler por amostragem; GET devolve as pilhas (collapsed)"""
+    denied = _admin_required_json()
+    if denied:
+        return denied
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        action = data.get('acao', 'iniciar')
+        if action == 'iniciar':
+            try:
+                interval_ms = float(data.get('intervalo_ms', 5))
+                duration_s = data.get('duracao_s')
+                duration_s = float(duration_s) if duration_s is not None else None
+                # NaN falha nas duas comparações
+                if not 1 <= interval_ms <= 1000:
+                    raise ValueError("intervalo_ms deve ficar entre 1 e 1000")
+                if duration_s is not None and not 0 < duration_s <= 3600:
+                    raise ValueError("duracao_s deve ficar entre 0 e 3600 segundos")
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+            started = profiler.iniciar(interval_ms / 1000, duration_s)
+            return jsonify(dict(profiler.estado(), iniciado=started))
+        if action == 'parar':
+            stopped = profiler.parar()
+            return jsonify(dict(profiler.estado(), parado=stopped))
+        return jsonify({'error': f'Ação desconhecida: {action}'}), 400
+    if request.args.get('formato') == 'estado':
+        return jsonify(profiler.estado())
+    return Response(profiler.collapsed(), mimetype='text/plain; charset=utf-8')
+
 @app.route('/test_prediction', methods=['GET'])
 def test_prediction():
-    """Testar se o modelo está funcionando"""
-    if model is None:
-        return jsonify({'error': 'Modelo não carregado'})
-    
-    try:
-        # Criar dados de teste simples
-        if hasattr(model, 'n_features_in_'):
-            features = model.n_features_in_
-        else:
-            features = 63  # Valor padrão
-            
-        test_data = np.zeros((1, features))
-        
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(test_data)
-            confidence = np.max(probabilities)
-            predicted_class_idx = np.argmax(probabilities)
-            
-            if hasattr(model, 'classes_'):
-                predicted_letter = model.classes_[predicted_class_idx]
-            else:
-                predicted_letter = "Classe " + str(predicted_class_idx)
-        else:
-            prediction = model.predict(test_data)
-            predicted_letter = prediction[0]
-            confidence = 0.5
-        
-        return jsonify({
-            'prediction': predicted_letter,
-            'confidence': float(confidence),
-            'features_used': features,
-            'model_has_classes': hasattr(model, 'classes_'),
-            'model_has_proba': hasattr(model, 'predict_proba')
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)})
+    """Resultado do autoteste do modelo (?atualizar=1 roda o teste de novo)"""
+    if request.args.get('atualizar') == '1':
+        self_test = health.atualizar(model)
+    else:
+        self_test = health.resultado()
+
+    if not self_test['ok']:
+        return jsonify({'error': self_test['error'], 'checked_at': self_test['checked_at']})
+    return jsonify({
+        'prediction': self_test['prediction'],
+        'confidence': self_test['confidence'],
+        'features_used': self_test['model_features'],
+        'model_has_classes': self_test['model_has_classes'],
+        'model_has_proba': self_test['model_has_proba'],
+        'latency_ms': self_test['latencia_ms'],
+        'checked_at': self_test['checked_at']
+    })
 
 @app.route('/restart_camera', methods=['POST'])
 @login_required
@@ -569,16 +1205,23 @@ def restart_camera():
 @app.route('/debug')
 def debug():
     """Página de debug completa"""
+    session_state = current_session()
     return jsonify({
         'camera_running': camera_running,
         'camera_initialized': camera_initialized,
         'camera_frame_available': camera_frame is not None,
         'camera_index': camera_index,
+        'capture': camera.estatisticas() if camera is not None else {},
+        'hand_detection': hand_detector.estatisticas() if hand_detector is not None else {},
+        'two_hands': two_hands,
+        'two_hand_model_loaded': two_hand_model_loaded,
+        'canonical_hands': canonical_hands,
         'model_loaded': model is not None,
         'model_classes': model_info.get('classes', []),
-        'current_letter': current_letter,
-        'formed_text': formed_text,
-        'corrected_text': corrected_text,
+        'current_letter': str(session_state.letra_atual),
+        'formed_text': session_state.texto,
+        'corrected_text': session_state.texto_corrigido,
+        'active_sessions': [s.chave for s in sessions.ativas()],
         'mediapipe_initialized': hands is not None
     })
 
@@ -641,6 +1284,9 @@ if __name__ == '__main__':
     print(f"   http://{local_ip}:5000")
     print("=" * 50)
     
+    # Repetir o autoteste do modelo em segundo plano
+    health.iniciar_agendamento(lambda: model, HEALTH_CHECK_INTERVAL)
+    
     # Iniciar câmera
     print("📹 Inicializando câmera...")
     init_camera()
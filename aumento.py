@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Aumento de dados de landmarks no treinamento do TraduLibras
+
+Com poucas amostras por letra (30 no treinar_letras_simples.py, as
+capturadas por tecla no expandir_vocabulario.py) a floresta decora as
+poses exatas da coleta. O aumento gera, em NumPy e para o lote inteiro,
+versões de cada amostra com a mão girada (no plano da imagem e um pouco
+em profundidade), esticada por eixo (proporções da mão e perspectiva),
+com ruído nos pontos e, opcionalmente, espelhada (mão esquerda). O
+resultado é normalizado de novo como no servidor (normalizar_pontos):
+escalar a mão inteira não mudaria nada depois dessa normalização.
+
+As cópias nunca se acumulam: `rodadas` entrega uma versão do dataset por
+vez, sempre no mesmo buffer, e `ajustar` treina uma parte das árvores da
+floresta em cada uma (warm_start). A memória é a do dataset base mais
+uma cópia, qualquer que seja o multiplicador; com a mesma semente o
+modelo é o mesmo.
+
+Uso (mesma floresta com e sem aumento, treinando com poucas amostras por letra):
+    python aumento.py --dataset gestos_libras.csv --multiplicador 5 --por-classe 30
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble._forest import BaseForest
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from dataset import DATASET_PADRAO, DatasetStore
+from features import N_FEATURES, N_PONTOS, espelhar_pontos, normalizar_pontos
+
+
+def _rotacoes(rolagem, arfagem, guinada):
+    """Matrizes (N, 3, 3) de rotação em z (plano da imagem), x e y (profundidade)"""
+    matrizes = []
+    for angulos, (i, j) in ((rolagem, (0, 1)), (arfagem, (1, 2)), (guinada, (0, 2))):
+        m = np.zeros((len(angulos), 3, 3), dtype=np.float32)
+        m[:, [0, 1, 2], [0, 1, 2]] = 1
+        cos, sen = np.cos(angulos), np.sin(angulos)
+        m[:, i, i], m[:, i, j], m[:, j, i], m[:, j, j] = cos, -sen, sen, cos
+        matrizes.append(m)
+    return matrizes[0] @ matrizes[1] @ matrizes[2]
+
+
+class AumentoLandmarks:
+    """Gera versões aumentadas de vetores de 63 features normalizados
+
+    `multiplicador` é o número de versões do dataset vistas no treino,
+    contando a original (1 desliga o aumento). Ângulos em graus;
+    `estiramento` e `ruido` são frações do tamanho da mão; `espelhar` é
+    a probabilidade de uma amostra virar mão esquerda.
+    """
+
+    def __init__(self, multiplicador=5, rotacao=15.0, inclinacao=10.0, estiramento=0.1,
+                 ruido=0.01, espelhar=0.5, semente=42, tamanho_lote=4096):
+        self.multiplicador = int(multiplicador)
+        self.rotacao = float(rotacao)
+        self.inclinacao = float(inclinacao)
+        self.estiramento = float(estiramento)
+        self.ruido = float(ruido)
+        self.espelhar = float(espelhar)
+        self.semente = semente
+        self.tamanho_lote = int(tamanho_lote)
+
+    def parametros(self):
+        """Configuração do aumento (vai para o model_info)"""
+        return {'multiplicador': self.multiplicador, 'rotacao': self.rotacao,
+                'inclinacao': self.inclinacao, 'estiramento': self.estiramento,
+                'ruido': self.ruido, 'espelhar': self.espelhar, 'semente': self.semente}
+
+    def aumentar(self, X, rng, saida=None):
+        """Uma versão aumentada de X (N x 63), gravada em `saida` se dado"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != N_FEATURES:
+            raise ValueError(f"Aumento só para vetores de uma mão ({N_FEATURES} features)")
+        saida = np.empty_like(X) if saida is None else saida
+        # Em lotes: os temporários da rotação não crescem com o dataset
+        for inicio in range(0, len(X), self.tamanho_lote):
+            lote = X[inicio:inicio + self.tamanho_lote]
+            n = len(lote)
+            pontos = lote.reshape(n, N_PONTOS, 3)
+            graus = np.deg2rad(rng.uniform(-1, 1, (n, 3)) *
+                               [self.rotacao, self.inclinacao, self.inclinacao]).astype(np.float32)
+            pontos = pontos @ _rotacoes(graus[:, 0], graus[:, 1], graus[:, 2]).transpose(0, 2, 1)
+            pontos *= rng.uniform(1 - self.estiramento, 1 + self.estiramento,
+                                  (n, 1, 3)).astype(np.float32)
+            pontos += rng.normal(0, self.ruido, pontos.shape).astype(np.float32)
+            espelhadas = rng.random(n) < self.espelhar
+            pontos[espelhadas, :, 0] *= -1
+            saida[inicio:inicio + n] = normalizar_pontos(pontos)
+        return saida
+
+    def rodadas(self, X, y, n_rodadas=None):
+        """Gera (X, y) do dataset original e de `n_rodadas - 1` versões aumentadas
+
+        Todas as versões aumentadas usam o mesmo buffer: consuma cada
+        rodada antes de pedir a próxima.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rng = np.random.default_rng(self.semente)
+        yield X, y
+        buffer = np.empty_like(X)
+        for _ in range((n_rodadas or self.multiplicador) - 1):
+            yield self.aumentar(X, rng, buffer), y
+
+
+def _floresta(estimador):
+    return estimador.steps[-1][1] if isinstance(estimador, Pipeline) else estimador
+
+
+def usa_aumento(estimador, aumento):
+    """Se ajustar() aumenta os dados deste estimador"""
+    return (aumento is not None and aumento.multiplicador > 1
+            and isinstance(_floresta(estimador), BaseForest))
+
+
+def ajustar(estimador, X, y, aumento=None):
+    """Treina o estimador, com aumento se for uma floresta
+
+    Cada rodada do aumento treina uma fatia das árvores (warm_start),
+    então o estimador final é uma floresta comum com n_estimators
+    árvores. Pipelines cuja última etapa é uma floresta (modo de
+    features invariante) também servem. Os demais estimadores precisariam
+    de todas as cópias de uma vez e são treinados no dataset base.
+    """
+    if not usa_aumento(estimador, aumento):
+        return estimador.fit(X, y)
+    floresta = _floresta(estimador)
+
+    total = floresta.n_estimators
+    n_rodadas = min(aumento.multiplicador, total)
+    try:
+        for i, (X_rodada, y_rodada) in enumerate(aumento.rodadas(X, y, n_rodadas), 1):
+            # A primeira rodada recomeça do zero (re-treino de uma floresta já ajustada)
+            floresta.set_params(n_estimators=total * i // n_rodadas, warm_start=i > 1)
+            estimador.fit(X_rodada, y_rodada)
+    finally:
+        floresta.set_params(warm_start=False, n_estimators=total)
+    return estimador
+
+
+def comparar(X, y, aumento, por_classe=30, arvores=100, semente=42):
+    """Mesma floresta com e sem aumento, treinada com `por_classe` amostras por letra
+
+    O teste usa as amostras restantes, além de versões inclinadas e
+    espelhadas delas (poses que faltam numa coleta pequena).
+    """
+    from invariantes import inclinar
+
+    rng = np.random.default_rng(semente)
+    treino = np.concatenate([rng.permutation(np.flatnonzero(y == c))[:por_classe]
+                             for c in np.unique(y)])
+    teste = np.setdiff1d(np.arange(len(y)), treino)
+    if len(teste) == 0:
+        _, teste = train_test_split(np.arange(len(y)), test_size=0.2, random_state=semente,
+                                    stratify=y)
+    X_teste, y_teste = X[teste], y[teste]
+    conjuntos = {'teste': X_teste, 'inclinado': inclinar(X_teste, 25, semente),
+                 'espelhado': espelhar_pontos(X_teste)}
+
+    resultados = []
+    for nome, config in (('sem aumento', None), (f'aumento x{aumento.multiplicador}', aumento)):
+        modelo = RandomForestClassifier(n_estimators=arvores, random_state=semente, n_jobs=-1)
+        inicio = time.perf_counter()
+        ajustar(modelo, X[treino], y[treino], config)
+        resultado = {'nome': nome, 'amostras_treino': len(treino),
+                     'tempo_s': time.perf_counter() - inicio}
+        for chave, X_avaliado in conjuntos.items():
+            resultado[chave] = float(np.mean(modelo.predict(X_avaliado) == y_teste))
+        resultados.append(resultado)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Avalia o aumento de dados de landmarks")
+    parser.add_argument('--dataset', default=DATASET_PADRAO, help="CSV de amostras (63 features)")
+    parser.add_argument('--multiplicador', type=int, default=5,
+                        help="Versões do dataset vistas no treino (contando a original)")
+    parser.add_argument('--por-classe', type=int, default=30,
+                        help="Amostras de treino por letra (o resto é teste)")
+    parser.add_argument('--arvores', type=int, default=100, help="Árvores da floresta")
+    parser.add_argument('--semente', type=int, default=42, help="Semente do aumento e do sorteio")
+    args = parser.parse_args()
+
+    X, y = DatasetStore(args.dataset).carregar()
+    if len(X) == 0:
+        print(f"❌ Dataset vazio ou inexistente: {args.dataset}")
+        return
+    aumento = AumentoLandmarks(args.multiplicador, semente=args.semente)
+    print(f"📊 {len(X)} amostras, {len(np.unique(y))} classes; treino com "
+          f"{args.por_classe} por classe")
+    print(f"{'Treino':<14} {'Amostras':>8} {'Teste':>8} {'Inclinado':>10} {'Espelhado':>10} "
+          f"{'Tempo':>7}")
+    for r in comparar(X, y, aumento, args.por_classe, args.arvores, args.semente):
+        print(f"{r['nome']:<14} {r['amostras_treino']:>8} {r['teste']:>8.2%} "
+              f"{r['inclinado']:>10.2%} {r['espelhado']:>10.2%} {r['tempo_s']:>6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
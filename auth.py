@@ -13,11 +13,12 @@ from werkzeug.security import generate_password_hash, check_password_hash
 class User(UserMixin):
     """Classe de usuário para autenticação"""
     
-    def __init__(self, user_id, username, password_hash, role='user', created_at=None):
+    def __init__(self, user_id, username, password_hash, role='user', created_at=None, escola=None):
         self.id = user_id
         self.username = username
         self.password_hash = password_hash
         self.role = role  # 'user' ou 'admin'
+        self.escola = escola  # vocabulário próprio em modelos/escolas/<escola>/ (None: global)
         self.created_at = created_at or datetime.now().isoformat()
         self.last_login = None
     
@@ -36,6 +37,7 @@ class User(UserMixin):
             'username': self.username,
             'password_hash': self.password_hash,
             'role': self.role,
+            'escola': self.escola,
             'created_at': self.created_at,
             'last_login': self.last_login
         }
@@ -48,7 +50,8 @@ class User(UserMixin):
             username=data['username'],
             password_hash=data['password_hash'],
             role=data.get('role', 'user'),
-            created_at=data.get('created_at')
+            created_at=data.get('created_at'),
+            escola=data.get('escola')
         )
         user.last_login = data.get('last_login')
         return user
@@ -0,0 +1,182 @@
+"""
+Captura automática de amostras nos coletores do TraduLibras
+
+Nos coletores, cada amostra custava um ESPAÇO (e 700 por letra). No
+modo automático, CapturaAutomatica decide a cada frame se ele vira
+amostra:
+
+- mão detectada e parada: o vetor mudou menos que `estabilidade` em
+  relação ao frame anterior por `frames_estaveis` frames seguidos (fora
+  das transições entre poses e dos frames borrados);
+- no máximo `taxa` amostras por segundo;
+- diversidade mínima: a amostra precisa estar a mais de `diversidade`
+  de todas as já capturadas da classe (mesma distância do
+  manutencao_dataset.py, então o que é gravado sobrevive à poda).
+  Para continuar capturando, o sinalizador vai variando a pose devagar
+  (ângulo, distância, posição).
+
+As amostras vão para o DatasetStore numa thread (GravadorAssincrono),
+em lotes: a escrita no CSV nunca atrasa o cv2.imshow. O progresso de
+cada classe é desenhado sobre o frame (desenhar_progresso).
+"""
+
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from manutencao_dataset import RAIO_PADRAO
+
+TAXA_PADRAO = 10.0
+ESTABILIDADE_PADRAO = 0.03
+FRAMES_ESTAVEIS_PADRAO = 3
+
+# Estados mostrados no overlay
+SEM_MAO = 'sem mao'
+INSTAVEL = 'mao em movimento'
+REPETIDA = 'varie a pose'
+AGUARDANDO = 'capturando'
+CAPTURADA = 'capturada'
+
+
+class CapturaAutomatica:
+    """Decide, frame a frame, quando um vetor de features vira amostra da classe atual"""
+
+    def __init__(self, taxa=TAXA_PADRAO, diversidade=RAIO_PADRAO,
+                 estabilidade=ESTABILIDADE_PADRAO, frames_estaveis=FRAMES_ESTAVEIS_PADRAO):
+        self.intervalo = 1.0 / taxa if taxa > 0 else 0.0
+        self.diversidade = float(diversidade)
+        self.estabilidade = float(estabilidade)
+        self.frames_estaveis = int(frames_estaveis)
+        self.estado = SEM_MAO
+        self.reiniciar()
+
+    def reiniciar(self, amostras_existentes=None):
+        """Começa uma classe nova (opcionalmente com as amostras que ela já tem)"""
+        self._anterior = None
+        self._estaveis = 0
+        self._ultima = float('-inf')
+        amostras = (np.empty((0, 0), dtype=np.float32) if amostras_existentes is None
+                    else np.asarray(amostras_existentes, dtype=np.float32))
+        self._amostras = list(amostras)
+        self._matriz = amostras if len(amostras) else None
+        self.capturadas = 0
+        self.inicio = time.monotonic()
+
+    def _distancia_minima(self, features):
+        if self._matriz is None or len(self._matriz) != len(self._amostras):
+            self._matriz = np.asarray(self._amostras, dtype=np.float32)
+        diferencas = self._matriz - features
+        return float(np.sqrt(np.einsum('ij,ij->i', diferencas, diferencas).min()))
+
+    def oferecer(self, features, agora=None):
+        """Retorna True se o frame deve ser gravado (e o conta como capturado)"""
+        agora = time.monotonic() if agora is None else agora
+        if features is None:
+            self._anterior, self._estaveis, self.estado = None, 0, SEM_MAO
+            return False
+        features = np.asarray(features, dtype=np.float32)
+        if self._anterior is not None and len(self._anterior) == len(features):
+            movimento = float(np.sqrt(np.sum((features - self._anterior) ** 2)))
+            self._estaveis = self._estaveis + 1 if movimento < self.estabilidade else 0
+        self._anterior = features
+        if self._estaveis < self.frames_estaveis:
+            self.estado = INSTAVEL
+            return False
+        if agora - self._ultima < self.intervalo:
+            self.estado = AGUARDANDO
+            return False
+        if self._amostras and self._distancia_minima(features) <= self.diversidade:
+            self.estado = REPETIDA
+            return False
+        self._ultima = agora
+        self._amostras.append(features)
+        self.capturadas += 1
+        self.estado = CAPTURADA
+        return True
+
+    def taxa_atual(self, agora=None):
+        """Amostras por segundo desde o início da classe"""
+        decorrido = (time.monotonic() if agora is None else agora) - self.inicio
+        return self.capturadas / decorrido if decorrido > 0 else 0.0
+
+
+class GravadorAssincrono:
+    """Acrescenta amostras ao DatasetStore numa thread, em lotes"""
+
+    def __init__(self, store, tamanho_lote=64, fila_max=10000):
+        self.store = store
+        self.tamanho_lote = tamanho_lote
+        self.fila = queue.Queue(maxsize=fila_max)
+        self.gravadas = 0
+        self.descartadas = 0
+        self.erros = 0
+        self._thread = threading.Thread(target=self._trabalhar, name='gravador_dataset',
+                                        daemon=True)
+        self._thread.start()
+
+    def gravar(self, label, features):
+        """Enfileira uma amostra sem bloquear o laço da câmera"""
+        try:
+            self.fila.put_nowait((label, np.asarray(features, dtype=np.float32)))
+        except queue.Full:
+            self.descartadas += 1
+
+    def _trabalhar(self):
+        fim = False
+        while not fim:
+            item = self.fila.get()
+            lote = []
+            while item is not None:
+                lote.append(item)
+                if len(lote) >= self.tamanho_lote:
+                    break
+                try:
+                    item = self.fila.get(timeout=0.2)
+                except queue.Empty:
+                    break
+            fim = item is None
+            if lote:
+                try:
+                    self.gravadas += self.store.adicionar([label for label, _ in lote],
+                                                          np.stack([f for _, f in lote]))
+                except Exception as e:
+                    self.erros += len(lote)
+                    print(f"❌ Erro ao gravar amostras: {e}")
+
+    def fechar(self):
+        """Grava o que falta na fila e encerra a thread"""
+        self.fila.put(None)
+        self._thread.join()
+        return self.gravadas
+
+
+def desenhar_progresso(frame, progresso, meta, atual=None, estado=None, taxa=None):
+    """Painel com o progresso de cada classe (barras) e o estado da captura
+
+    `progresso` é {classe: amostras}; a classe `atual` fica destacada.
+    """
+    altura, largura = frame.shape[:2]
+    linha = 14
+    por_coluna = max(1, (altura - 150) // linha)
+    colunas = -(-len(progresso) // por_coluna) if progresso else 0
+    largura_coluna = 110
+    x0 = max(10, largura - colunas * largura_coluna - 10)
+    y0 = 140
+    if colunas:
+        painel = frame[y0 - 12:y0 + min(len(progresso), por_coluna) * linha, x0 - 5:largura - 5]
+        cv2.addWeighted(painel, 0.4, np.zeros_like(painel), 0.6, 0, dst=painel)
+    for i, (classe, n) in enumerate(progresso.items()):
+        x = x0 + (i // por_coluna) * largura_coluna
+        y = y0 + (i % por_coluna) * linha
+        cor = (0, 255, 255) if classe == atual else ((0, 200, 0) if n >= meta else (200, 200, 200))
+        cv2.putText(frame, f"{classe}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.4, cor, 1)
+        cv2.rectangle(frame, (x + 25, y - 8), (x + 95, y), (90, 90, 90), 1)
+        cv2.rectangle(frame, (x + 25, y - 8), (x + 25 + int(70 * min(n / meta, 1.0)), y), cor, -1)
+    if estado is not None:
+        texto = f"AUTO: {estado}" + (f" | {taxa:.1f} amostras/s" if taxa is not None else "")
+        cor = (0, 255, 0) if estado in (AGUARDANDO, CAPTURADA) else (0, 165, 255)
+        cv2.putText(frame, texto, (10, altura - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, cor, 2)
+    return frame
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Backends de inferência do TraduLibras
+
+O modelo carregado do pickle pode ser servido de formas diferentes;
+cada backend recebe o estimador e devolve um objeto com a interface
+usada pelo app (classes_, n_features_in_, predict e predict_proba):
+
+- sklearn: o próprio estimador (referência, sempre disponível);
+- numpy: florestas/árvores e modelos lineares (com StandardScaler)
+  reescritos em arrays do NumPy, sem o overhead por chamada do sklearn
+  (na cascata, os dois estágios; no modo invariante, o modelo depois
+  das features invariantes);
+- onnx: o estimador convertido com skl2onnx e executado no ONNX Runtime
+  (só quando os dois pacotes estão instalados).
+
+Na inicialização, escolher_backend() roda um lote de validação em cada
+backend, descarta os que discordam das predições do sklearn e escolhe o
+de menor latência de uma amostra neste computador. Novos backends entram
+no registro com @registrar_backend.
+
+Uso (relatório sem subir o servidor):
+    python backends.py --modelo modelos/modelo_libras_expandido.pkl
+"""
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from dataset import DATASET_PADRAO, DatasetStore
+from features import N_FEATURES, features_invariantes
+
+# nome -> função que recebe o estimador e devolve o preditor (ou levanta exceção)
+BACKENDS = {}
+
+
+def registrar_backend(nome):
+    """Decorador que registra a fábrica de um backend"""
+    def decorador(fabrica):
+        BACKENDS[nome] = fabrica
+        return fabrica
+    return decorador
+
+
+class _Preditor:
+    """Base dos backends que substituem o estimador do sklearn"""
+
+    def __init__(self, model):
+        self.classes_ = model.classes_
+        self.n_features_in_ = getattr(model, 'n_features_in_', None)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class ArvoresNumpy(_Preditor):
+    """Floresta (ou árvore) do sklearn percorrida com operações vetorizadas
+
+    Os nós de todas as árvores ficam em arrays únicos; folhas apontam para
+    si mesmas, então `profundidade` passos levam todas as amostras às folhas.
+    """
+
+    def __init__(self, model):
+        super().__init__(model)
+        arvores = [e.tree_ for e in getattr(model, 'estimators_', [model])]
+        deslocamentos = np.cumsum([0] + [a.node_count for a in arvores[:-1]])
+        folha = np.concatenate([a.children_left == -1 for a in arvores])
+        indices = np.arange(len(folha))
+        self.raizes = deslocamentos
+        self.feature = np.where(folha, 0, np.concatenate([a.feature for a in arvores]))
+        self.limiar = np.concatenate([a.threshold for a in arvores])
+        self.esquerda = np.where(folha, indices,
+                                 np.concatenate([a.children_left + d for a, d in zip(arvores, deslocamentos)]))
+        self.direita = np.where(folha, indices,
+                                np.concatenate([a.children_right + d for a, d in zip(arvores, deslocamentos)]))
+        valores = np.concatenate([a.value[:, 0, :] for a in arvores])
+        soma = valores.sum(axis=1, keepdims=True)
+        soma[soma == 0] = 1.0
+        # Média das árvores já embutida nos valores das folhas
+        self.valores = valores / soma / len(arvores)
+        self.profundidade = max(a.max_depth for a in arvores)
+
+    def predict_proba(self, X):
+        # Mesma precisão de comparação do sklearn (features em float32)
+        X = np.asarray(X, dtype=np.float32)
+        linhas = np.arange(len(X))[:, None]
+        nos = np.broadcast_to(self.raizes, (len(X), len(self.raizes)))
+        for _ in range(self.profundidade):
+            esquerda = X[linhas, self.feature[nos]] <= self.limiar[nos]
+            nos = np.where(esquerda, self.esquerda[nos], self.direita[nos])
+        return self.valores[nos].sum(axis=1)
+
+
+class LinearNumpy(_Preditor):
+    """LogisticRegression (opcionalmente após StandardScaler) em NumPy"""
+
+    def __init__(self, model, escaladores=()):
+        super().__init__(model)
+        self.escaladores = [(getattr(e, 'mean_', None), getattr(e, 'scale_', None))
+                            for e in escaladores]
+        self.coef = model.coef_.T.astype(np.float64)
+        self.intercepto = model.intercept_.astype(np.float64)
+        self.ovr = getattr(model, 'multi_class', 'auto') == 'ovr'
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        for media, escala in self.escaladores:
+            if media is not None:
+                X = X - media
+            if escala is not None:
+                X = X / escala
+        scores = X @ self.coef + self.intercepto
+        if scores.shape[1] == 1:
+            positiva = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positiva, positiva])
+        if self.ovr:
+            sigmoides = 1.0 / (1.0 + np.exp(-scores))
+            return sigmoides / sigmoides.sum(axis=1, keepdims=True)
+        scores -= scores.max(axis=1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class TransformadoNumpy(_Preditor):
+    """Função de features (ex.: features_invariantes) seguida de um preditor"""
+
+    def __init__(self, model, transformar, preditor):
+        super().__init__(model)
+        self.transformar = transformar
+        self.preditor = preditor
+
+    def predict_proba(self, X):
+        return self.preditor.predict_proba(self.transformar(X))
+
+
+class OnnxRuntime(_Preditor):
+    """Estimador convertido com skl2onnx e executado no ONNX Runtime"""
+
+    def __init__(self, model):
+        super().__init__(model)
+        import onnxruntime
+        from skl2onnx import to_onnx
+
+        n_features = self.n_features_in_ or N_FEATURES
+        onnx = to_onnx(model, np.zeros((1, n_features), dtype=np.float32),
+                       options={id(model): {'zipmap': False}}, target_opset=17)
+        opcoes = onnxruntime.SessionOptions()
+        # Uma amostra por chamada: threads extras só custam sincronização
+        opcoes.intra_op_num_threads = 1
+        opcoes.inter_op_num_threads = 1
+        self.sessao = onnxruntime.InferenceSession(onnx.SerializeToString(), opcoes,
+                                                   providers=['CPUExecutionProvider'])
+        self.entrada = self.sessao.get_inputs()[0].name
+        self.saida = [s.name for s in self.sessao.get_outputs()][-1]
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        return self.sessao.run([self.saida], {self.entrada: X})[0]
+
+
+@registrar_backend('sklearn')
+def backend_sklearn(model):
+    return model
+
+
+@registrar_backend('numpy')
+def backend_numpy(model):
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.tree import DecisionTreeClassifier
+
+    from cascata import ClassificadorCascata
+    from invariantes import FeaturesInvariantes
+
+    if isinstance(model, ClassificadorCascata):
+        return ClassificadorCascata(backend_numpy(model.rapido), backend_numpy(model.completo),
+                                    model.margem)
+    if isinstance(model, Pipeline) and isinstance(model.steps[0][1], FeaturesInvariantes):
+        return TransformadoNumpy(model, features_invariantes, backend_numpy(model[1:]))
+    escaladores = []
+    estimador = model
+    if isinstance(model, Pipeline):
+        *escaladores, estimador = [passo for _, passo in model.steps]
+        if not all(isinstance(e, StandardScaler) for e in escaladores):
+            raise ValueError("Pipeline com etapas além de StandardScaler")
+    if isinstance(estimador, (RandomForestClassifier, ExtraTreesClassifier,
+                              DecisionTreeClassifier)) and not escaladores:
+        return ArvoresNumpy(estimador)
+    if isinstance(estimador, LogisticRegression):
+        return LinearNumpy(estimador, escaladores)
+    raise ValueError(f"{type(model).__name__} não tem versão em NumPy")
+
+
+@registrar_backend('onnx')
+def backend_onnx(model):
+    return OnnxRuntime(model)
+
+
+def medir_latencia_proba(modelo, X, repeticoes=100):
+    """Mediana (ms) de um predict_proba com uma única amostra"""
+    amostras = X[np.arange(repeticoes) % len(X)]
+    tempos = np.empty(repeticoes)
+    modelo.predict_proba(amostras[:1])  # aquecimento
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo.predict_proba(amostras[i:i + 1])
+        tempos[i] = time.perf_counter() - inicio
+    return float(np.median(tempos) * 1000)
+
+
+def carregar_lote_validacao(caminho_dataset=DATASET_PADRAO, n_features=N_FEATURES, tamanho=256):
+    """Amostras gravadas do dataset para conferir e cronometrar os backends
+
+    Sem dataset compatível, usa vetores aleatórios (a concordância entre
+    backends vale para qualquer entrada; só a latência fica menos realista).
+    """
+    store = DatasetStore(caminho_dataset)
+    if store.existe() and len(store.colunas()) == n_features:
+        X, _ = store.carregar()
+        if len(X):
+            return X[np.linspace(0, len(X) - 1, min(tamanho, len(X))).astype(int)], caminho_dataset
+    rng = np.random.default_rng(42)
+    return rng.normal(scale=0.5, size=(tamanho, n_features)).astype(np.float32), 'aleatório'
+
+
+def escolher_backend(model, X, nomes=None, repeticoes=100, tolerancia=1e-4):
+    """Backend mais rápido entre os que concordam com o sklearn no lote X
+
+    Retorna (nome, preditor, relatório); o relatório tem uma entrada por
+    backend tentado (erro, concordância e latência).
+    """
+    referencia = np.asarray(model.predict_proba(X))
+    relatorio = []
+    for nome in nomes or BACKENDS:
+        entrada = {'backend': nome, 'ok': False, 'erro': None,
+                   'concordancia': None, 'diferenca_max': None, 'latencia_ms': None}
+        relatorio.append(entrada)
+        try:
+            preditor = BACKENDS[nome](model)
+            probabilidades = np.asarray(preditor.predict_proba(X))
+            entrada['concordancia'] = float(np.mean(probabilidades.argmax(axis=1)
+                                                    == referencia.argmax(axis=1)))
+            entrada['diferenca_max'] = float(np.abs(probabilidades - referencia).max())
+            if entrada['concordancia'] < 1.0 or entrada['diferenca_max'] > tolerancia:
+                entrada['erro'] = 'Predições diferentes do sklearn'
+                continue
+            entrada['latencia_ms'] = medir_latencia_proba(preditor, X, repeticoes)
+            entrada['ok'] = True
+            entrada['preditor'] = preditor
+        except Exception as e:
+            entrada['erro'] = f"{type(e).__name__}: {e}"
+
+    aceitos = [e for e in relatorio if e['ok']]
+    if not aceitos:
+        # Sem nenhum backend conferido, o estimador original continua servindo
+        return 'sklearn', model, relatorio
+    melhor = min(aceitos, key=lambda e: e['latencia_ms'])
+    preditor = melhor['preditor']
+    # Predições do lote de validação não contam nas estatísticas do modelo (cascata)
+    for modelo in (model, preditor):
+        if hasattr(modelo, 'zerar_contadores'):
+            modelo.zerar_contadores()
+    for entrada in relatorio:
+        entrada.pop('preditor', None)
+    return melhor['backend'], preditor, relatorio
+
+
+def mostrar_relatorio(relatorio, escolhido):
+    """Imprime a tabela de backends"""
+    print(f"{'Backend':<10} {'Concord.':>9} {'Dif. máx':>10} {'ms':>8}")
+    for e in relatorio:
+        marca = "👉" if e['backend'] == escolhido else "  "
+        concordancia = f"{e['concordancia']:.2%}" if e['concordancia'] is not None else '-'
+        diferenca = f"{e['diferenca_max']:.1e}" if e['diferenca_max'] is not None else '-'
+        latencia = f"{e['latencia_ms']:.3f}" if e['latencia_ms'] is not None else '-'
+        print(f"{e['backend']:<10} {concordancia:>9} {diferenca:>10} {latencia:>8} {marca} "
+              f"{e['erro'] or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os backends de inferência")
+    parser.add_argument('--modelo', default='modelos/modelo_libras_expandido.pkl',
+                        help="Modelo (pickle) a servir")
+    parser.add_argument('--dataset', default=DATASET_PADRAO, help="CSV com o lote de validação")
+    parser.add_argument('--repeticoes', type=int, default=200,
+                        help="Predições de uma amostra cronometradas por backend")
+    args = parser.parse_args()
+
+    with open(args.modelo, 'rb') as f:
+        model = pickle.load(f)
+    X, origem = carregar_lote_validacao(args.dataset,
+                                        getattr(model, 'n_features_in_', None) or N_FEATURES)
+    print(f"⚙️ Backends para {type(model).__name__} ({len(X)} amostras de {origem}):")
+    nome, _, relatorio = escolher_backend(model, X, repeticoes=args.repeticoes)
+    mostrar_relatorio(relatorio, nome)
+
+
+if __name__ == "__main__":
+    main()
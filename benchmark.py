@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline de reconhecimento do TraduLibras sem câmera
+
+Reproduz gravações de landmarks (.npz) e vídeos gravados pelo mesmo
+caminho do servidor (MediaPipe -> process_landmarks -> classificador ->
+confirmação com cooldown) e mede latência por estágio, FPS, memória e
+acurácia. Os resultados ficam em benchmarks/resultados/ para comparar
+commits.
+
+Uso:
+    # Converter um vídeo em gravação de landmarks
+    python benchmark.py gravar video.mp4 --label A --saida gravacoes/A_01.npz
+
+    # Rodar o benchmark em gravações e/ou vídeos (uma pasta por classe)
+    python benchmark.py rodar gravacoes/ --videos videos/
+
+    # Custo do modo duas mãos (MediaPipe com max_num_hands=2 + modelo de 126 features)
+    python benchmark.py rodar --videos videos/ --duas-maos
+
+    # Detecção no recorte em volta da mão (vídeos), comparada ao frame inteiro
+    python benchmark.py rodar --videos videos/ --roi --largura-deteccao 320
+
+    # Cache de predições: taxa de acerto e acurácia por passo de quantização
+    python benchmark.py rodar gravacoes/ --cache-passo 0.1
+
+    # Backend de inferência (sklearn, numpy, onnx ou o mais rápido com auto)
+    python benchmark.py rodar gravacoes/ --backend numpy
+
+    # Comparar com um resultado anterior
+    python benchmark.py rodar gravacoes/ --comparar benchmarks/resultados/anterior.json
+
+Formato das gravações (.npz):
+    landmarks: (T, 21, 3) float32 com as coordenadas do MediaPipe
+               (linhas NaN = frame sem mão)
+    labels:    (T,) com a letra esperada em cada frame ('' = nenhuma)
+    fps:       taxa de quadros da gravação
+"""
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from backends import BACKENDS, carregar_lote_validacao, escolher_backend
+from cache_predicoes import CachePredicoes
+from cascata import encontrar_cascata
+from classificador_maos import (CAMINHO_INFO_DUAS_MAOS, CAMINHO_MODELO_DUAS_MAOS,
+                                ClassificadorPorMaos, combinar_model_info)
+from features import N_FEATURES, array_para_landmarks, features_do_frame, landmarks_para_array
+from modelo_servido import escolher_arquivos
+from reconhecimento import Reconhecedor
+from roi import DetectorMao
+
+PASTA_RESULTADOS = 'benchmarks/resultados'
+PERCENTIS = (50, 90, 95, 99)
+EXTENSOES_VIDEO = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+
+
+class ColetorTempos:
+    """Acumula durações (ns) por estágio do pipeline"""
+
+    def __init__(self):
+        self.tempos = {}
+
+    def registrar(self, estagio, duracao_ns):
+        self.tempos.setdefault(estagio, []).append(duracao_ns)
+
+    def resumo(self):
+        """Percentis de latência (ms) de cada estágio"""
+        resumo = {}
+        for estagio, valores in self.tempos.items():
+            ms = np.array(valores, dtype=np.float64) / 1e6
+            resumo[estagio] = {
+                'n': int(len(ms)),
+                'media_ms': float(ms.mean()),
+                'max_ms': float(ms.max()),
+                **{f'p{p}_ms': float(np.percentile(ms, p)) for p in PERCENTIS},
+            }
+        return resumo
+
+
+class ResultadoReplay:
+    """Contadores de acurácia e de confirmações de uma execução"""
+
+    def __init__(self):
+        self.frames = 0
+        self.frames_com_mao = 0
+        self.acertos = 0
+        self.avaliados = 0
+        self.commits = 0
+        self.commits_corretos = 0
+        self.rejeicoes = 0
+        # Frames de vídeo processados no recorte ROI / inteiros (DetectorMao)
+        self.deteccao = {}
+
+    def registrar(self, esperado, predita, confirmada, letra, rejeitada=False):
+        self.frames += 1
+        self.rejeicoes += int(rejeitada)
+        if predita is not None:
+            self.frames_com_mao += 1
+            if esperado:
+                self.avaliados += 1
+                self.acertos += int(predita == esperado)
+        if confirmada:
+            self.commits += 1
+            self.commits_corretos += int(letra == esperado)
+
+
+def memoria_pico_mb():
+    """Pico de memória residente do processo (None se indisponível)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return pico / 1e6 if sys.platform == 'darwin' else pico / 1e3
+
+
+def _passo_pipeline(maos, esperado, agora, model, reconhecedor, tempos, resultado,
+                    duas_maos=False, cache=None, lados=None):
+    """Features -> classificador -> confirmação de um frame, com tempos
+
+    `maos` são as mãos do frame em ordem canônica; com duas_maos, um
+    frame com duas mãos vai para o classificador de 126 features. Com
+    `cache` (CachePredicoes), o predict_proba passa pelo cache e a mesma
+    distribuição é entregue ao Reconhecedor, como no servidor. `lados`
+    (lateralidade das mãos) espelha a mão esquerda para modelos do modo
+    invariante.
+    """
+    predita = None
+    probabilidades = None
+    if maos:
+        t0 = time.perf_counter_ns()
+        landmarks = features_do_frame(maos, duas_maos, lados)
+        t1 = time.perf_counter_ns()
+        tempos.registrar('features', t1 - t0)
+        if landmarks is not None:
+            # Classificador medido em todo frame, independentemente do cooldown
+            if cache is not None:
+                probabilidades = cache.predict_proba(landmarks)
+                predita = model.classes_[int(np.argmax(probabilidades))]
+            else:
+                predita = model.predict(np.asarray(landmarks).reshape(1, -1))[0]
+            t2 = time.perf_counter_ns()
+            tempos.registrar('classificador', t2 - t1)
+    else:
+        landmarks = None
+
+    t3 = time.perf_counter_ns()
+    letra, confirmada = reconhecedor.processar(landmarks, agora, probabilidades)
+    tempos.registrar('confirmacao', time.perf_counter_ns() - t3)
+    resultado.registrar(esperado, predita, confirmada, letra,
+                        landmarks is not None and reconhecedor.rejeitada)
+
+
+def _criar_reconhecedor(model, cooldown, inicio, limiares):
+    """Reconhecedor com relógio simulado e os limiares de confiança do modelo"""
+    limiares = limiares or {}
+    return Reconhecedor(model, cooldown=cooldown, relogio=lambda: inicio,
+                        limiares=limiares.get('classes'), limiar_padrao=limiares.get('padrao', 0.0))
+
+
+def replay_gravacao(caminho, model, cooldown, tempos, resultado, limiares=None, cache=None):
+    """Reproduz uma gravação .npz no ritmo simulado da gravação"""
+    dados = np.load(caminho, allow_pickle=False)
+    pontos = dados['landmarks']
+    labels = dados['labels'] if 'labels' in dados else np.array([''] * len(pontos))
+    fps = float(dados['fps']) if 'fps' in dados else 30.0
+
+    inicio = 0  # relógio simulado em ns, como o time.monotonic_ns do servidor
+    reconhecedor = _criar_reconhecedor(model, cooldown, inicio, limiares)
+    # Objetos do MediaPipe montados fora da medição
+    frames = [None if np.isnan(p).any() else array_para_landmarks(p) for p in pontos]
+
+    for i, (hand_landmarks, esperado) in enumerate(zip(frames, labels)):
+        agora = inicio + int((i + 1) / fps * 1e9)
+        t0 = time.perf_counter_ns()
+        _passo_pipeline([hand_landmarks] if hand_landmarks is not None else [], str(esperado),
+                        agora, model, reconhecedor, tempos, resultado, cache=cache)
+        tempos.registrar('total', time.perf_counter_ns() - t0)
+
+
+def replay_video(caminho, esperado, model, cooldown, tempos, resultado, limiares=None,
+                 deteccao=None, duas_maos=False, cache=None, canonizar=False):
+    """Reproduz um vídeo passando também pelo MediaPipe, como o camera_worker
+
+    `deteccao` são as opções do DetectorMao (roi, largura_deteccao...);
+    as estatísticas de recorte são somadas em resultado.deteccao. Com
+    duas_maos o MediaPipe procura até duas mãos (sem recorte ROI) e
+    `model` deve ser um ClassificadorPorMaos. Com canonizar (model_info
+    do modo invariante), mãos esquerdas são espelhadas como no servidor.
+    """
+    cap = cv2.VideoCapture(caminho)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=2 if duas_maos else 1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+    opcoes = dict(deteccao or {})
+    if duas_maos:
+        opcoes['roi'] = False
+    detector = DetectorMao(hands, **opcoes)
+    inicio = 0
+    reconhecedor = _criar_reconhecedor(model, cooldown, inicio, limiares)
+
+    i = 0
+    while True:
+        t0 = time.perf_counter_ns()
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            break
+        t1 = time.perf_counter_ns()
+        tempos.registrar('leitura', t1 - t0)
+
+        frame = cv2.flip(frame, 1)
+        detector.detectar(detector.preparar(frame))
+        t2 = time.perf_counter_ns()
+        tempos.registrar('mediapipe', t2 - t1)
+
+        i += 1
+        agora = inicio + int(i / fps * 1e9)
+        _passo_pipeline(detector.maos, esperado, agora, model, reconhecedor, tempos, resultado,
+                        duas_maos and isinstance(model, ClassificadorPorMaos), cache,
+                        detector.lados if canonizar else None)
+        tempos.registrar('total', time.perf_counter_ns() - t1)
+
+    cap.release()
+    hands.close()
+    for chave in ('frames_roi', 'frames_inteiros', 'perdas_roi', 'frames_duas_maos'):
+        resultado.deteccao[chave] = resultado.deteccao.get(chave, 0) + detector.estatisticas()[chave]
+
+
+def listar(pasta, extensoes):
+    """Arquivos com as extensões dadas sob a pasta, ordenados"""
+    if not pasta:
+        return []
+    if os.path.isfile(pasta):
+        return [pasta]
+    arquivos = []
+    for raiz, _, nomes in os.walk(pasta):
+        arquivos.extend(os.path.join(raiz, n) for n in nomes
+                        if os.path.splitext(n)[1].lower() in extensoes)
+    return sorted(arquivos)
+
+
+def carregar_modelo(caminho=None, caminho_info=None):
+    """Carrega o modelo indicado ou o mesmo que o servidor carregaria
+
+    Sem `caminho`, os arquivos vêm da mesma escolha do servidor
+    (modelo_servido.py), sem importar o app. Retorna (modelo, origem, model_info).
+    """
+    if not caminho:
+        caminho, caminho_servido = escolher_arquivos()
+        caminho_info = caminho_info or caminho_servido
+        if caminho is None:
+            return None, None, {}
+    with open(caminho, 'rb') as f:
+        model = pickle.load(f)
+    info = {}
+    if caminho_info:
+        with open(caminho_info, 'rb') as f:
+            info = pickle.load(f)
+    return model, caminho, info
+
+
+def commit_atual():
+    """Hash curto do commit atual (ou 'desconhecido')"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'desconhecido'
+
+
+def rodar(gravacoes=None, videos=None, caminho_modelo=None, cooldown=2.5, repeticoes=1,
+          caminho_info=None, limiar=None, sem_limiares=False, roi=False, largura_deteccao=None,
+          tamanho_roi=224, duas_maos=False, caminho_modelo_duas_maos=None, cache_passo=0.0,
+          cache_capacidade=4096, backend=None):
+    """Executa o benchmark e retorna o dicionário de resultados
+
+    `roi`, `largura_deteccao` e `tamanho_roi` configuram a detecção da
+    mão nos vídeos (roi.py); gravações .npz já trazem os landmarks.
+    `duas_maos` mede o modo duas mãos nos vídeos, com o modelo de duas
+    mãos quando ele existe (sem ele, só o custo extra do MediaPipe).
+    `cache_passo` > 0 mede o cache de predições (cache_predicoes.py).
+    `backend` serve o modelo por um backend de backends.py ('auto' escolhe
+    como o servidor: o mais rápido que concorda com o sklearn).
+    """
+    model, origem_modelo, info = carregar_modelo(caminho_modelo, caminho_info)
+    if model is None:
+        raise RuntimeError("Nenhum modelo carregado")
+    if backend == 'auto':
+        lote, _ = carregar_lote_validacao(
+            n_features=int(getattr(model, 'n_features_in_', None) or N_FEATURES))
+        backend, model, _ = escolher_backend(model, lote)
+        print(f"⚙️ Backend escolhido: {backend}")
+    elif backend:
+        model = BACKENDS[backend](model)
+    if duas_maos and not isinstance(model, ClassificadorPorMaos):
+        caminho_modelo_duas_maos = caminho_modelo_duas_maos or CAMINHO_MODELO_DUAS_MAOS
+        if os.path.exists(caminho_modelo_duas_maos):
+            modelo_duas_maos, _, info_duas_maos = carregar_modelo(
+                caminho_modelo_duas_maos,
+                CAMINHO_INFO_DUAS_MAOS if os.path.exists(CAMINHO_INFO_DUAS_MAOS) else None)
+            model = ClassificadorPorMaos(model, modelo_duas_maos)
+            info = combinar_model_info(model, info, info_duas_maos)
+            origem_modelo = f"{origem_modelo} + {caminho_modelo_duas_maos}"
+        else:
+            print(f"⚠️  {caminho_modelo_duas_maos} não encontrado: medindo só o MediaPipe com duas mãos")
+    if limiar is None:
+        # Mesmo padrão do servidor
+        limiar = float(os.environ.get('TRADULIBRAS_LIMIAR', '0.4'))
+    limiares = None if sem_limiares else {'classes': info.get('limiares'), 'padrao': limiar}
+    deteccao = {'roi': roi, 'largura_deteccao': largura_deteccao, 'tamanho_roi': tamanho_roi}
+    cache = None
+    if cache_passo and hasattr(model, 'predict_proba'):
+        cache = CachePredicoes(cache_passo, cache_capacidade)
+        cache.definir_modelo(model)
+
+    arquivos_npz = listar(gravacoes, {'.npz'})
+    arquivos_video = listar(videos, EXTENSOES_VIDEO)
+    if not arquivos_npz and not arquivos_video:
+        raise RuntimeError("Nenhuma gravação (.npz) ou vídeo encontrado")
+
+    tempos = ColetorTempos()
+    resultado = ResultadoReplay()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for caminho in arquivos_npz:
+            replay_gravacao(caminho, model, cooldown, tempos, resultado, limiares, cache)
+        for caminho in arquivos_video:
+            esperado = os.path.basename(os.path.dirname(caminho))
+            replay_video(caminho, esperado, model, cooldown, tempos, resultado, limiares, deteccao,
+                         duas_maos, cache, bool(info.get('canonizar_mao')))
+    duracao = time.perf_counter() - inicio
+    cascata = encontrar_cascata(model)
+
+    return {
+        'meta': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit_atual(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'processador': platform.processor() or platform.machine(),
+            'modelo': origem_modelo,
+            'modelo_tipo': type(model).__name__,
+            'modelo_mb': len(pickle.dumps(model)) / 1e6,
+            'gravacoes': len(arquivos_npz),
+            'videos': len(arquivos_video),
+            'repeticoes': repeticoes,
+            'cooldown': cooldown,
+            'limiares': ('desligados' if sem_limiares else
+                         'por classe' if info.get('limiares') else f'único {limiar:.2f}'),
+            'deteccao': deteccao,
+            'duas_maos': duas_maos,
+            'cache_passo': cache_passo if cache is not None else 0.0,
+            'backend': backend,
+        },
+        'estagios': tempos.resumo(),
+        'frames': resultado.frames,
+        'frames_com_mao': resultado.frames_com_mao,
+        'taxa_mao': resultado.frames_com_mao / resultado.frames if resultado.frames else None,
+        'deteccao': resultado.deteccao,
+        'fps': resultado.frames / duracao if duracao > 0 else 0.0,
+        'accuracy': resultado.acertos / resultado.avaliados if resultado.avaliados else None,
+        'commits': resultado.commits,
+        'rejeicoes': resultado.rejeicoes,
+        'commit_accuracy': (resultado.commits_corretos / resultado.commits
+                            if resultado.commits else None),
+        'cache': cache.estatisticas() if cache is not None else None,
+        'cascata': cascata.estatisticas() if cascata is not None else None,
+        'memoria_pico_mb': memoria_pico_mb(),
+    }
+
+
+def mostrar(resultados):
+    """Imprime o resumo do benchmark"""
+    meta = resultados['meta']
+    print("=" * 70)
+    print(f"📊 Benchmark {meta['data']} (commit {meta['commit']})")
+    print(f"🤖 Modelo: {meta['modelo_tipo']} ({meta['modelo_mb']:.2f} MB) - {meta['modelo']}")
+    print(f"🎞️ Frames: {resultados['frames']} ({resultados['frames_com_mao']} com mão) "
+          f"| {resultados['fps']:.1f} FPS")
+    print(f"\n{'Estágio':<14} {'n':>7} {'média':>9} " +
+          " ".join(f"{'p' + str(p):>9}" for p in PERCENTIS) + f" {'máx':>9}")
+    for estagio, r in resultados['estagios'].items():
+        print(f"{estagio:<14} {r['n']:>7} {r['media_ms']:>9.3f} " +
+              " ".join(f"{r[f'p{p}_ms']:>9.3f}" for p in PERCENTIS) + f" {r['max_ms']:>9.3f}")
+    print()
+    if resultados['accuracy'] is not None:
+        print(f"🎯 Acurácia por frame: {resultados['accuracy']:.2%}")
+    if resultados['commit_accuracy'] is not None:
+        print(f"✅ Letras confirmadas: {resultados['commits']} "
+              f"({resultados['commit_accuracy']:.2%} corretas)")
+    if resultados.get('rejeicoes') is not None:
+        print(f"🚫 Frames sem letra (abaixo do limiar): {resultados['rejeicoes']} "
+              f"- limiares {resultados['meta'].get('limiares')}")
+    deteccao = resultados.get('deteccao') or {}
+    if deteccao:
+        opcoes = meta.get('deteccao', {})
+        print(f"✂️ Detecção ({'ROI' if opcoes.get('roi') else 'frame inteiro'}"
+              f"{', largura ' + str(opcoes['largura_deteccao']) if opcoes.get('largura_deteccao') else ''}): "
+              f"{deteccao['frames_roi']} frames no recorte, {deteccao['frames_inteiros']} inteiros, "
+              f"{deteccao['perdas_roi']} perdas de rastreamento")
+        if meta.get('duas_maos'):
+            print(f"🤲 Modo duas mãos: {deteccao['frames_duas_maos']} frames com duas mãos "
+                  f"(custo por frame na linha 'mediapipe'; compare com uma execução sem --duas-maos)")
+    if resultados.get('cache'):
+        cache = resultados['cache']
+        print(f"🗃️ Cache de predições (passo {cache['passo']}): {cache['acertos']} acertos, "
+              f"{cache['falhas']} falhas ({(cache['taxa_acerto'] or 0):.1%}), "
+              f"{cache['entradas']} entradas")
+    if resultados.get('cascata'):
+        cascata = resultados['cascata']
+        print(f"🪜 Cascata (margem {cascata['margem']:.3f}): estágio barato em "
+              f"{cascata['frames_rapido']} frames ({(cascata['fracao_rapido'] or 0):.1%}), "
+              f"completo em {cascata['frames_completo']}")
+    if resultados['memoria_pico_mb'] is not None:
+        print(f"💾 Memória (pico RSS): {resultados['memoria_pico_mb']:.1f} MB")
+
+
+def salvar(resultados, pasta=PASTA_RESULTADOS):
+    """Grava os resultados em JSON e retorna o caminho"""
+    os.makedirs(pasta, exist_ok=True)
+    carimbo = datetime.now().strftime('%Y%m%d-%H%M%S')
+    caminho = os.path.join(pasta, f"{carimbo}-{resultados['meta']['commit']}.json")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados salvos em {caminho}")
+    return caminho
+
+
+def comparar(atual, caminho_anterior, limite=0.10):
+    """Compara com um resultado anterior; retorna a lista de regressões"""
+    with open(caminho_anterior, 'r', encoding='utf-8') as f:
+        anterior = json.load(f)
+
+    print(f"\n🔁 Comparação com {caminho_anterior} (commit {anterior['meta']['commit']})")
+    regressoes = []
+
+    def _linha(nome, antes, depois, maior_melhor):
+        if antes is None or depois is None:
+            return
+        variacao = (depois - antes) / antes if antes else 0.0
+        piorou = -variacao > limite if maior_melhor else variacao > limite
+        marca = "⚠️" if piorou else "  "
+        print(f"{marca} {nome:<28} {antes:>10.3f} -> {depois:>10.3f} ({variacao:+.1%})")
+        if piorou:
+            regressoes.append(nome)
+
+    for estagio, r in atual['estagios'].items():
+        r_antes = anterior['estagios'].get(estagio)
+        if r_antes:
+            _linha(f"{estagio} p50 (ms)", r_antes['p50_ms'], r['p50_ms'], False)
+            _linha(f"{estagio} p95 (ms)", r_antes['p95_ms'], r['p95_ms'], False)
+    _linha("FPS", anterior['fps'], atual['fps'], True)
+    _linha("Frames com mão", anterior.get('taxa_mao'), atual.get('taxa_mao'), True)
+    _linha("Acurácia", anterior.get('accuracy'), atual.get('accuracy'), True)
+    _linha("Acurácia dos commits", anterior.get('commit_accuracy'), atual.get('commit_accuracy'), True)
+    _linha("Memória (MB)", anterior.get('memoria_pico_mb'), atual.get('memoria_pico_mb'), False)
+
+    if regressoes:
+        print(f"\n❌ {len(regressoes)} regressões acima de {limite:.0%}")
+    else:
+        print(f"\n✅ Nenhuma regressão acima de {limite:.0%}")
+    return regressoes
+
+
+def gravar(caminho_video, label, saida):
+    """Converte um vídeo em gravação .npz de landmarks"""
+    cap = cv2.VideoCapture(caminho_video)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+    pontos = []
+    while True:
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            break
+        results = hands.process(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            pontos.append(landmarks_para_array(results.multi_hand_landmarks[0]))
+        else:
+            pontos.append(np.full((21, 3), np.nan, dtype=np.float32))
+    cap.release()
+    hands.close()
+
+    pasta = os.path.dirname(saida)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    pontos = np.array(pontos, dtype=np.float32).reshape(-1, 21, 3)
+    np.savez_compressed(saida, landmarks=pontos, labels=np.array([label] * len(pontos)), fps=fps)
+    print(f"✅ {len(pontos)} frames gravados em {saida}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do reconhecimento sem câmera")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_gravar = sub.add_parser('gravar', help="Converte um vídeo em gravação de landmarks")
+    p_gravar.add_argument('video')
+    p_gravar.add_argument('--label', required=True, help="Letra sinalizada no vídeo")
+    p_gravar.add_argument('--saida', required=True, help="Arquivo .npz de destino")
+
+    p_rodar = sub.add_parser('rodar', help="Executa o benchmark")
+    p_rodar.add_argument('gravacoes', nargs='?', help="Pasta ou arquivo .npz")
+    p_rodar.add_argument('--videos', help="Pasta de vídeos (uma subpasta por classe)")
+    p_rodar.add_argument('--modelo', help="Modelo .pkl (padrão: o mesmo do servidor)")
+    p_rodar.add_argument('--info', help="model_info .pkl do --modelo (limiares de confiança)")
+    p_rodar.add_argument('--cooldown', type=float, default=2.5, help="Cooldown em segundos")
+    p_rodar.add_argument('--limiar', type=float,
+                         help="Limiar das classes sem limiar aprendido (padrão: TRADULIBRAS_LIMIAR ou 0.4)")
+    p_rodar.add_argument('--sem-limiares', action='store_true',
+                         help="Desliga o filtro de confiança (comparação)")
+    p_rodar.add_argument('--roi', action='store_true',
+                         help="Detecta a mão só no recorte em volta da mão anterior (vídeos)")
+    p_rodar.add_argument('--tamanho-roi', type=int, default=224,
+                         help="Lado (px) do recorte ampliado entregue ao MediaPipe")
+    p_rodar.add_argument('--largura-deteccao', type=int,
+                         help="Reduz o frame inteiro para esta largura antes da detecção")
+    p_rodar.add_argument('--duas-maos', action='store_true',
+                         help="MediaPipe com até duas mãos e o modelo de duas mãos (vídeos)")
+    p_rodar.add_argument('--modelo-duas-maos',
+                         help=f"Modelo de duas mãos (padrão: {CAMINHO_MODELO_DUAS_MAOS})")
+    p_rodar.add_argument('--cache-passo', type=float, default=0.0,
+                         help="Passo de quantização do cache de predições (0 = sem cache)")
+    p_rodar.add_argument('--cache-capacidade', type=int, default=4096,
+                         help="Vetores guardados no cache de predições")
+    p_rodar.add_argument('--backend', choices=['auto'] + list(BACKENDS),
+                         help="Backend de inferência do modelo (padrão: o estimador carregado)")
+    p_rodar.add_argument('--repeticoes', type=int, default=1, help="Repetições do replay")
+    p_rodar.add_argument('--comparar', help="JSON de um resultado anterior")
+    p_rodar.add_argument('--limite', type=float, default=0.10,
+                         help="Variação considerada regressão (0.10 = 10%%)")
+    p_rodar.add_argument('--nao-salvar', action='store_true', help="Não gravar o JSON")
+    args = parser.parse_args()
+
+    if args.comando == 'gravar':
+        gravar(args.video, args.label, args.saida)
+        return
+
+    resultados = rodar(args.gravacoes, args.videos, args.modelo, args.cooldown, args.repeticoes,
+                       args.info, args.limiar, args.sem_limiares, args.roi,
+                       args.largura_deteccao, args.tamanho_roi, args.duas_maos,
+                       args.modelo_duas_maos, args.cache_passo, args.cache_capacidade,
+                       args.backend)
+    mostrar(resultados)
+    if not args.nao_salvar:
+        salvar(resultados)
+    if args.comparar and comparar(resultados, args.comparar, args.limite):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
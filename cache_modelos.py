@@ -0,0 +1,273 @@
+"""
+Modelos por escola do TraduLibras
+
+Cada escola treina o próprio vocabulário (expandir_vocabulario.py /
+treinamento.py --escola) e os arquivos ficam em
+modelos/escolas/<escola>/. Um único servidor atende várias escolas: o
+CacheModelos carrega o modelo de uma escola na primeira sessão que
+precisa dele e mantém os usados mais recentemente dentro de um
+orçamento de memória (LRU); os menos usados são descarregados.
+
+Sessões ativas reservam o modelo da escola (reservar/liberar): um modelo
+reservado nunca é descarregado, mesmo que o orçamento estoure, porque
+descartá-lo faria a sessão recarregá-lo no frame seguinte. A carga roda
+numa thread (consultar); a thread da câmera nunca espera por ela.
+
+Memória compartilhada: o modelo servido (o preditor escolhido por
+`preparar`, ex.: backends.escolher_backend) é gravado uma vez com joblib
+ao lado do pickle (modelo_libras_expandido.pkl.<backend>.joblib) e
+carregado com mmap_mode='r'. Os arrays ficam mapeados do arquivo,
+somente leitura, e processos que servem a mesma escola dividem as
+mesmas páginas do cache do sistema. Modelos que o sklearn copia ao
+carregar (árvores do backend sklearn) não se beneficiam; o backend numpy
+guarda as florestas em arrays comuns e se beneficia.
+
+O tamanho de cada modelo no orçamento é o do arquivo carregado.
+"""
+
+import glob
+import os
+import pickle
+import re
+import threading
+import time
+
+import joblib
+import numpy as np
+
+PASTA_ESCOLAS = 'modelos/escolas'
+ARQUIVO_MODELO = 'modelo_libras_expandido.pkl'
+ARQUIVO_INFO = 'modelo_info_expandido.pkl'
+# Falha ao carregar: nova tentativa só depois deste intervalo
+ESPERA_NOVA_TENTATIVA_S = 60.0
+
+_NOME_ESCOLA = re.compile(r'^[\w-]+$')
+
+
+def caminhos_escola(escola, pasta=PASTA_ESCOLAS):
+    """(modelo, model_info) de uma escola; o nome não pode sair da pasta"""
+    if not escola or not _NOME_ESCOLA.match(str(escola)):
+        raise ValueError(f"Nome de escola inválido: {escola!r}")
+    base = os.path.join(pasta, str(escola))
+    return os.path.join(base, ARQUIVO_MODELO), os.path.join(base, ARQUIVO_INFO)
+
+
+class ModeloEscola:
+    """Modelo carregado de uma escola, com estatísticas de carga e uso"""
+
+    def __init__(self, escola, model, info, backend, tamanho_mb, tempo_carga_ms, compartilhado):
+        self.escola = escola
+        self.model = model
+        self.info = info
+        self.backend = backend
+        self.tamanho_mb = tamanho_mb
+        self.tempo_carga_ms = tempo_carga_ms
+        self.compartilhado = compartilhado
+        self.carregado_em = time.time()
+        self.predicoes = 0
+        self._tempos_ms = []
+
+    def predict_proba(self, features):
+        """Distribuição de probabilidades de um vetor, cronometrada"""
+        inicio = time.perf_counter()
+        probabilidades = self.model.predict_proba(np.asarray(features).reshape(1, -1))[0]
+        self.predicoes += 1
+        self._tempos_ms.append((time.perf_counter() - inicio) * 1000)
+        if len(self._tempos_ms) > 1000:
+            del self._tempos_ms[:500]
+        return probabilidades
+
+    def estatisticas(self):
+        tempos = np.array(self._tempos_ms) if self._tempos_ms else None
+        return {
+            'backend': self.backend,
+            'classes': len(getattr(self.model, 'classes_', [])),
+            'tamanho_mb': round(self.tamanho_mb, 3),
+            'compartilhado': self.compartilhado,
+            'tempo_carga_ms': round(self.tempo_carga_ms, 1),
+            'carregado_em': self.carregado_em,
+            'predicoes': self.predicoes,
+            'latencia_p50_ms': float(np.percentile(tempos, 50)) if tempos is not None else None,
+            'latencia_p95_ms': float(np.percentile(tempos, 95)) if tempos is not None else None,
+        }
+
+
+class CacheModelos:
+    """LRU de modelos por escola limitado por um orçamento de memória
+
+    `preparar(model)` recebe o estimador do pickle e retorna
+    (nome do backend, preditor servido); sem ele o estimador é servido.
+    """
+
+    def __init__(self, orcamento_mb=512.0, preparar=None, pasta=PASTA_ESCOLAS):
+        self.orcamento_mb = float(orcamento_mb)
+        self.preparar = preparar
+        self.pasta = pasta
+        # escola -> ModeloEscola; a última é a usada mais recentemente
+        self._modelos = {}
+        self._lock = threading.Lock()
+        self._carregando = {}  # escola -> Lock (uma carga por escola por vez)
+        self._falhas = {}  # escola -> (instante, mensagem)
+        self._reservas = {}  # escola -> sessões ativas que usam o modelo
+        self._agendadas = set()  # escolas com carga em segundo plano
+        self.cargas = 0
+        self.acertos = 0
+        self.descartes = 0
+
+    def escolas_disponiveis(self):
+        if not os.path.isdir(self.pasta):
+            return []
+        return sorted(nome for nome in os.listdir(self.pasta)
+                      if os.path.exists(os.path.join(self.pasta, nome, ARQUIVO_MODELO)))
+
+    def obter(self, escola):
+        """ModeloEscola da escola (carregado se preciso), ou None se indisponível"""
+        with self._lock:
+            entrada = self._modelos.pop(escola, None)
+            if entrada is not None:
+                self._modelos[escola] = entrada
+                self.acertos += 1
+                return entrada
+            falha = self._falhas.get(escola)
+            if falha and time.monotonic() - falha[0] < ESPERA_NOVA_TENTATIVA_S:
+                return None
+            carregando = self._carregando.setdefault(escola, threading.Lock())
+
+        with carregando:
+            # Outra thread pode ter carregado enquanto esta esperava
+            with self._lock:
+                entrada = self._modelos.get(escola)
+            if entrada is not None:
+                return entrada
+            try:
+                entrada = self._carregar(escola)
+            except Exception as e:
+                print(f"❌ Erro ao carregar modelo da escola {escola}: {e}")
+                with self._lock:
+                    self._falhas[escola] = (time.monotonic(), str(e))
+                return None
+
+        with self._lock:
+            self._falhas.pop(escola, None)
+            self._modelos[escola] = entrada
+            self.cargas += 1
+            self._respeitar_orcamento(manter=escola)
+        return entrada
+
+    def consultar(self, escola):
+        """ModeloEscola já carregado, sem bloquear
+
+        Se faltar, agenda a carga numa thread e retorna None até ela
+        terminar (quem chama segue com o modelo que já tem).
+        """
+        with self._lock:
+            entrada = self._modelos.get(escola)
+            if entrada is not None or escola in self._agendadas:
+                return entrada
+            falha = self._falhas.get(escola)
+            if falha and time.monotonic() - falha[0] < ESPERA_NOVA_TENTATIVA_S:
+                return None
+            self._agendadas.add(escola)
+        threading.Thread(target=self._carregar_em_segundo_plano, args=(escola,),
+                         name=f'carga_{escola}', daemon=True).start()
+        return None
+
+    def _carregar_em_segundo_plano(self, escola):
+        try:
+            self.obter(escola)
+        finally:
+            with self._lock:
+                self._agendadas.discard(escola)
+
+    def reservar(self, escola):
+        """Marca o modelo da escola como em uso por uma sessão (não é descartado)
+
+        Retorna o ModeloEscola se já estiver carregado; senão agenda a carga
+        e retorna None.
+        """
+        with self._lock:
+            self._reservas[escola] = self._reservas.get(escola, 0) + 1
+            entrada = self._modelos.pop(escola, None)
+            if entrada is not None:
+                self._modelos[escola] = entrada
+                self.acertos += 1
+                return entrada
+        return self.consultar(escola)
+
+    def liberar(self, escola):
+        """Desfaz um reservar (sessão encerrada); o orçamento volta a valer"""
+        with self._lock:
+            restantes = self._reservas.get(escola, 0) - 1
+            if restantes > 0:
+                self._reservas[escola] = restantes
+            else:
+                self._reservas.pop(escola, None)
+                self._respeitar_orcamento(manter=None)
+
+    def _carregar(self, escola):
+        caminho_modelo, caminho_info = caminhos_escola(escola, self.pasta)
+        inicio = time.perf_counter()
+        info = {}
+        if os.path.exists(caminho_info):
+            with open(caminho_info, 'rb') as f:
+                info = pickle.load(f)
+
+        backend, model, caminho = self._carregar_servido(caminho_modelo)
+        if model is None:
+            model = joblib.load(caminho_modelo, mmap_mode='r')
+            backend, caminho = 'sklearn', caminho_modelo
+            if self.preparar is not None:
+                backend, model = self.preparar(model)
+                if backend != 'sklearn':
+                    caminho = f"{caminho_modelo}.{backend}.joblib"
+                    # Outro processo pode estar lendo o arquivo: grava ao lado e troca
+                    temporario = f"{caminho}.{os.getpid()}.tmp"
+                    joblib.dump(model, temporario)
+                    os.replace(temporario, caminho)
+                    model = joblib.load(caminho, mmap_mode='r')
+
+        entrada = ModeloEscola(escola, model, info, backend, os.path.getsize(caminho) / 1e6,
+                               (time.perf_counter() - inicio) * 1000,
+                               compartilhado=caminho.endswith('.joblib'))
+        print(f"🏫 Modelo da escola {escola} carregado ({backend}, {entrada.tamanho_mb:.1f} MB, "
+              f"{entrada.tempo_carga_ms:.0f} ms)")
+        return entrada
+
+    def _carregar_servido(self, caminho_modelo):
+        """Preditor já gravado por uma carga anterior (mais novo que o pickle)"""
+        for caminho in sorted(glob.glob(f"{glob.escape(caminho_modelo)}.*.joblib")):
+            if os.path.getmtime(caminho) >= os.path.getmtime(caminho_modelo):
+                backend = caminho[len(caminho_modelo) + 1:-len('.joblib')]
+                return backend, joblib.load(caminho, mmap_mode='r'), caminho
+        return None, None, None
+
+    def _respeitar_orcamento(self, manter):
+        total = sum(e.tamanho_mb for e in self._modelos.values())
+        for escola in list(self._modelos):
+            if total <= self.orcamento_mb:
+                break
+            if escola == manter or escola in self._reservas:
+                continue
+            total -= self._modelos.pop(escola).tamanho_mb
+            self.descartes += 1
+            print(f"♻️ Modelo da escola {escola} descarregado (orçamento de {self.orcamento_mb:g} MB)")
+
+    def descarregar(self, escola):
+        """Remove a escola do cache (ex.: depois de um novo treino)"""
+        with self._lock:
+            self._falhas.pop(escola, None)
+            return self._modelos.pop(escola, None) is not None
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'orcamento_mb': self.orcamento_mb,
+                'uso_mb': round(sum(e.tamanho_mb for e in self._modelos.values()), 3),
+                'cargas': self.cargas,
+                'acertos': self.acertos,
+                'descartes': self.descartes,
+                'reservas': dict(self._reservas),
+                'carregando': sorted(self._agendadas),
+                'falhas': {escola: mensagem for escola, (_, mensagem) in self._falhas.items()},
+                'modelos': {escola: e.estatisticas() for escola, e in self._modelos.items()},
+            }
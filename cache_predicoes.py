@@ -0,0 +1,115 @@
+"""
+Cache de predições do TraduLibras
+
+Enquanto o sinalizador segura uma letra, frames seguidos geram vetores de
+features quase iguais e o classificador (centenas de árvores) roda de
+novo a cada ciclo. O CachePredicoes guarda o predict_proba por vetor
+quantizado: as features são divididas pelo passo de quantização e
+arredondadas, e os bytes do vetor inteiro viram a chave de um LRU.
+
+Com 63 coordenadas, o tremor do MediaPipe quase sempre leva pelo menos
+uma delas para a célula vizinha, então a chave exata sozinha raramente
+acerta enquanto a pose é segurada. Por isso, quando a chave não está no
+LRU, o vetor é comparado com a entrada usada mais recentemente: se
+nenhuma coordenada se afastou mais de meio passo, a predição dela é
+reaproveitada (uma célula centrada no último vetor). Segurar uma pose
+passa a custar uma busca em dicionário e uma comparação de 63 valores.
+
+O passo controla a troca entre acertos e fidelidade: passos maiores
+juntam mais frames na mesma chave, mas vetores diferentes passam a
+receber a predição do primeiro vetor visto. Meça com
+`benchmark.py rodar --cache-passo`. Passo 0 desliga o cache.
+
+O cache é esvaziado quando o modelo muda (definir_modelo).
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CachePredicoes:
+    """LRU de predict_proba indexado pelo vetor de features quantizado"""
+
+    def __init__(self, passo=0.1, capacidade=4096):
+        self.passo = float(passo)
+        self.capacidade = int(capacidade)
+        self.model = None
+        # chave -> (vetor, probabilidades); a última é a usada mais recentemente
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.acertos_vizinhanca = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    @property
+    def ativo(self):
+        return self.passo > 0 and self.capacidade > 0
+
+    def definir_modelo(self, model):
+        """Troca o modelo; as predições do modelo anterior são descartadas"""
+        with self._lock:
+            if model is not self.model:
+                self.model = model
+                if self._entradas:
+                    self.invalidacoes += 1
+                self._entradas.clear()
+
+    def chave(self, features):
+        """Bytes do vetor quantizado (vetores de tamanhos diferentes não colidem)"""
+        quantizado = np.rint(np.asarray(features, dtype=np.float32).ravel() / self.passo)
+        return quantizado.astype(np.int32).tobytes()
+
+    def predict_proba(self, features):
+        """Distribuição de probabilidades de um vetor (do cache quando possível)"""
+        model = self.model
+        if not self.ativo:
+            return model.predict_proba(np.asarray(features).reshape(1, -1))[0]
+
+        vetor = np.asarray(features, dtype=np.float32).ravel()
+        chave = self.chave(vetor)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[1]
+            if self._entradas:
+                ultima_chave = next(reversed(self._entradas))
+                ultimo_vetor, probabilidades = self._entradas[ultima_chave]
+                if (len(ultimo_vetor) == len(vetor)
+                        and np.abs(vetor - ultimo_vetor).max() <= self.passo / 2):
+                    self.acertos += 1
+                    self.acertos_vizinhanca += 1
+                    return probabilidades
+            self.falhas += 1
+
+        # Modelo roda fora do lock; outra thread pode gravar a mesma chave
+        probabilidades = model.predict_proba(vetor.reshape(1, -1))[0]
+        with self._lock:
+            if model is self.model:
+                self._entradas[chave] = (vetor, probabilidades)
+                if len(self._entradas) > self.capacidade:
+                    self._entradas.popitem(last=False)
+        return probabilidades
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'ativo': self.ativo,
+                'passo': self.passo,
+                'capacidade': self.capacidade,
+                'entradas': len(self._entradas),
+                'acertos': self.acertos,
+                'acertos_vizinhanca': self.acertos_vizinhanca,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / consultas if consultas else None,
+                'invalidacoes': self.invalidacoes,
+            }
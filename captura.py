@@ -0,0 +1,233 @@
+"""
+Captura de webcam do TraduLibras
+
+- Negociação do formato (MJPG, depois YUYV), resolução, FPS e buffer
+  (CAP_PROP_BUFFERSIZE=1) com o backend nativo da plataforma (V4L2,
+  DirectShow/Media Foundation, AVFoundation) antes do backend padrão.
+- CapturaThread: uma thread dedicada lê a câmera sem parar e guarda só o
+  frame mais novo. Quem consome (camera_worker) nunca recebe frames
+  velhos acumulados no buffer do driver, mesmo quando o processamento de
+  um frame demora mais que o intervalo da câmera.
+- A sondagem de dispositivos (índice + backend + formato) roda uma vez e
+  fica em cache em JSON; nas próximas inicializações só o dispositivo do
+  cache é aberto.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import cv2
+
+# Formatos tentados em ordem: MJPG comprimido permite resolução/FPS
+# maiores no mesmo USB; YUYV é o formato sem compressão mais comum
+FORMATOS = ('MJPG', 'YUYV')
+CACHE_PADRAO = 'camera_dispositivo.json'
+
+
+def backends_plataforma():
+    """Backends do OpenCV tentados nesta plataforma, o padrão por último"""
+    if sys.platform.startswith('linux'):
+        nomes = ['V4L2']
+    elif sys.platform == 'win32':
+        nomes = ['DSHOW', 'MSMF']
+    elif sys.platform == 'darwin':
+        nomes = ['AVFOUNDATION']
+    else:
+        nomes = []
+    return [n for n in nomes if hasattr(cv2, f'CAP_{n}')] + ['ANY']
+
+
+def _fourcc_texto(valor):
+    valor = int(valor)
+    return ''.join(chr((valor >> 8 * i) & 0xFF) for i in range(4))
+
+
+def abrir_camera(indice=0, backend='ANY', formato='MJPG', largura=640, altura=480,
+                 fps=30.0, buffer=1):
+    """Abre e configura uma câmera
+
+    Retorna (captura, configuração efetiva) ou (None, None) se o
+    dispositivo não abrir. O formato pedido pode ser recusado pelo
+    driver; a configuração retornada traz o que a câmera aceitou.
+    """
+    captura = cv2.VideoCapture(indice, getattr(cv2, f'CAP_{backend}'))
+    if not captura.isOpened():
+        captura.release()
+        return None, None
+
+    # FOURCC antes da resolução: no V4L2 a troca de formato redefine o tamanho
+    if formato:
+        captura.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*formato))
+    captura.set(cv2.CAP_PROP_FRAME_WIDTH, largura)
+    captura.set(cv2.CAP_PROP_FRAME_HEIGHT, altura)
+    if fps:
+        captura.set(cv2.CAP_PROP_FPS, fps)
+    # Buffer de 1 frame: o driver não acumula frames velhos
+    captura.set(cv2.CAP_PROP_BUFFERSIZE, buffer)
+
+    configuracao = {
+        'indice': indice,
+        'backend': backend,
+        'formato': _fourcc_texto(captura.get(cv2.CAP_PROP_FOURCC)).strip('\x00') or None,
+        'largura': int(captura.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'altura': int(captura.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': captura.get(cv2.CAP_PROP_FPS) or None,
+    }
+    return captura, configuracao
+
+
+def _testar(captura):
+    ret, frame = captura.read()
+    return ret and frame is not None
+
+
+def sondar_cameras(indices=(0, 1, 2), largura=640, altura=480, fps=30.0, formatos=FORMATOS):
+    """Primeira combinação de índice, backend e formato que entrega frames
+
+    Retorna (captura aberta, configuração) ou (None, None).
+    """
+    print("🔍 Procurando câmera disponível...")
+    for indice in indices:
+        for backend in backends_plataforma():
+            for formato in tuple(formatos) + (None,):
+                try:
+                    captura, configuracao = abrir_camera(indice, backend, formato,
+                                                         largura, altura, fps)
+                except Exception as e:
+                    print(f"❌ Erro com câmera {indice} ({backend}): {e}")
+                    break
+                if captura is None:
+                    break  # índice/backend indisponível: nenhum formato vai abrir
+                # Formato recusado pelo driver: tenta o próximo
+                if formato and configuracao['formato'] != formato:
+                    captura.release()
+                    continue
+                if _testar(captura):
+                    print(f"✅ Câmera encontrada: índice {indice}, {backend}, "
+                          f"{configuracao['formato'] or 'formato padrão'}")
+                    return captura, configuracao
+                captura.release()
+    print("❌ Nenhuma câmera funcionando encontrada")
+    return None, None
+
+
+class CacheDispositivo:
+    """Última configuração de câmera que funcionou, em JSON"""
+
+    def __init__(self, caminho=CACHE_PADRAO):
+        self.caminho = caminho
+
+    def carregar(self):
+        if not self.caminho or not os.path.exists(self.caminho):
+            return None
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Cache da câmera ignorado: {e}")
+            return None
+
+    def salvar(self, configuracao):
+        if not self.caminho:
+            return
+        try:
+            with open(self.caminho, 'w', encoding='utf-8') as f:
+                json.dump(dict(configuracao, salvo_em=datetime.now().isoformat()),
+                          f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"⚠️  Não foi possível salvar o cache da câmera: {e}")
+
+    def limpar(self):
+        if self.caminho and os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+
+def abrir_camera_em_cache(cache, largura=640, altura=480, fps=30.0, formato=None):
+    """Abre o dispositivo do cache; se ele falhar, sonda e atualiza o cache
+
+    `formato` força um formato específico na sondagem (ex.: 'YUYV'); um
+    cache gravado com outro formato é ignorado e a sondagem refeita.
+    """
+    anterior = cache.carregar()
+    if anterior and formato and anterior.get('formato') != formato:
+        print(f"⚠️  Cache da câmera em {anterior.get('formato') or 'formato padrão'}, "
+              f"formato pedido {formato}; sondando de novo")
+        anterior = None
+    if anterior:
+        captura, configuracao = abrir_camera(anterior['indice'], anterior['backend'],
+                                             anterior.get('formato'), largura, altura, fps)
+        if captura is not None and _testar(captura):
+            print(f"📷 Câmera do cache: índice {configuracao['indice']}, {configuracao['backend']}, "
+                  f"{configuracao['formato'] or 'formato padrão'}")
+            return captura, configuracao
+        if captura is not None:
+            captura.release()
+        print("⚠️  Câmera do cache não respondeu; sondando de novo")
+
+    captura, configuracao = sondar_cameras(largura=largura, altura=altura, fps=fps,
+                                           formatos=(formato,) if formato else FORMATOS)
+    if captura is not None:
+        cache.salvar(configuracao)
+    return captura, configuracao
+
+
+class CapturaThread:
+    """Lê uma cv2.VideoCapture em uma thread e guarda só o frame mais novo"""
+
+    def __init__(self, captura, timeout=1.0):
+        self.captura = captura
+        self.timeout = timeout
+        self._condicao = threading.Condition()
+        self._frame = None
+        self._sequencia = 0
+        self._entregue = 0
+        self.falhas = 0
+        self.descartados = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._ler, name='captura', daemon=True)
+        self._thread.start()
+
+    def _ler(self):
+        while not self._parar.is_set():
+            ret, frame = self.captura.read()
+            if not ret or frame is None:
+                self.falhas += 1
+                time.sleep(0.01)
+                continue
+            with self._condicao:
+                # Frame anterior nunca entregue: substituído pelo mais novo
+                if self._sequencia > self._entregue:
+                    self.descartados += 1
+                self._frame = frame
+                self._sequencia += 1
+                self._condicao.notify_all()
+
+    def ler(self):
+        """Retorna (sucesso, frame) com um frame ainda não entregue
+
+        Espera até `timeout` segundos pelo próximo frame da câmera.
+        """
+        with self._condicao:
+            if not self._condicao.wait_for(lambda: self._sequencia > self._entregue
+                                           or self._parar.is_set(), self.timeout):
+                return False, None
+            if self._sequencia <= self._entregue:
+                return False, None
+            self._entregue = self._sequencia
+            return True, self._frame
+
+    def estatisticas(self):
+        with self._condicao:
+            return {'frames': self._sequencia, 'descartados': self.descartados,
+                    'falhas': self.falhas}
+
+    def liberar(self):
+        self._parar.set()
+        with self._condicao:
+            self._condicao.notify_all()
+        self._thread.join(timeout=2)
+        self.captura.release()
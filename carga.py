@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Gerador de carga para o servidor do TraduLibras
+
+Abre N sessões simuladas, cada uma consumindo o /video_feed (MJPEG) e
+consultando /letra_atual a cada 100 ms, como a página da câmera faz.
+O número de sessões sobe em degraus e, em cada degrau, mede FPS recebido
+por sessão, latência das consultas e erros. O primeiro degrau em que um
+dos limites é violado é reportado como ponto de saturação.
+
+Para rodar sem webcam, suba o servidor com uma fonte virtual:
+    TRADULIBRAS_FONTE=sintetica python app.py
+    TRADULIBRAS_FONTE=landmarks:gravacoes/A_01.npz python app.py
+
+Uso:
+    python carga.py --url http://localhost:5000 --sessoes 1,2,4,8,16 --duracao 20
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+import requests
+
+INTERVALO_CONSULTA = 0.1  # mesmo intervalo do setInterval da página
+
+
+class Sessao:
+    """Uma aba de navegador simulada: stream de vídeo + consulta da letra"""
+
+    def __init__(self, url, parar):
+        self.url = url.rstrip('/')
+        self.parar = parar
+        self.frames = 0
+        self.bytes = 0
+        self.latencias = []
+        self.erros = 0
+        self.requisicoes = 0
+
+    def _video(self):
+        try:
+            with requests.get(f"{self.url}/video_feed", stream=True, timeout=10) as resposta:
+                for bloco in resposta.iter_content(chunk_size=16384):
+                    if self.parar.is_set():
+                        break
+                    self.bytes += len(bloco)
+                    self.frames += bloco.count(b'--frame')
+        except Exception:
+            self.erros += 1
+
+    def _consultas(self):
+        http = requests.Session()
+        while not self.parar.is_set():
+            inicio = time.perf_counter()
+            try:
+                resposta = http.get(f"{self.url}/letra_atual", timeout=5)
+                resposta.raise_for_status()
+                self.latencias.append((time.perf_counter() - inicio) * 1000)
+            except Exception:
+                self.erros += 1
+            self.requisicoes += 1
+            restante = INTERVALO_CONSULTA - (time.perf_counter() - inicio)
+            if restante > 0:
+                self.parar.wait(restante)
+
+    def iniciar(self):
+        self.threads = [threading.Thread(target=self._video, daemon=True),
+                        threading.Thread(target=self._consultas, daemon=True)]
+        for t in self.threads:
+            t.start()
+
+    def aguardar(self):
+        for t in self.threads:
+            t.join(timeout=10)
+
+
+def medir_degrau(url, n_sessoes, duracao):
+    """Roda n sessões por `duracao` segundos e retorna as métricas do degrau"""
+    parar = threading.Event()
+    sessoes = [Sessao(url, parar) for _ in range(n_sessoes)]
+    inicio = time.perf_counter()
+    for s in sessoes:
+        s.iniciar()
+    time.sleep(duracao)
+    parar.set()
+    decorrido = time.perf_counter() - inicio
+    for s in sessoes:
+        s.aguardar()
+
+    latencias = np.array([l for s in sessoes for l in s.latencias]) if any(
+        s.latencias for s in sessoes) else np.array([0.0])
+    fps_sessoes = np.array([s.frames / decorrido for s in sessoes])
+    requisicoes = sum(s.requisicoes for s in sessoes)
+    erros = sum(s.erros for s in sessoes)
+    return {
+        'sessoes': n_sessoes,
+        'fps_medio': float(fps_sessoes.mean()),
+        'fps_min': float(fps_sessoes.min()),
+        'mbps': sum(s.bytes for s in sessoes) * 8 / decorrido / 1e6,
+        'consulta_p50_ms': float(np.percentile(latencias, 50)),
+        'consulta_p95_ms': float(np.percentile(latencias, 95)),
+        'consultas_por_s': requisicoes / decorrido,
+        'taxa_erros': erros / max(requisicoes, 1),
+    }
+
+
+def saturado(degrau, referencia, queda_fps, limite_ms, limite_erros):
+    """Motivos pelos quais o degrau é considerado saturado (lista vazia = ok)"""
+    motivos = []
+    if referencia and degrau['fps_medio'] < referencia['fps_medio'] * (1 - queda_fps):
+        motivos.append(f"FPS caiu {1 - degrau['fps_medio'] / referencia['fps_medio']:.0%}")
+    if degrau['consulta_p95_ms'] > limite_ms:
+        motivos.append(f"p95 de /letra_atual {degrau['consulta_p95_ms']:.0f} ms")
+    if degrau['taxa_erros'] > limite_erros:
+        motivos.append(f"{degrau['taxa_erros']:.1%} de erros")
+    return motivos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor TraduLibras")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--sessoes', default='1,2,4,8,16',
+                        help="Degraus de sessões simultâneas, separados por vírgula")
+    parser.add_argument('--duracao', type=float, default=20, help="Segundos por degrau")
+    parser.add_argument('--queda-fps', type=float, default=0.2,
+                        help="Queda de FPS (em relação ao 1º degrau) que indica saturação")
+    parser.add_argument('--limite-ms', type=float, default=250,
+                        help="p95 máximo aceitável de /letra_atual")
+    parser.add_argument('--limite-erros', type=float, default=0.01,
+                        help="Taxa máxima de erros aceitável")
+    args = parser.parse_args()
+
+    degraus = [int(n) for n in args.sessoes.split(',') if n.strip()]
+    print(f"🚀 Teste de carga em {args.url} - degraus {degraus}, {args.duracao:.0f}s cada")
+    print(f"{'Sessões':>8} {'FPS méd':>8} {'FPS mín':>8} {'Mbps':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'req/s':>7} {'erros':>7}")
+
+    referencia = None
+    ponto_saturacao = None
+    for n in degraus:
+        degrau = medir_degrau(args.url, n, args.duracao)
+        referencia = referencia or degrau
+        motivos = saturado(degrau, referencia, args.queda_fps, args.limite_ms, args.limite_erros)
+        print(f"{n:>8} {degrau['fps_medio']:>8.1f} {degrau['fps_min']:>8.1f} {degrau['mbps']:>7.1f} "
+              f"{degrau['consulta_p50_ms']:>8.1f} {degrau['consulta_p95_ms']:>8.1f} "
+              f"{degrau['consultas_por_s']:>7.1f} {degrau['taxa_erros']:>7.1%}"
+              + (f"  ⚠️ {', '.join(motivos)}" if motivos else ""))
+        if motivos and ponto_saturacao is None:
+            ponto_saturacao = (n, motivos)
+
+    print("=" * 70)
+    if ponto_saturacao:
+        print(f"📈 Saturação a partir de {ponto_saturacao[0]} sessões: "
+              f"{', '.join(ponto_saturacao[1])}")
+    else:
+        print(f"✅ Sem saturação até {degraus[-1]} sessões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Classificador em cascata do TraduLibras
+
+A maioria dos frames é fácil: a letra está longe de todas as outras e um
+modelo minúsculo acerta tanto quanto a floresta inteira. Na cascata, um
+estágio barato (regressão logística ou poucas árvores rasas) classifica
+todo frame; só quando a margem dele (probabilidade da 1ª classe menos a
+da 2ª) fica abaixo do limiar o frame vai para a floresta completa.
+
+Os dois estágios são treinados juntos, na mesma divisão treino/validação.
+A margem escolhida é a menor que mantém a acurácia da cascata na
+validação a até `tolerancia` da floresta sozinha; o relatório mostra a
+fração dos frames resolvida pelo estágio barato e a acurácia mantida.
+
+O app serve a cascata com TRADULIBRAS_MODELO=cascata.
+
+Uso:
+    python cascata.py --dataset gestos_libras.csv --tolerancia 0.005
+"""
+
+import argparse
+import copy
+import os
+import pickle
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from dataset import DATASET_PADRAO, DatasetStore
+from decodificador import matriz_confusao
+from features import N_FEATURES
+from reconhecimento import aprender_limiares
+from treinamento import CAMINHO_MODELO, definir_n_jobs, medir_latencia, salvar_modelo
+
+CAMINHO_MODELO_CASCATA = 'modelos/modelo_libras_cascata.pkl'
+CAMINHO_INFO_CASCATA = 'modelos/modelo_info_cascata.pkl'
+
+
+def margens(probabilidades):
+    """Diferença entre as duas maiores probabilidades de cada linha"""
+    if probabilidades.shape[1] < 2:
+        return np.ones(len(probabilidades))
+    duas_maiores = np.partition(probabilidades, -2, axis=1)[:, -2:]
+    return duas_maiores[:, 1] - duas_maiores[:, 0]
+
+
+class ClassificadorCascata:
+    """Estágio barato + floresta completa com a interface do sklearn
+
+    Conta quantos frames cada estágio resolveu (estatisticas()).
+    """
+
+    def __init__(self, rapido, completo, margem):
+        if [str(c) for c in rapido.classes_] != [str(c) for c in completo.classes_]:
+            raise ValueError("Os dois estágios da cascata precisam das mesmas classes")
+        self.rapido = rapido
+        self.completo = completo
+        self.margem = float(margem)
+        self.classes_ = completo.classes_
+        self.n_features_in_ = getattr(completo, 'n_features_in_', None)
+        self.zerar_contadores()
+
+    def __setstate__(self, estado):
+        # Contadores não importam entre execuções: recomeçam do zero ao carregar
+        self.__dict__.update(estado)
+        self.zerar_contadores()
+
+    def zerar_contadores(self):
+        self.frames_rapido = 0
+        self.frames_completo = 0
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        probabilidades = np.asarray(self.rapido.predict_proba(X), dtype=float)
+        ambiguos = margens(probabilidades) < self.margem
+        n_ambiguos = int(ambiguos.sum())
+        if n_ambiguos:
+            probabilidades[ambiguos] = self.completo.predict_proba(X[ambiguos])
+        self.frames_completo += n_ambiguos
+        self.frames_rapido += len(X) - n_ambiguos
+        return probabilidades
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def sem_contadores(self):
+        """Cópia para predições fora do tráfego (sombra): não mexe nos contadores"""
+        copia = copy.copy(self)
+        copia.zerar_contadores()
+        return copia
+
+    def estatisticas(self):
+        total = self.frames_rapido + self.frames_completo
+        return {
+            'margem': self.margem,
+            'frames_rapido': self.frames_rapido,
+            'frames_completo': self.frames_completo,
+            'fracao_rapido': self.frames_rapido / total if total else None,
+        }
+
+
+def encontrar_cascata(model):
+    """A ClassificadorCascata servida (direto ou dentro do ClassificadorPorMaos), ou None"""
+    # Com amostras no índice de vizinhos (vizinhos.py) o modelo servido o envolve
+    model = getattr(model, 'principal', model)
+    if isinstance(model, ClassificadorCascata):
+        return model
+    modelo_uma_mao = getattr(model, 'modelos', {}).get(N_FEATURES)
+    return modelo_uma_mao if isinstance(modelo_uma_mao, ClassificadorCascata) else None
+
+
+def gerar_estagios_rapidos():
+    """Lista (nome, estimador) dos candidatos a estágio barato"""
+    return [
+        ("Logística", make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000))),
+        ("Floresta rasa (5 árvores, depth=6)",
+         RandomForestClassifier(n_estimators=5, max_depth=6, random_state=42)),
+    ]
+
+
+def escolher_margem(prob_rapido, classes, pred_completo, y, tolerancia=0.005):
+    """Menor margem cuja cascata fica a até `tolerancia` da floresta sozinha
+
+    Retorna (margem, fração resolvida pelo estágio barato, acurácia da cascata).
+    """
+    margem_frames = margens(prob_rapido)
+    acerto_rapido = classes[prob_rapido.argmax(axis=1)] == y
+    acerto_completo = pred_completo == y
+    alvo = acerto_completo.mean() - tolerancia
+
+    # Frames em ordem decrescente de margem: com a margem na posição k, os
+    # k primeiros ficam com o estágio barato e o resto vai para a floresta
+    ordem = np.argsort(-margem_frames, kind='stable')
+    acertos = (np.concatenate([[0], np.cumsum(acerto_rapido[ordem])])
+               + np.concatenate([np.cumsum(acerto_completo[ordem][::-1])[::-1], [0]]))
+    acuracias = acertos / len(y)
+    # Só posições entre margens distintas são limiares possíveis
+    ordenadas = margem_frames[ordem]
+    validos = np.ones(len(y) + 1, dtype=bool)
+    validos[1:-1] = ordenadas[1:] < ordenadas[:-1]
+    aceitos = np.flatnonzero(validos & (acuracias >= alvo))
+    k = int(aceitos.max()) if len(aceitos) else 0
+    if k == 0:
+        margem = np.inf
+    elif k == len(y):
+        margem = float(ordenadas[-1])
+    else:
+        margem = float((ordenadas[k - 1] + ordenadas[k]) / 2)
+    return margem, k / len(y), float(acuracias[k])
+
+
+def treinar_cascata(caminho_dataset=DATASET_PADRAO, caminho_completo=CAMINHO_MODELO,
+                    tolerancia=0.005, caminho_modelo=CAMINHO_MODELO_CASCATA,
+                    caminho_info=CAMINHO_INFO_CASCATA, precisao_alvo=0.95):
+    """Treina os dois estágios, escolhe a margem e salva a cascata"""
+    inicio = time.perf_counter()
+    X, y = DatasetStore(caminho_dataset).carregar()
+    if len(X) == 0:
+        print(f"❌ Dataset vazio ou inexistente: {caminho_dataset}")
+        return None
+
+    # Estágio completo: os hiperparâmetros da floresta já escolhidos pelo
+    # treinamento.py, quando ela existe
+    estimador_completo = None
+    if caminho_completo and os.path.exists(caminho_completo):
+        try:
+            with open(caminho_completo, 'rb') as f:
+                estimador_completo = clone(pickle.load(f))
+            print(f"🌲 Estágio completo: {type(estimador_completo).__name__} de {caminho_completo}")
+        except Exception as e:
+            print(f"⚠️  {caminho_completo} não serve de estágio completo: {e}")
+    if estimador_completo is None:
+        estimador_completo = RandomForestClassifier(n_estimators=100, min_samples_split=3,
+                                                    random_state=42)
+        print("🌲 Estágio completo: RandomForest(n=100) padrão")
+
+    X_treino, X_val, y_treino, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    def _ajustar(estimador, X_ajuste, y_ajuste):
+        modelo = definir_n_jobs(clone(estimador), -1)
+        modelo.fit(X_ajuste, y_ajuste)
+        return definir_n_jobs(modelo, 1)
+
+    completo = _ajustar(estimador_completo, X_treino, y_treino)
+    pred_completo = completo.predict(X_val)
+    acuracia_completo = float(np.mean(pred_completo == y_val))
+    latencia_completo = medir_latencia(completo, X_val)[0]
+
+    resultados = []
+    for nome, estimador in gerar_estagios_rapidos():
+        rapido = _ajustar(estimador, X_treino, y_treino)
+        prob_rapido = rapido.predict_proba(X_val)
+        margem, fracao, acuracia = escolher_margem(prob_rapido, rapido.classes_, pred_completo,
+                                                   y_val, tolerancia)
+        cascata = ClassificadorCascata(rapido, completo, margem)
+        latencia = medir_latencia(cascata, X_val)[0]
+        resultados.append({
+            'nome': nome,
+            'estimador': estimador,
+            'cascata': cascata,
+            'margem': margem,
+            'fracao_rapido': fracao,
+            'accuracy': acuracia,
+            'accuracy_rapido': float(np.mean(rapido.classes_[prob_rapido.argmax(axis=1)] == y_val)),
+            'latencia_rapido_ms': medir_latencia(rapido, X_val)[0],
+            'latencia_ms': latencia,
+        })
+
+    print("\n🪜 Cascata na validação (margem escolhida por estágio barato):")
+    print(f"{'Estágio barato':<36} {'Sozinho':>8} {'Margem':>8} {'% barato':>9} "
+          f"{'Cascata':>8} {'ms':>8}")
+    for r in resultados:
+        print(f"{r['nome']:<36} {r['accuracy_rapido']:>8.2%} {r['margem']:>8.3f} "
+              f"{r['fracao_rapido']:>9.1%} {r['accuracy']:>8.2%} {r['latencia_ms']:>8.3f}")
+    print(f"{'Estágio completo sozinho':<36} {'':>8} {'':>8} {'':>9} "
+          f"{acuracia_completo:>8.2%} {latencia_completo:>8.3f}")
+
+    melhor = min(resultados, key=lambda r: r['latencia_ms'])
+    cascata_val = melhor['cascata']
+    prob_val = cascata_val.predict_proba(X_val)
+    pred_val = cascata_val.classes_[prob_val.argmax(axis=1)]
+    print(f"\n⚡ Estágio barato escolhido: {melhor['nome']} — resolve {melhor['fracao_rapido']:.1%} "
+          f"dos frames, acurácia {melhor['accuracy']:.2%} (só o completo: {acuracia_completo:.2%})")
+
+    print("🧠 Re-treinando os dois estágios com todas as amostras...")
+    cascata = ClassificadorCascata(_ajustar(melhor['estimador'], X, y),
+                                   _ajustar(estimador_completo, X, y), melhor['margem'])
+
+    model_info = {
+        'classes': [str(c) for c in cascata.classes_],
+        'n_features': X.shape[1],
+        'test_accuracy': melhor['accuracy'],
+        'n_samples': len(X),
+        'vocabulary_type': 'expanded',
+        'model_name': f"Cascata({melhor['nome']} -> {type(estimador_completo).__name__})",
+        'latencia_ms': melhor['latencia_ms'],
+        'cascata': {
+            'margem': melhor['margem'],
+            'fracao_rapido': melhor['fracao_rapido'],
+            'accuracy_completo': acuracia_completo,
+            'latencia_completo_ms': latencia_completo,
+            'tolerancia': tolerancia,
+        },
+        'confusion_matrix': matriz_confusao(y_val, pred_val, cascata_val.classes_),
+        'limiares': aprender_limiares(prob_val, y_val, cascata_val.classes_, precisao_alvo),
+    }
+    salvar_modelo(cascata, model_info, caminho_modelo, caminho_info)
+    print(f"⏱️ Treinamento concluído em {time.perf_counter() - inicio:.1f}s")
+    return cascata, model_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina o classificador em cascata")
+    parser.add_argument('--dataset', default=DATASET_PADRAO, help="CSV de amostras")
+    parser.add_argument('--completo', default=CAMINHO_MODELO,
+                        help="Modelo cujos hiperparâmetros o estágio completo usa")
+    parser.add_argument('--tolerancia', type=float, default=0.005,
+                        help="Perda de acurácia aceita em relação à floresta sozinha")
+    parser.add_argument('--precisao-alvo', type=float, default=0.95,
+                        help="Precisão por classe usada para aprender os limiares de confiança")
+    parser.add_argument('--modelo', default=CAMINHO_MODELO_CASCATA, help="Arquivo da cascata")
+    parser.add_argument('--info', default=CAMINHO_INFO_CASCATA, help="Arquivo do model_info")
+    args = parser.parse_args()
+
+    print("🚀 TraduLibras - Classificador em Cascata")
+    # Importa pelo nome do módulo para que o pickle referencie
+    # cascata.ClassificadorCascata (e não __main__.ClassificadorCascata)
+    import cascata
+    cascata.treinar_cascata(args.dataset, args.completo, args.tolerancia, args.modelo, args.info,
+                            args.precisao_alvo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Roteamento entre o classificador de uma mão e o de duas mãos
+
+Sinais de uma mão usam as 63 features de sempre; sinais com duas mãos
+(números e sinais de Libras que usam as duas) têm um modelo próprio
+treinado com 126 features (features.normalizar_par). O
+ClassificadorPorMaos se apresenta como um único modelo do sklearn: o
+tamanho de cada vetor escolhe o modelo e as probabilidades saem na
+ordem da união das classes, então Reconhecedor, limiares e
+decodificador não precisam saber quantas mãos havia no frame.
+"""
+
+import copy
+
+import numpy as np
+
+from features import N_FEATURES, N_FEATURES_DUAS_MAOS
+
+CAMINHO_MODELO_DUAS_MAOS = 'modelos/modelo_libras_duas_maos.pkl'
+CAMINHO_INFO_DUAS_MAOS = 'modelos/modelo_info_duas_maos.pkl'
+DATASET_DUAS_MAOS = 'gestos_libras_duas_maos.csv'
+
+
+class ClassificadorPorMaos:
+    """Modelo de uma mão + modelo de duas mãos com a interface do sklearn"""
+
+    def __init__(self, uma_mao, duas_maos):
+        self.modelos = {N_FEATURES: uma_mao, N_FEATURES_DUAS_MAOS: duas_maos}
+        self.classes_ = np.array(sorted({str(c) for m in self.modelos.values() for c in m.classes_}),
+                                 dtype=object)
+        # O autoteste e o n_features_in_ esperado pelo app são os de uma mão
+        self.n_features_in_ = N_FEATURES
+        posicao = {c: i for i, c in enumerate(self.classes_)}
+        self._indices = {n: np.array([posicao[str(c)] for c in m.classes_])
+                         for n, m in self.modelos.items()}
+
+    def _modelo(self, X):
+        modelo = self.modelos.get(X.shape[1])
+        if modelo is None:
+            raise ValueError(f"Vetor com {X.shape[1]} features: esperado "
+                             f"{N_FEATURES} (uma mão) ou {N_FEATURES_DUAS_MAOS} (duas mãos)")
+        return modelo
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        probabilidades = np.zeros((len(X), len(self.classes_)))
+        probabilidades[:, self._indices[X.shape[1]]] = self._modelo(X).predict_proba(X)
+        return probabilidades
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def sem_contadores(self):
+        """Cópia para predições fora do tráfego (sombra): não mexe nos contadores"""
+        copia = copy.copy(self)
+        copia.modelos = {n: m.sem_contadores() if hasattr(m, 'sem_contadores') else m
+                         for n, m in self.modelos.items()}
+        return copia
+
+
+def combinar_model_info(roteador, info_uma, info_duas):
+    """model_info do ClassificadorPorMaos a partir dos dois model_info
+
+    Limiares: o maior dos dois para classes que aparecem nos dois
+    modelos. Matriz de confusão: bloco diagonal na ordem da união (um
+    sinal de uma mão nunca é confundido com um de duas, pois os
+    classificadores nunca competem no mesmo frame).
+    """
+    classes = [str(c) for c in roteador.classes_]
+    posicao = {c: i for i, c in enumerate(classes)}
+    limiares = {}
+    confusao = np.zeros((len(classes), len(classes)))
+    confusao_completa = True
+    for n, info in ((N_FEATURES, info_uma), (N_FEATURES_DUAS_MAOS, info_duas)):
+        for classe, limiar in (info.get('limiares') or {}).items():
+            limiares[str(classe)] = max(limiar, limiares.get(str(classe), 0.0))
+        classes_modelo = [str(c) for c in roteador.modelos[n].classes_]
+        matriz = info.get('confusion_matrix')
+        if matriz and [str(c) for c in info.get('classes', [])] == classes_modelo:
+            indices = [posicao[c] for c in classes_modelo]
+            confusao[np.ix_(indices, indices)] += np.asarray(matriz)
+        else:
+            confusao_completa = False
+
+    return dict(info_uma,
+                classes=classes,
+                limiares=limiares or None,
+                confusion_matrix=confusao.tolist() if confusao_completa else None,
+                duas_maos={k: info_duas.get(k) for k in ('classes', 'n_features', 'test_accuracy')})
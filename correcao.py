@@ -0,0 +1,207 @@
+"""
+Correção de texto do TraduLibras no servidor
+
+Substitui a correção feita no navegador (que refazia todas as janelas de
+2 a 8 letras contra o dicionário inteiro a cada letra nova) por:
+
+- um índice de deleções no estilo SymSpell, montado uma vez ao carregar
+  o léxico: a busca de uma palavra gera só as deleções dela e consulta
+  um dicionário, em vez de comparar com todas as palavras;
+- decodificação incremental: as palavras já fechadas não são
+  reprocessadas, apenas a palavra em aberto.
+
+Dígitos que o modelo confunde com letras (0/O, 1/I, 5/S, 8/B, a tabela
+que a página usava) custam meia edição: D1A vira DIA, não DA.
+
+O léxico é um arquivo "palavra frequência" (dados/lexico_pt.txt por
+padrão ou o caminho em TRADULIBRAS_LEXICO).
+"""
+
+import os
+import unicodedata
+
+LEXICO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados', 'lexico_pt.txt')
+
+# Dígito reconhecido no lugar da letra parecida
+CONFUSOES_DIGITOS = {'0': 'O', '1': 'I', '5': 'S', '8': 'B'}
+CUSTO_CONFUSAO = 0.5
+
+
+def normalizar_palavra(palavra):
+    """Maiúsculas sem acentos, como as letras reconhecidas pelo modelo"""
+    sem_acentos = unicodedata.normalize('NFKD', palavra)
+    sem_acentos = ''.join(c for c in sem_acentos if not unicodedata.combining(c))
+    return sem_acentos.strip().upper()
+
+
+def distancia_limitada(a, b, maximo):
+    """Distância de Damerau-Levenshtein (transposição adjacente) até `maximo`
+
+    Trocar um dígito de CONFUSOES_DIGITOS pela letra parecida custa
+    CUSTO_CONFUSAO. Retorna maximo + 1 assim que a distância passa do limite.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        atual = [i] + [0] * len(b)
+        menor = atual[0]
+        for j in range(1, len(b) + 1):
+            if a[i - 1] == b[j - 1]:
+                custo = 0
+            else:
+                custo = CUSTO_CONFUSAO if CONFUSOES_DIGITOS.get(a[i - 1]) == b[j - 1] else 1
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + custo)
+            if (anterior2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                atual[j] = min(atual[j], anterior2[j - 2] + 1)
+            menor = min(menor, atual[j])
+        if menor > maximo:
+            return maximo + 1
+        anterior2, anterior = anterior, atual
+    return anterior[-1]
+
+
+def _delecoes(palavra, distancia):
+    """Todas as variações da palavra com até `distancia` letras removidas"""
+    resultado = {palavra}
+    fronteira = {palavra}
+    for _ in range(distancia):
+        proxima = set()
+        for p in fronteira:
+            for i in range(len(p)):
+                proxima.add(p[:i] + p[i + 1:])
+        resultado |= proxima
+        fronteira = proxima
+    return resultado
+
+
+class Lexico:
+    """Léxico com índice de deleções (SymSpell) e conjunto de prefixos"""
+
+    def __init__(self, distancia_maxima=2):
+        self.distancia_maxima = distancia_maxima
+        self.frequencias = {}
+        self.indice = {}
+        self.prefixos = set()
+
+    @classmethod
+    def carregar(cls, caminho=None, distancia_maxima=2):
+        """Carrega um arquivo "palavra [frequência]" e monta os índices"""
+        caminho = caminho or os.environ.get('TRADULIBRAS_LEXICO') or LEXICO_PADRAO
+        lexico = cls(distancia_maxima)
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                if not linha.strip() or linha.startswith('#'):
+                    continue
+                partes = linha.split()
+                frequencia = int(partes[1]) if len(partes) > 1 and partes[1].isdigit() else 1
+                lexico.adicionar(partes[0], frequencia)
+        return lexico
+
+    def adicionar(self, palavra, frequencia=1):
+        palavra = normalizar_palavra(palavra)
+        if not palavra.isalpha():
+            return
+        if palavra in self.frequencias:
+            self.frequencias[palavra] = max(self.frequencias[palavra], frequencia)
+            return
+        self.frequencias[palavra] = frequencia
+        for delecao in _delecoes(palavra, self.distancia_maxima):
+            self.indice.setdefault(delecao, []).append(palavra)
+        for i in range(1, len(palavra) + 1):
+            self.prefixos.add(palavra[:i])
+
+    def __contains__(self, palavra):
+        return palavra in self.frequencias
+
+    def __len__(self):
+        return len(self.frequencias)
+
+    def e_prefixo(self, texto):
+        return texto in self.prefixos
+
+    def sugestoes(self, palavra, distancia_maxima=None):
+        """Palavras do léxico a até `distancia_maxima`, ordenadas por (distância, -frequência)"""
+        palavra = normalizar_palavra(palavra)
+        if distancia_maxima is None:
+            # Palavras curtas toleram só um erro
+            distancia_maxima = 1 if len(palavra) <= 3 else self.distancia_maxima
+        if palavra in self.frequencias:
+            return [(palavra, 0)]
+
+        candidatos = {}
+        for delecao in _delecoes(palavra, distancia_maxima):
+            for candidata in self.indice.get(delecao, ()):
+                if candidata in candidatos:
+                    continue
+                candidatos[candidata] = distancia_limitada(palavra, candidata, distancia_maxima)
+        resultado = [(c, d) for c, d in candidatos.items() if d <= distancia_maxima]
+        resultado.sort(key=lambda item: (item[1], -self.frequencias[item[0]]))
+        return resultado
+
+    def corrigir(self, palavra):
+        """Melhor correção da palavra (ou a própria palavra se nada estiver perto)"""
+        sugestoes = self.sugestoes(palavra)
+        return sugestoes[0][0] if sugestoes else normalizar_palavra(palavra)
+
+
+class CorretorIncremental:
+    """Corrige o texto conforme as letras chegam, reprocessando só a palavra aberta
+
+    Sem gesto de espaço, a palavra aberta é fechada quando a próxima letra
+    não continua nenhuma palavra do léxico e a palavra atual já é uma
+    palavra conhecida.
+    """
+
+    def __init__(self, lexico):
+        self.lexico = lexico
+        self.limpar()
+
+    def limpar(self):
+        self.palavras_brutas = []
+        self.palavras_corrigidas = []
+        self.palavra_aberta = ''
+        self.correcao_aberta = ''
+
+    def _fechar(self):
+        if self.palavra_aberta:
+            self.palavras_brutas.append(self.palavra_aberta)
+            self.palavras_corrigidas.append(self.correcao_aberta)
+        self.palavra_aberta = ''
+        self.correcao_aberta = ''
+
+    def adicionar_letra(self, letra):
+        """Acrescenta uma letra (ou ' ' para fechar a palavra) e atualiza a correção"""
+        letra = normalizar_palavra(str(letra)) if str(letra).strip() else ' '
+        if letra == ' ':
+            self._fechar()
+            return self.texto_corrigido()
+
+        # Dígitos no meio de palavras costumam ser letras confundidas (0/O, 1/I)
+        # e não fecham a palavra aberta
+        continuacao = self.palavra_aberta + letra
+        if (self.palavra_aberta and letra.isalpha() and not self.lexico.e_prefixo(continuacao)
+                and self.palavra_aberta in self.lexico):
+            self._fechar()
+            continuacao = letra
+
+        self.palavra_aberta = continuacao
+        self.correcao_aberta = self.lexico.corrigir(continuacao)
+        return self.texto_corrigido()
+
+    def texto_bruto(self):
+        return ' '.join(self.palavras_brutas + ([self.palavra_aberta] if self.palavra_aberta else []))
+
+    def texto_corrigido(self):
+        palavras = self.palavras_corrigidas + ([self.correcao_aberta] if self.correcao_aberta else [])
+        return ' '.join(palavras)
+
+
+def corrigir_texto(texto, lexico):
+    """Corrige um texto inteiro (usado para textos colados ou simulados)"""
+    corretor = CorretorIncremental(lexico)
+    for caractere in texto:
+        corretor.adicionar_letra(caractere)
+    return corretor.texto_corrigido()
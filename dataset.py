@@ -0,0 +1,120 @@
+"""
+Armazenamento do dataset de gestos do TraduLibras
+Mantém o formato do gestos_libras.csv (label, point_0 ... point_62);
+datasets de duas mãos usam o mesmo formato com point_0 ... point_125
+"""
+
+import csv
+import os
+from collections import Counter
+
+import numpy as np
+
+from features import FEATURE_COLUMNS, colunas_features
+
+DATASET_PADRAO = 'gestos_libras.csv'
+
+
+class DatasetStore:
+    """Acesso ao arquivo CSV de amostras rotuladas"""
+
+    def __init__(self, caminho=DATASET_PADRAO):
+        self.caminho = caminho
+
+    def existe(self):
+        """Verifica se o arquivo existe e tem conteúdo"""
+        return os.path.exists(self.caminho) and os.path.getsize(self.caminho) > 0
+
+    def colunas(self):
+        """Retorna as colunas de features do arquivo (ou as padrão se não existir)"""
+        if not self.existe():
+            return list(FEATURE_COLUMNS)
+        with open(self.caminho, 'r', newline='', encoding='utf-8') as f:
+            cabecalho = next(csv.reader(f))
+        return [col for col in cabecalho if col != 'label']
+
+    def adicionar(self, labels, X, digitos=6):
+        """Acrescenta amostras ao final do arquivo sem reescrever o que já existe
+
+        `digitos` são os algarismos significativos gravados por feature.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) == 0:
+            return 0
+
+        novo = not self.existe()
+        colunas = colunas_features(X.shape[1]) if novo else self.colunas()
+        if X.shape[1] != len(colunas):
+            raise ValueError(
+                f"Amostras com {X.shape[1]} features, dataset espera {len(colunas)}"
+            )
+
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        with open(self.caminho, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if novo:
+                writer.writerow(['label'] + colunas)
+            formato = f'.{int(digitos)}g'
+            for label, linha in zip(labels, X):
+                writer.writerow([label] + [format(v, formato) for v in linha])
+        return len(X)
+
+    def contar_linhas(self):
+        """Conta as amostras do arquivo sem interpretar os valores"""
+        if not self.existe():
+            return 0
+        with open(self.caminho, 'rb') as f:
+            linhas = sum(1 for linha in f if linha.strip())
+        return max(0, linhas - 1)
+
+    def iterar_lotes(self, tamanho_lote=4096):
+        """Percorre o arquivo em lotes (X float32, y) sem carregar tudo na memória"""
+        if not self.existe():
+            return
+        with open(self.caminho, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            cabecalho = next(reader)
+            idx_label = cabecalho.index('label')
+            idx_features = [i for i, col in enumerate(cabecalho) if col != 'label']
+
+            X = np.empty((tamanho_lote, len(idx_features)), dtype=np.float32)
+            y = []
+            for linha in reader:
+                if not linha:
+                    continue
+                X[len(y)] = [linha[i] for i in idx_features]
+                y.append(linha[idx_label])
+                if len(y) == tamanho_lote:
+                    yield X.copy(), np.array(y)
+                    y = []
+            if y:
+                yield X[:len(y)].copy(), np.array(y)
+
+    def carregar(self, tamanho_lote=4096):
+        """Carrega o dataset inteiro como float32 em um único array pré-alocado"""
+        n = self.contar_linhas()
+        X = np.empty((n, len(self.colunas())), dtype=np.float32)
+        y = np.empty(n, dtype=object)
+        pos = 0
+        for X_lote, y_lote in self.iterar_lotes(tamanho_lote):
+            X[pos:pos + len(X_lote)] = X_lote
+            y[pos:pos + len(y_lote)] = y_lote
+            pos += len(X_lote)
+        return X[:pos], y[:pos].astype(str)
+
+    def contar_por_classe(self):
+        """Conta amostras por classe lendo apenas a coluna de label"""
+        contagem = Counter()
+        if not self.existe():
+            return contagem
+        with open(self.caminho, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            cabecalho = next(reader)
+            idx_label = cabecalho.index('label')
+            for linha in reader:
+                if linha:
+                    contagem[linha[idx_label]] += 1
+        return contagem
@@ -0,0 +1,169 @@
+"""
+Decodificação de palavras por beam search a partir das probabilidades do modelo
+
+Em vez de corrigir só a letra mais provável de cada gesto, o decodificador
+recebe a distribuição do predict_proba de cada letra e combina:
+
+- a matriz de confusão medida no conjunto de teste durante o treino
+  (P(predita | verdadeira)), que substitui a tabela fixa de confusões
+  como 0->O e 5->S;
+- um modelo de linguagem de caracteres (bigramas) e de palavras, ambos
+  derivados do léxico de correcao.py.
+
+O beam é mantido entre as letras, então cada letra nova custa
+O(largura do beam x letras candidatas). Largura do beam e caches do
+modelo de linguagem são limitados para manter cada letra em poucos ms.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from correcao import normalizar_palavra
+
+INICIO = '^'
+
+
+def matriz_confusao(y_real, y_predito, classes):
+    """Contagens [verdadeira][predita] na ordem de `classes` (salva no model_info)"""
+    posicao = {str(c): i for i, c in enumerate(classes)}
+    matriz = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    for real, predito in zip(y_real, y_predito):
+        if str(real) in posicao and str(predito) in posicao:
+            matriz[posicao[str(real)], posicao[str(predito)]] += 1
+    return matriz.tolist()
+
+
+class ModeloLinguagem:
+    """Bigramas de caracteres e unigramas de palavras derivados do léxico"""
+
+    def __init__(self, lexico, peso_palavra=0.3, logp_desconhecida=-6.0, tamanho_cache=4096):
+        self.lexico = lexico
+        self.peso_palavra = peso_palavra
+        self.logp_desconhecida = logp_desconhecida
+
+        contagens = {}
+        for palavra, frequencia in lexico.frequencias.items():
+            peso = math.log1p(frequencia)
+            anterior = INICIO
+            for letra in palavra:
+                contagens.setdefault(anterior, {}).setdefault(letra, 0.0)
+                contagens[anterior][letra] += peso
+                anterior = letra
+        self.contagens = contagens
+        self.totais = {a: sum(c.values()) for a, c in contagens.items()}
+        self.total_palavras = sum(lexico.frequencias.values()) or 1
+
+        # Caches limitados por instância
+        self.logp_caractere = lru_cache(maxsize=tamanho_cache)(self._logp_caractere)
+        self.logp_palavra = lru_cache(maxsize=tamanho_cache)(self._logp_palavra)
+
+    def _logp_caractere(self, anterior, letra):
+        """log P(letra | anterior) com suavização add-one"""
+        contagem = self.contagens.get(anterior, {}).get(letra, 0.0)
+        total = self.totais.get(anterior, 0.0)
+        return math.log((contagem + 1.0) / (total + 37.0))  # A-Z, 0-9 e fim
+
+    def _logp_palavra(self, palavra):
+        """Custo de fechar a palavra: frequência relativa ou penalidade de desconhecida"""
+        frequencia = self.lexico.frequencias.get(palavra)
+        if frequencia is None:
+            return self.logp_desconhecida
+        return self.peso_palavra * math.log(frequencia / self.total_palavras)
+
+    def e_prefixo(self, texto):
+        return self.lexico.e_prefixo(texto)
+
+
+class DecodificadorBeam:
+    """Mantém as hipóteses de texto mais prováveis conforme as letras chegam"""
+
+    def __init__(self, classes, modelo_linguagem, confusao=None, largura_beam=8,
+                 letras_por_passo=4, peso_caractere=0.3, logp_fora_prefixo=-3.0,
+                 logp_letra_fora=-1.5, logp_espaco=-4.0):
+        self.classes = [normalizar_palavra(str(c)) for c in classes]
+        self.lm = modelo_linguagem
+        self.largura_beam = largura_beam
+        self.letras_por_passo = letras_por_passo
+        self.peso_caractere = peso_caractere
+        self.logp_fora_prefixo = logp_fora_prefixo
+        self.logp_letra_fora = logp_letra_fora
+        # Não há gesto de espaço: dividir a sequência em palavras tem custo
+        self.logp_espaco = logp_espaco
+
+        n = len(self.classes)
+        confusao = np.zeros((n, n)) if confusao is None else np.asarray(confusao, dtype=np.float64)
+        # P(predita | verdadeira): contagens + 1 acerto a priori (classes sem
+        # amostras de teste) + suavização, linhas somando 1
+        confusao = confusao + np.eye(n) + 1e-3
+        self.confusao = confusao / confusao.sum(axis=1, keepdims=True)
+        self.limpar()
+
+    def limpar(self):
+        # Hipótese: (palavras fechadas, palavra aberta) -> log score
+        self.beam = {((), ''): 0.0}
+
+    def emissao(self, probabilidades):
+        """P(letra verdadeira | saída do classificador) para cada classe"""
+        q = np.asarray(probabilidades, dtype=np.float64)
+        verossimilhanca = self.confusao @ q
+        return verossimilhanca / verossimilhanca.sum()
+
+    def adicionar(self, probabilidades):
+        """Consome a distribuição de uma letra e atualiza o beam"""
+        emissao = self.emissao(probabilidades)
+        candidatas = np.argsort(emissao)[::-1][:self.letras_por_passo]
+
+        novo_beam = {}
+
+        def _manter(chave, score):
+            if score > novo_beam.get(chave, -math.inf):
+                novo_beam[chave] = score
+
+        for (palavras, aberta), score in self.beam.items():
+            anterior = aberta[-1] if aberta else INICIO
+            for i in candidatas:
+                letra = self.classes[i]
+                logp = math.log(emissao[i])
+
+                # Continuar a palavra aberta
+                continuacao = aberta + letra
+                custo = self.peso_caractere * self.lm.logp_caractere(anterior, letra)
+                # Sair do léxico custa caro uma vez e pouco a cada letra seguinte,
+                # para nomes próprios não perderem para divisões em palavras curtas
+                if not self.lm.e_prefixo(continuacao):
+                    custo += self.logp_letra_fora
+                    if not aberta or self.lm.e_prefixo(aberta):
+                        custo += self.logp_fora_prefixo
+                _manter((palavras, continuacao), score + logp + custo)
+
+                # Fechar a palavra aberta e começar outra com esta letra
+                if aberta:
+                    custo = (self.lm.logp_palavra(aberta) + self.logp_espaco
+                             + self.peso_caractere * self.lm.logp_caractere(INICIO, letra))
+                    _manter((palavras + (aberta,), letra), score + logp + custo)
+
+        melhores = sorted(novo_beam.items(), key=lambda item: item[1], reverse=True)
+        self.beam = dict(melhores[:self.largura_beam])
+        return self.melhor()
+
+    def melhor(self):
+        """(texto, confiança) da melhor hipótese considerando o fim da palavra aberta"""
+        finais = []
+        for (palavras, aberta), score in self.beam.items():
+            if aberta:
+                score += self.lm.logp_palavra(aberta)
+                palavras = palavras + (aberta,)
+            finais.append((' '.join(palavras), score))
+        if not finais:
+            return '', 0.0
+
+        scores = np.array([s for _, s in finais])
+        pesos = np.exp(scores - scores.max())
+        # Hipóteses diferentes podem gerar o mesmo texto
+        por_texto = {}
+        for (texto, _), peso in zip(finais, pesos):
+            por_texto[texto] = por_texto.get(texto, 0.0) + peso
+        texto, peso = max(por_texto.items(), key=lambda item: item[1])
+        return texto, float(peso / pesos.sum())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Destilação do modelo do TraduLibras em um classificador compacto
+
+O professor (a floresta de modelos/modelo_libras_expandido.pkl) rotula o
+dataset e cópias levemente perturbadas dele com probabilidades (soft
+labels). Alunos bem menores aprendem essas probabilidades e o melhor
+compromisso entre acurácia e latência é salvo em
+modelos/modelo_libras_compacto.pkl, que o app carrega por padrão enquanto
+o professor em disco for o mesmo da destilação (o SHA-256 dele fica no
+model_info do aluno); depois de um novo treino o app volta à floresta até
+a próxima destilação.
+
+Uso:
+    python destilacao.py --dataset gestos_libras.csv --aumento 2
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.neural_network import MLPRegressor
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+from aumento import AumentoLandmarks, ajustar
+from dataset import DATASET_PADRAO, DatasetStore
+from decodificador import matriz_confusao
+from reconhecimento import aprender_limiares
+from treinamento import CAMINHO_INFO, CAMINHO_MODELO, definir_n_jobs, medir_latencia, salvar_modelo
+
+CAMINHO_MODELO_COMPACTO = 'modelos/modelo_libras_compacto.pkl'
+CAMINHO_INFO_COMPACTO = 'modelos/modelo_info_compacto.pkl'
+
+# Pulso e pontas dos dedos (polegar, indicador, médio, anelar, mínimo)
+PONTOS_CHAVE = [0, 4, 8, 12, 16, 20]
+_PARES_CHAVE = [(a, b) for i, a in enumerate(PONTOS_CHAVE) for b in PONTOS_CHAVE[i + 1:]]
+
+
+def features_engenheiradas(X):
+    """Acrescenta às 63 coordenadas as distâncias entre pulso e pontas dos dedos"""
+    X = np.asarray(X, dtype=np.float32)
+    pontos = X[:, :63].reshape(len(X), 21, 3)
+    a = pontos[:, [p[0] for p in _PARES_CHAVE]]
+    b = pontos[:, [p[1] for p in _PARES_CHAVE]]
+    distancias = np.linalg.norm(a - b, axis=2)
+    return np.hstack([X, distancias])
+
+
+class ModeloDestilado:
+    """Aluno treinado para reproduzir as probabilidades do professor
+
+    Expõe a mesma interface usada pelo app (classes_, n_features_in_,
+    predict e predict_proba).
+    """
+
+    def __init__(self, regressor, classes):
+        self.regressor = regressor
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = None
+
+    def fit(self, X, probabilidades):
+        self.regressor.fit(X, probabilidades)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def predict_proba(self, X):
+        scores = np.clip(self.regressor.predict(X), 0.0, None).reshape(len(X), -1)
+        soma = scores.sum(axis=1, keepdims=True)
+        soma[soma == 0] = 1.0
+        return scores / soma
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.regressor.predict(X).reshape(len(X), -1), axis=1)]
+
+
+def conjunto_transferencia(X, multiplicador=2, ruido=0.02, seed=42):
+    """Dataset original mais cópias com ruído gaussiano para o professor rotular"""
+    rng = np.random.default_rng(seed)
+    copias = [X]
+    for _ in range(multiplicador):
+        copias.append(X + rng.normal(scale=ruido, size=X.shape).astype(np.float32))
+    return np.vstack(copias)
+
+
+def gerar_alunos(classes):
+    """Lista (nome, fábrica) dos alunos candidatos"""
+
+    def _mlp(X, probs, y_prof):
+        regressor = make_pipeline(
+            StandardScaler(),
+            MLPRegressor(hidden_layer_sizes=(64,), max_iter=300, early_stopping=True,
+                         random_state=42)
+        )
+        return ModeloDestilado(regressor, classes).fit(X, probs)
+
+    def _floresta_rasa(X, probs, y_prof):
+        regressor = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=42,
+                                          n_jobs=-1)
+        aluno = ModeloDestilado(regressor, classes).fit(X, probs)
+        regressor.set_params(n_jobs=1)
+        return aluno
+
+    def _logistica(X, probs, y_prof):
+        # Rótulos do professor ponderados pela confiança dele
+        modelo = make_pipeline(
+            FunctionTransformer(features_engenheiradas),
+            StandardScaler(),
+            LogisticRegression(max_iter=2000)
+        )
+        modelo.fit(X, y_prof, logisticregression__sample_weight=probs.max(axis=1))
+        return modelo
+
+    return [
+        ("MLP(64)", _mlp),
+        ("Floresta rasa (20 árvores, depth=8)", _floresta_rasa),
+        ("Logística + distâncias", _logistica),
+    ]
+
+
+def tamanho_pickle(modelo):
+    """Tamanho serializado do modelo em MB"""
+    return len(pickle.dumps(modelo)) / 1e6
+
+
+def impressao_professor(caminho):
+    """SHA-256 do arquivo do professor"""
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def aluno_atualizado(info_aluno):
+    """(atualizado, motivo): o aluno foi destilado do professor que está em disco?"""
+    professor = info_aluno.get('distilled_from')
+    esperado = info_aluno.get('teacher_sha256')
+    if not professor or not esperado:
+        return False, "model_info sem o SHA-256 do professor"
+    if not os.path.exists(professor):
+        return False, f"professor {professor} não encontrado"
+    if impressao_professor(professor) != esperado:
+        return False, f"{professor} mudou desde a destilação"
+    return True, ''
+
+
+def referencia_professor(professor, info_professor, X_treino, y_treino, X_teste, y_teste):
+    """(acurácia, origem) do professor comparável à dos alunos
+
+    O professor servido foi re-treinado com o dataset inteiro, teste
+    incluído: a acurácia dele no teste seria a de treino. Uma cópia
+    treinada só com X_treino mede no mesmo teste dos alunos; se o
+    professor não puder ser re-treinado, vale a acurácia da validação
+    cruzada do model_info.
+    """
+    try:
+        copia = definir_n_jobs(clone(professor), -1)
+        # Treinado como o professor: com o mesmo aumento de dados, se houve
+        parametros = info_professor.get('aumento')
+        ajustar(copia, X_treino, y_treino, AumentoLandmarks(**parametros) if parametros else None)
+        return float(np.mean(copia.predict(X_teste) == y_teste)), 'held_out'
+    except Exception as e:
+        if info_professor.get('cv_accuracy') is not None:
+            print(f"⚠️ Professor não re-treinável ({e}): referência é a validação cruzada")
+            return float(info_professor['cv_accuracy']), 'cv'
+        print(f"⚠️ Professor não re-treinável ({e}) e sem cv_accuracy: referência otimista")
+        return float(np.mean(professor.predict(X_teste) == y_teste)), 'treino'
+
+
+def parametros_aluno(aluno):
+    """Hiperparâmetros do estimador final do aluno"""
+    estimador = aluno.regressor if isinstance(aluno, ModeloDestilado) else aluno
+    if isinstance(estimador, Pipeline):
+        estimador = estimador.steps[-1][1]
+    return estimador.get_params()
+
+
+def destilar(caminho_dataset=DATASET_PADRAO, caminho_professor=CAMINHO_MODELO,
+             caminho_info=CAMINHO_INFO, multiplicador=2, tolerancia=0.01):
+    """Treina os alunos, mostra o compromisso acurácia x latência e salva o melhor"""
+    sha256_professor = impressao_professor(caminho_professor)
+    with open(caminho_professor, 'rb') as f:
+        professor = pickle.load(f)
+    try:
+        with open(caminho_info, 'rb') as f:
+            info_professor = pickle.load(f)
+    except Exception:
+        info_professor = {}
+
+    X, y = DatasetStore(caminho_dataset).carregar()
+    if len(X) == 0:
+        print(f"❌ Dataset vazio ou inexistente: {caminho_dataset}")
+        return None
+    X_treino, X_teste, y_treino, y_teste = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    classes = professor.classes_
+    X_transf = conjunto_transferencia(X_treino, multiplicador)
+    probs = professor.predict_proba(X_transf)
+    y_prof = classes[np.argmax(probs, axis=1)]
+    print(f"👨‍🏫 Professor rotulou {len(X_transf)} amostras ({len(X_treino)} originais "
+          f"+ {multiplicador}x com ruído)")
+
+    pred_professor = professor.predict(X_teste)
+    acuracia_professor, origem_referencia = referencia_professor(
+        professor, info_professor, X_treino, y_treino, X_teste, y_teste)
+    resultados = [{
+        'nome': f"Professor ({type(professor).__name__})",
+        'modelo': professor,
+        'accuracy': acuracia_professor,
+        'pred': pred_professor,
+        'concordancia': 1.0,
+        'latencia_ms': medir_latencia(professor, X_teste)[0],
+        'tamanho_mb': tamanho_pickle(professor),
+    }]
+
+    for nome, fabrica in gerar_alunos(classes):
+        inicio = time.perf_counter()
+        aluno = fabrica(X_transf, probs, y_prof)
+        pred = aluno.predict(X_teste)
+        resultados.append({
+            'nome': nome,
+            'modelo': aluno,
+            'accuracy': float(np.mean(pred == y_teste)),
+            'pred': pred,
+            'concordancia': float(np.mean(pred == pred_professor)),
+            'latencia_ms': medir_latencia(aluno, X_teste)[0],
+            'tamanho_mb': tamanho_pickle(aluno),
+            'tempo_treino_s': time.perf_counter() - inicio,
+        })
+
+    print("\n⚖️ Acurácia x latência (conjunto de teste):")
+    print(f"{'Modelo':<40} {'Acurácia':>9} {'Concord.':>9} {'ms':>8} {'MB':>8}")
+    for r in resultados:
+        print(f"{r['nome']:<40} {r['accuracy']:>9.2%} {r['concordancia']:>9.2%} "
+              f"{r['latencia_ms']:>8.3f} {r['tamanho_mb']:>8.2f}")
+
+    # Entre os alunos que perdem no máximo `tolerancia` de acurácia, o mais rápido
+    alunos = resultados[1:]
+    limite = resultados[0]['accuracy'] - tolerancia
+    aceitos = [r for r in alunos if r['accuracy'] >= limite]
+    if not aceitos:
+        print(f"\n⚠️ Nenhum aluno ficou a menos de {tolerancia:.1%} do professor; "
+              "o mais preciso será salvo mesmo assim")
+        aceitos = [max(alunos, key=lambda r: r['accuracy'])]
+    melhor = min(aceitos, key=lambda r: r['latencia_ms'])
+
+    # Só o que é do aluno; do professor vem apenas como o app monta as features
+    model_info = {
+        'classes': [str(c) for c in classes],
+        'n_features': X.shape[1],
+        'n_samples': len(X_transf),
+        'test_accuracy': melhor['accuracy'],
+        'teacher_agreement': melhor['concordancia'],
+        'latencia_ms': melhor['latencia_ms'],
+        'model_name': melhor['nome'],
+        'params': parametros_aluno(melhor['modelo']),
+        'distilled_from': caminho_professor,
+        'teacher_sha256': sha256_professor,
+        'teacher_accuracy': acuracia_professor,
+        'teacher_accuracy_source': origem_referencia,
+        'teacher_latencia_ms': resultados[0]['latencia_ms'],
+        'confusion_matrix': matriz_confusao(y_teste, melhor['pred'], classes),
+        'limiares': aprender_limiares(melhor['modelo'].predict_proba(X_teste), y_teste, classes),
+        'vocabulary_type': info_professor.get('vocabulary_type', 'expanded'),
+        'canonizar_mao': bool(info_professor.get('canonizar_mao')),
+    }
+    print(f"\n🎓 Aluno escolhido: {melhor['nome']} "
+          f"({resultados[0]['latencia_ms'] / max(melhor['latencia_ms'], 1e-9):.1f}x mais rápido)")
+    salvar_modelo(melhor['modelo'], model_info, CAMINHO_MODELO_COMPACTO, CAMINHO_INFO_COMPACTO)
+    return melhor['modelo'], model_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Destila o modelo em um classificador compacto")
+    parser.add_argument('--dataset', default=DATASET_PADRAO, help="CSV de amostras")
+    parser.add_argument('--professor', default=CAMINHO_MODELO, help="Modelo professor")
+    parser.add_argument('--info', default=CAMINHO_INFO, help="model_info do professor")
+    parser.add_argument('--aumento', type=int, default=2,
+                        help="Cópias com ruído do treino rotuladas pelo professor")
+    parser.add_argument('--tolerancia', type=float, default=0.01,
+                        help="Perda de acurácia aceita em relação ao professor")
+    args = parser.parse_args()
+
+    print("🚀 TraduLibras - Destilação de Modelo")
+    # Importa pelo nome do módulo para que o pickle referencie
+    # destilacao.ModeloDestilado (e não __main__.ModeloDestilado)
+    import destilacao
+    destilacao.destilar(args.dataset, args.professor, args.info, args.aumento, args.tolerancia)
+
+
+if __name__ == "__main__":
+    main()
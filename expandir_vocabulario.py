@@ -8,11 +8,23 @@ import cv2
 import mediapipe as mp
 import pandas as pd
 import numpy as np
+import argparse
 import os
+import time
 from datetime import datetime
 
+from autocaptura import TAXA_PADRAO, CapturaAutomatica, GravadorAssincrono, desenhar_progresso
+from classificador_maos import DATASET_DUAS_MAOS
+from dataset import DatasetStore
+from features import ordenar_maos, process_duas_maos, process_landmarks
+from manutencao_dataset import RAIO_PADRAO, relatorio_classes
+
+# Versões do dataset (original + aumentadas) vistas pela floresta no treino
+MULTIPLICADOR_AUMENTO = 3
+
 class VocabularioExpansor:
-    def __init__(self):
+    def __init__(self, captura_automatica=False, taxa_captura=TAXA_PADRAO,
+                 diversidade_captura=RAIO_PADRAO):
         # Inicializar MediaPipe
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
@@ -21,7 +33,14 @@ class VocabularioExpansor:
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
         )
+        # Instância com duas mãos criada só na coleta de sinais com duas mãos
+        self.hands_duas_maos = None
         self.mp_draw = mp.solutions.drawing_utils
+        # Captura sem tecla (autocaptura.py): amostras por segundo e
+        # distância mínima entre amostras da mesma classe
+        self.captura_automatica = captura_automatica
+        self.taxa_captura = taxa_captura
+        self.diversidade_captura = diversidade_captura
         
         # Vocabulário expandido
         self.letras_completas = [
@@ -56,89 +75,170 @@ class VocabularioExpansor:
             print(f"❌ Erro ao carregar dados: {e}")
     
     def processar_landmarks(self, hand_landmarks):
-        """Processa landmarks da mão e normaliza"""
-        p0 = hand_landmarks.landmark[0]  # Ponto de referência (pulso)
-        points = []
-        for landmark in hand_landmarks.landmark:
-            points.extend([
-                landmark.x - p0.x,
-                landmark.y - p0.y,
-                landmark.z - p0.z
-            ])
-        return points
+        """Processa landmarks da mão e normaliza (mesmo pipeline do servidor)"""
+        points = process_landmarks(hand_landmarks)
+        return [] if points is None else list(points)
     
-    def coletar_gestos(self, vocabulario, nome_arquivo):
-        """Coleta gestos para um vocabulário específico"""
+    def coletar_gestos(self, vocabulario, nome_arquivo, duas_maos=False, automatico=None):
+        """Coleta gestos para um vocabulário específico
+
+        Com duas_maos=True, cada amostra exige as duas mãos e vira 126
+        features (mesmo pipeline do servidor no modo duas mãos). No modo
+        automático (autocaptura.py) não há tecla por amostra: frames com a
+        mão parada e pose nova são gravados direto em `nome_arquivo`, por
+        uma thread, e a lista retornada fica vazia.
+        """
+        automatico = self.captura_automatica if automatico is None else automatico
+        if duas_maos and self.hands_duas_maos is None:
+            self.hands_duas_maos = self.mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=2,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.7
+            )
+        hands = self.hands_duas_maos if duas_maos else self.hands
         print(f"\n🎯 Iniciando coleta para: {', '.join(vocabulario)}")
         print("📋 Instruções:")
         print("- Posicione sua mão no centro da câmera")
         print("- Faça o gesto da letra/número correspondente")
-        print("- Pressione ESPAÇO para capturar")
+        if automatico:
+            print("- Captura automática: segure a mão parada e varie a pose devagar")
+            print("- Pressione ESPAÇO para pausar/continuar")
+        else:
+            print("- Pressione ESPAÇO para capturar")
         print("- Pressione ESC para pular")
         print("- Pressione Q para sair")
         
         camera = cv2.VideoCapture(0)
         dados_coletados = []
+        meta_amostras = 700
+        store = DatasetStore(nome_arquivo)
+        contagem = store.contar_por_classe()
+        progresso = {item: contagem.get(item, 0) for item in vocabulario}
+        gravador = None
+        if automatico:
+            captura = CapturaAutomatica(self.taxa_captura, self.diversidade_captura)
+            gravador = GravadorAssincrono(store)
+            X_existente, y_existente = store.carregar() if store.existe() else (None, None)
         
-        for item in vocabulario:
-            print(f"\n📝 Coletando gestos para: {item}")
-            contador = 0
-            meta_amostras = 700
-            
-            while contador < meta_amostras:
-                ret, frame = camera.read()
-                if not ret:
-                    break
-                
-                # Processar frame
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(frame_rgb)
-                
-                # Desenhar informações
-                cv2.putText(frame, f"Letra: {item}", (10, 30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                cv2.putText(frame, f"Amostras: {contador}/{meta_amostras}", (10, 70), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-                cv2.putText(frame, "ESPACO: Capturar | ESC: Pular | Q: Sair", (10, 110), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                
-                # Desenhar landmarks se detectados
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        self.mp_draw.draw_landmarks(
-                            frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                
-                cv2.imshow('TraduLibras - Coleta de Gestos', frame)
-                
-                key = cv2.waitKey(1) & 0xFF
+        try:
+            for item in vocabulario:
+                print(f"\n📝 Coletando gestos para: {item}")
+                # No automático a meta conta o que o dataset já tem da classe
+                contador = progresso[item] if automatico else 0
+                if automatico:
+                    captura.reiniciar(X_existente[y_existente == item]
+                                      if X_existente is not None else None)
+                    pausado = False
                 
-                if key == ord(' '):  # Espaço - capturar
+                while contador < meta_amostras:
+                    ret, frame = camera.read()
+                    if not ret:
+                        break
+                    
+                    # Frame espelhado como no servidor (e no extrair_dataset.py):
+                    # uma ou duas mãos, teclado ou captura automática, as amostras
+                    # têm a mesma geometria e lateralidade do laço da câmera
+                    frame = cv2.flip(frame, 1)
+                    
+                    # Processar frame
+                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    results = hands.process(frame_rgb)
+                    
+                    if automatico and not pausado:
+                        features = None
+                        if results.multi_hand_landmarks and not duas_maos:
+                            features = process_landmarks(results.multi_hand_landmarks[0])
+                        elif results.multi_hand_landmarks and len(results.multi_hand_landmarks) == 2:
+                            features = process_duas_maos(ordenar_maos(results.multi_hand_landmarks,
+                                                                      results.multi_handedness))
+                        if captura.oferecer(features):
+                            gravador.gravar(item, features)
+                            contador += 1
+                            progresso[item] += 1
+                    
+                    # Desenhar informações
+                    cv2.putText(frame, f"Letra: {item}", (10, 30), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                    cv2.putText(frame, f"Amostras: {contador}/{meta_amostras}", (10, 70), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+                    instrucoes = ("ESPACO: Pausar | ESC: Pular | Q: Sair" if automatico
+                                  else "ESPACO: Capturar | ESC: Pular | Q: Sair")
+                    cv2.putText(frame, instrucoes, (10, 110), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                    
+                    # Desenhar landmarks se detectados
                     if results.multi_hand_landmarks:
-                        landmarks = self.processar_landmarks(results.multi_hand_landmarks[0])
-                        if len(landmarks) == 63:  # 21 pontos × 3 coordenadas
+                        for hand_landmarks in results.multi_hand_landmarks:
+                            self.mp_draw.draw_landmarks(
+                                frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                    
+                    if automatico:
+                        desenhar_progresso(frame, progresso, meta_amostras, item,
+                                           'pausado' if pausado else captura.estado,
+                                           captura.taxa_atual())
+                    else:
+                        desenhar_progresso(frame, progresso, meta_amostras, item)
+                    cv2.imshow('TraduLibras - Coleta de Gestos', frame)
+                    
+                    key = cv2.waitKey(1) & 0xFF
+                    
+                    if key == ord(' ') and automatico:  # Espaço - pausar/continuar
+                        pausado = not pausado
+                        print("⏸️ Captura pausada" if pausado else "▶️ Captura retomada")
+                    
+                    elif key == ord(' ') and duas_maos:  # Espaço - capturar as duas mãos
+                        if results.multi_hand_landmarks and len(results.multi_hand_landmarks) == 2:
+                            landmarks = process_duas_maos(ordenar_maos(results.multi_hand_landmarks,
+                                                                       results.multi_handedness))
                             dados_coletados.append({
                                 'label': item,
-                                **{f'point_{i}': landmarks[i] for i in range(63)}
+                                **{f'point_{i}': landmarks[i] for i in range(len(landmarks))}
                             })
                             contador += 1
+                            progresso[item] += 1
                             print(f"✅ Amostra {contador} capturada para {item}")
                         else:
-                            print("⚠️ Landmarks inválidos, tente novamente")
-                    else:
-                        print("⚠️ Mão não detectada, tente novamente")
-                
-                elif key == 27:  # ESC - pular
-                    print(f"⏭️ Pulando {item}")
-                    break
+                            print("⚠️ As duas mãos precisam aparecer, tente novamente")
+                    
+                    elif key == ord(' '):  # Espaço - capturar
+                        if results.multi_hand_landmarks:
+                            landmarks = self.processar_landmarks(results.multi_hand_landmarks[0])
+                            if len(landmarks) == 63:  # 21 pontos × 3 coordenadas
+                                dados_coletados.append({
+                                    'label': item,
+                                    **{f'point_{i}': landmarks[i] for i in range(63)}
+                                })
+                                contador += 1
+                                progresso[item] += 1
+                                print(f"✅ Amostra {contador} capturada para {item}")
+                            else:
+                                print("⚠️ Landmarks inválidos, tente novamente")
+                        else:
+                            print("⚠️ Mão não detectada, tente novamente")
+                    
+                    elif key == 27:  # ESC - pular
+                        print(f"⏭️ Pulando {item}")
+                        break
+                    
+                    elif key == ord('q'):  # Q - sair
+                        print("🚪 Saindo da coleta...")
+                        return dados_coletados
                 
-                elif key == ord('q'):  # Q - sair
-                    print("🚪 Saindo da coleta...")
-                    camera.release()
-                    cv2.destroyAllWindows()
-                    return dados_coletados
+                if automatico:
+                    print(f"✅ {item}: {captura.capturadas} amostras em "
+                          f"{time.monotonic() - captura.inicio:.0f}s "
+                          f"({captura.taxa_atual():.1f}/s)")
+        finally:
+            camera.release()
+            cv2.destroyAllWindows()
+            if gravador is not None:
+                gravadas = gravador.fechar()
+                print(f"💾 {gravadas} amostras gravadas em {nome_arquivo}"
+                      + (f" ({gravador.descartadas} descartadas)" if gravador.descartadas else ""))
+                # salvar_dados reescreve o CSV a partir daqui: inclui as automáticas
+                self.carregar_dados_existentes()
         
-        camera.release()
-        cv2.destroyAllWindows()
         return dados_coletados
     
     def salvar_dados(self, novos_dados, nome_arquivo):
@@ -164,12 +264,26 @@ class VocabularioExpansor:
         except Exception as e:
             print(f"❌ Erro ao salvar dados: {e}")
     
+    def salvar_dados_duas_maos(self, novos_dados):
+        """Acrescenta amostras de duas mãos ao dataset próprio (126 features)"""
+        try:
+            df = pd.DataFrame(novos_dados)
+            feature_columns = [col for col in df.columns if col != 'label']
+            DatasetStore(DATASET_DUAS_MAOS).adicionar(df['label'].tolist(), df[feature_columns].values)
+            print(f"✅ {len(df)} amostras salvas em {DATASET_DUAS_MAOS}")
+            print("🧠 Treine com: python treinamento.py --duas-maos")
+        except Exception as e:
+            print(f"❌ Erro ao salvar dados: {e}")
+    
     def treinar_modelo_expandido(self):
         """Treina modelo com vocabulário expandido"""
         try:
             from sklearn.model_selection import train_test_split
             from sklearn.ensemble import RandomForestClassifier
             import pickle
+            from aumento import AumentoLandmarks, ajustar
+            from decodificador import matriz_confusao
+            from reconhecimento import aprender_limiares
             
             print("\n🧠 Treinando modelo expandido...")
             
@@ -192,10 +306,16 @@ class VocabularioExpansor:
                 n_estimators=200,
                 max_depth=15,
                 min_samples_split=3,
-                random_state=42
+                random_state=42,
+                n_jobs=-1
             )
             
-            model.fit(X_train, y_train)
+            # Poucas amostras capturadas por tecla: cada fatia das árvores vê
+            # uma versão aumentada (girada, esticada, espelhada) do treino
+            aumento = AumentoLandmarks(MULTIPLICADOR_AUMENTO) if X.shape[1] == 63 else None
+            ajustar(model, X_train, y_train, aumento)
+            # Predições do app são de uma amostra por vez: sem pool de threads
+            model.set_params(n_jobs=1)
             
             # Avaliar
             train_acc = model.score(X_train, y_train)
@@ -204,6 +324,11 @@ class VocabularioExpansor:
             print(f"📈 Acurácia treino: {train_acc:.2%}")
             print(f"📈 Acurácia teste: {test_acc:.2%}")
             
+            # Confusões medidas no teste alimentam o decodificador de palavras
+            confusion = matriz_confusao(y_test, model.predict(X_test), model.classes_)
+            # Limiares de confiança por classe ("sem letra" abaixo deles)
+            limiares = aprender_limiares(model.predict_proba(X_test), y_test, model.classes_)
+            
             # Salvar modelo
             os.makedirs('modelos', exist_ok=True)
             with open('modelos/modelo_libras_expandido.pkl', 'wb') as f:
@@ -216,7 +341,10 @@ class VocabularioExpansor:
                 'train_accuracy': train_acc,
                 'test_accuracy': test_acc,
                 'n_samples': len(df),
-                'vocabulary_type': 'expanded'
+                'vocabulary_type': 'expanded',
+                'confusion_matrix': confusion,
+                'limiares': limiares,
+                'aumento': aumento.parametros() if aumento is not None else None
             }
             
             with open('modelos/modelo_info_expandido.pkl', 'wb') as f:
@@ -240,10 +368,12 @@ class VocabularioExpansor:
             print("3. 📚 Coletar vocabulário completo (letras + números)")
             print("4. 🧠 Treinar modelo expandido")
             print("5. 📊 Ver estatísticas atuais")
-            print("6. 🚪 Sair")
+            print("6. 🤲 Coletar sinais com duas mãos")
+            print(f"7. ⚡ Captura automática: {'ligada' if self.captura_automatica else 'desligada'}")
+            print("8. 🚪 Sair")
             print("="*60)
             
-            opcao = input("Escolha uma opção (1-6): ").strip()
+            opcao = input("Escolha uma opção (1-8): ").strip()
             
             if opcao == '1':
                 dados = self.coletar_gestos(self.letras_para_adicionar, 'gestos_libras.csv')
@@ -268,6 +398,19 @@ class VocabularioExpansor:
                 self.mostrar_estatisticas()
             
             elif opcao == '6':
+                sinais = input("Sinais (separados por vírgula): ").strip()
+                vocabulario = [s.strip().upper() for s in sinais.split(',') if s.strip()]
+                if vocabulario:
+                    dados = self.coletar_gestos(vocabulario, DATASET_DUAS_MAOS, duas_maos=True)
+                    if dados:
+                        self.salvar_dados_duas_maos(dados)
+            
+            elif opcao == '7':
+                self.captura_automatica = not self.captura_automatica
+                print(f"⚡ Captura automática {'ligada' if self.captura_automatica else 'desligada'} "
+                      f"({self.taxa_captura:.0f} amostras/s, diversidade {self.diversidade_captura})")
+            
+            elif opcao == '8':
                 print("👋 Até logo!")
                 break
             
@@ -285,14 +428,29 @@ class VocabularioExpansor:
                 print(f"📋 Classes: {sorted(df['label'].unique())}")
                 print(f"\n📊 Distribuição:")
                 print(df['label'].value_counts().sort_index())
+                # Desbalanceamento e quase-duplicatas: manutencao_dataset.py
+                relatorio = relatorio_classes(df['label'].astype(str).value_counts().to_dict())
+                print(f"⚖️ Razão entre a maior e a menor classe: {relatorio['razao_max_min']:.1f}")
+                for classe, faltam in relatorio['pequenas'].items():
+                    print(f"⚠️  Classe '{classe}' pequena: colete mais {faltam} amostras")
+                print("💡 Poda de repetições e balanceamento: python manutencao_dataset.py gestos_libras.csv")
             else:
                 print("❌ Arquivo gestos_libras.csv não encontrado")
         except Exception as e:
             print(f"❌ Erro ao mostrar estatísticas: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Expansor de vocabulário do TraduLibras")
+    parser.add_argument('--automatico', action='store_true',
+                        help="Captura sem tecla: mão parada e pose nova viram amostra")
+    parser.add_argument('--taxa', type=float, default=TAXA_PADRAO,
+                        help="Máximo de amostras por segundo na captura automática")
+    parser.add_argument('--diversidade', type=float, default=RAIO_PADRAO,
+                        help="Distância mínima entre amostras da mesma classe na captura automática")
+    args = parser.parse_args()
+
     print("🚀 TraduLibras - Expansor de Vocabulário v1.0")
     print("📚 Este script permite expandir o vocabulário do reconhecimento")
     
-    expansor = VocabularioExpansor()
+    expansor = VocabularioExpansor(args.automatico, args.taxa, args.diversidade)
     expansor.menu_principal()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Extração em lote de landmarks a partir de datasets de vídeos e imagens
+(MINDS-Libras, LSWH100, ...), sem webcam e sem pressionar teclas.
+
+Cada arquivo é rotulado pelo nome da pasta onde está:
+
+    dataset/
+        A/ img001.png img002.png ...
+        B/ video01.mp4 ...
+
+Uso:
+    python extrair_dataset.py caminho/do/dataset --saida gestos_libras.csv --workers 8
+
+    # Sinais com duas mãos (126 features, em gestos_libras_duas_maos.csv;
+    # frames com uma mão são ignorados)
+    python extrair_dataset.py caminho/do/dataset --duas-maos
+
+    # Mãos esquerdas espelhadas, como o servidor faz para modelos do modo invariante
+    python extrair_dataset.py caminho/do/dataset --canonizar --saida gestos_libras.csv
+
+Os frames são espelhados como a webcam do servidor antes do MediaPipe.
+
+O progresso é gravado em <saida>.progresso; rodar o mesmo comando de novo
+continua de onde parou.
+"""
+
+import argparse
+import os
+import time
+from multiprocessing import Pool
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from classificador_maos import DATASET_DUAS_MAOS
+from dataset import DATASET_PADRAO, DatasetStore
+from features import (N_FEATURES, N_FEATURES_DUAS_MAOS, features_do_frame, ordenar_maos,
+                      ordenar_maos_com_lados, process_duas_maos)
+
+EXTENSOES_IMAGEM = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+EXTENSOES_VIDEO = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+
+# Instância do MediaPipe de cada processo do pool
+_hands = None
+_duas_maos = False
+_canonizar = False
+
+
+def _iniciar_worker(min_confianca, duas_maos=False, canonizar=False):
+    """Cria uma instância do MediaPipe por processo (static_image_mode)"""
+    global _hands, _duas_maos, _canonizar
+    _duas_maos = duas_maos
+    _canonizar = canonizar
+    _hands = mp.solutions.hands.Hands(
+        static_image_mode=True,
+        max_num_hands=2 if duas_maos else 1,
+        min_detection_confidence=min_confianca
+    )
+
+
+def _extrair_frame(frame_bgr):
+    """Roda o MediaPipe em um frame e retorna as features ou None
+
+    63 features da mão ou, no modo duas mãos, 126 features das duas mãos
+    em ordem canônica (frames sem as duas mãos são ignorados). Com
+    _canonizar, a mão esquerda é espelhada pela lateralidade do MediaPipe,
+    que se inverte junto com a imagem: espelhada ou não, a mão chega ao
+    modelo como no servidor. O frame é espelhado antes, como a webcam no
+    servidor e nos coletores: a ordem e a geometria das mãos ficam as
+    mesmas do laço da câmera, com ou sem --canonizar.
+    """
+    frame_bgr = cv2.flip(frame_bgr, 1)
+    rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    results = _hands.process(rgb)
+    if not results.multi_hand_landmarks:
+        return None
+    if _duas_maos:
+        if len(results.multi_hand_landmarks) != 2:
+            return None
+        return process_duas_maos(ordenar_maos(results.multi_hand_landmarks,
+                                              results.multi_handedness))
+    maos, lados = ordenar_maos_com_lados(results.multi_hand_landmarks, results.multi_handedness)
+    return features_do_frame(maos[:1], lados=lados[:1] if _canonizar else None)
+
+
+def processar_arquivo(tarefa):
+    """Extrai landmarks de uma imagem ou vídeo
+
+    Retorna (caminho, label, features, frames_lidos, erro).
+    """
+    caminho, label, passo_video, max_frames = tarefa
+    amostras = []
+    frames_lidos = 0
+
+    try:
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao in EXTENSOES_IMAGEM:
+            frame = cv2.imread(caminho)
+            if frame is not None:
+                frames_lidos = 1
+                features = _extrair_frame(frame)
+                if features is not None:
+                    amostras.append(features)
+        else:
+            cap = cv2.VideoCapture(caminho)
+            indice = 0
+            while max_frames <= 0 or frames_lidos < max_frames:
+                # grab() não decodifica, então os frames pulados saem baratos
+                if not cap.grab():
+                    break
+                if indice % passo_video == 0:
+                    ret, frame = cap.retrieve()
+                    if ret and frame is not None:
+                        frames_lidos += 1
+                        features = _extrair_frame(frame)
+                        if features is not None:
+                            amostras.append(features)
+                indice += 1
+            cap.release()
+    except Exception as e:
+        return caminho, label, None, frames_lidos, str(e)
+
+    X = np.array(amostras, dtype=np.float32).reshape(
+        -1, N_FEATURES_DUAS_MAOS if _duas_maos else N_FEATURES)
+    return caminho, label, X, frames_lidos, None
+
+
+def listar_arquivos(raiz):
+    """Lista (caminho, label) de todas as imagens e vídeos sob a raiz"""
+    arquivos = []
+    for pasta, _, nomes in os.walk(raiz):
+        for nome in sorted(nomes):
+            extensao = os.path.splitext(nome)[1].lower()
+            if extensao in EXTENSOES_IMAGEM or extensao in EXTENSOES_VIDEO:
+                caminho = os.path.join(pasta, nome)
+                label = os.path.basename(os.path.dirname(caminho))
+                arquivos.append((caminho, label))
+    arquivos.sort()
+    return arquivos
+
+
+def carregar_progresso(caminho_progresso):
+    """Lê a lista de arquivos já processados em execuções anteriores"""
+    if not os.path.exists(caminho_progresso):
+        return set()
+    with open(caminho_progresso, 'r', encoding='utf-8') as f:
+        return {linha.rstrip('\n') for linha in f if linha.strip()}
+
+
+def extrair(raiz, saida, workers=None, passo_video=1, max_frames=0, min_confianca=0.5,
+            duas_maos=False, canonizar=False):
+    """Extrai todos os arquivos pendentes da raiz para o dataset de saída"""
+    store = DatasetStore(saida)
+    # Largura errada só apareceria ao gravar, depois de todo o trabalho do pool
+    esperadas = N_FEATURES_DUAS_MAOS if duas_maos else N_FEATURES
+    if store.existe() and len(store.colunas()) != esperadas:
+        print(f"❌ {saida} tem {len(store.colunas())} features por amostra; este modo grava "
+              f"{esperadas}. Use outro --saida")
+        return
+    caminho_progresso = saida + '.progresso'
+    feitos = carregar_progresso(caminho_progresso)
+
+    arquivos = listar_arquivos(raiz)
+    pendentes = [(c, l) for c, l in arquivos if c not in feitos]
+
+    print(f"📁 Arquivos encontrados: {len(arquivos)}")
+    print(f"⏭️ Já processados: {len(arquivos) - len(pendentes)}")
+    print(f"📝 Pendentes: {len(pendentes)}")
+    if not pendentes:
+        print("✅ Nada a fazer")
+        return
+
+    workers = workers or os.cpu_count() or 1
+    tarefas = [(c, l, max(1, passo_video), max_frames) for c, l in pendentes]
+
+    inicio = time.perf_counter()
+    total_frames = 0
+    total_amostras = 0
+    erros = 0
+
+    with Pool(workers, initializer=_iniciar_worker, initargs=(min_confianca, duas_maos, canonizar)) as pool, \
+            open(caminho_progresso, 'a', encoding='utf-8') as progresso:
+        resultados = pool.imap_unordered(processar_arquivo, tarefas, chunksize=1)
+        for n, (caminho, label, X, frames_lidos, erro) in enumerate(resultados, 1):
+            total_frames += frames_lidos
+            if erro:
+                erros += 1
+                print(f"❌ Erro em {caminho}: {erro}")
+                continue
+
+            total_amostras += store.adicionar([label] * len(X), X)
+            # Só marca como feito depois de gravar as amostras
+            progresso.write(caminho + '\n')
+            progresso.flush()
+
+            if n % 50 == 0 or n == len(tarefas):
+                decorrido = time.perf_counter() - inicio
+                fps = total_frames / decorrido if decorrido > 0 else 0.0
+                print(f"⏱️ {n}/{len(tarefas)} arquivos | {total_frames} frames | "
+                      f"{total_amostras} amostras | {fps:.1f} FPS")
+
+    decorrido = time.perf_counter() - inicio
+    fps = total_frames / decorrido if decorrido > 0 else 0.0
+    print("=" * 50)
+    print(f"✅ Extração concluída em {decorrido:.1f}s com {workers} processos")
+    print(f"🎞️ Frames processados: {total_frames} ({fps:.1f} FPS)")
+    print(f"📈 Amostras gravadas em {saida}: {total_amostras}")
+    if erros:
+        print(f"⚠️ Arquivos com erro: {erros} (serão tentados de novo na próxima execução)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extrai landmarks de vídeos e imagens para o dataset do TraduLibras"
+    )
+    parser.add_argument('entrada', help="Pasta do dataset (uma subpasta por classe)")
+    parser.add_argument('--saida',
+                        help=f"CSV de destino (padrão: {DATASET_PADRAO}, ou {DATASET_DUAS_MAOS} "
+                             "com --duas-maos)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Número de processos (padrão: todos os núcleos)")
+    parser.add_argument('--passo-video', type=int, default=1,
+                        help="Processar 1 a cada N frames dos vídeos")
+    parser.add_argument('--max-frames', type=int, default=0,
+                        help="Máximo de frames processados por vídeo (0 = todos)")
+    parser.add_argument('--min-confianca', type=float, default=0.5,
+                        help="Confiança mínima de detecção do MediaPipe")
+    parser.add_argument('--duas-maos', action='store_true',
+                        help="Extrai sinais com duas mãos (126 features) para um CSV próprio")
+    parser.add_argument('--canonizar', action='store_true',
+                        help="Espelha mãos esquerdas (datasets do modo de features invariante)")
+    args = parser.parse_args()
+
+    saida = args.saida or (DATASET_DUAS_MAOS if args.duas_maos else DATASET_PADRAO)
+    print("🚀 TraduLibras - Extração em Lote de Landmarks")
+    extrair(args.entrada, saida, args.workers, args.passo_video,
+            args.max_frames, args.min_confianca, args.duas_maos, args.canonizar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Pipeline compartilhado de features de landmarks do TraduLibras
+Usado pelo app, pelos coletores e pelos scripts de extração em lote,
+para que treino e inferência vejam exatamente a mesma representação
+"""
+
+import numpy as np
+
+N_PONTOS = 21
+N_FEATURES = N_PONTOS * 3
+# Modo duas mãos: as duas mãos em ordem canônica (esquerda, direita)
+N_FEATURES_DUAS_MAOS = 2 * N_FEATURES
+
+
+def colunas_features(n_features=N_FEATURES):
+    """Nomes das colunas do CSV para vetores de n_features"""
+    return [f'point_{i}' for i in range(n_features)]
+
+
+FEATURE_COLUMNS = colunas_features(N_FEATURES)
+
+
+def landmarks_para_array(hand_landmarks):
+    """Converte os landmarks de uma mão do MediaPipe em um array (21, 3) float32"""
+    return np.array(
+        [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+def array_para_landmarks(pontos):
+    """Monta um NormalizedLandmarkList do MediaPipe a partir de um array (21, 3)
+
+    Usado para reproduzir landmarks gravados pelo mesmo caminho do servidor.
+    """
+    from mediapipe.framework.formats import landmark_pb2
+
+    lista = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in pontos:
+        lista.landmark.add(x=float(x), y=float(y), z=float(z))
+    return lista
+
+
+def normalizar_pontos(pontos):
+    """Normaliza pontos (21, 3) ou um lote (N, 21, 3)
+
+    Os pontos ficam relativos ao pulso e escalados pelo tamanho da mão.
+    Retorna um vetor de 63 features (ou uma matriz N x 63 para lotes).
+    """
+    pontos = np.asarray(pontos, dtype=np.float32)
+    unico = pontos.ndim == 2
+    lote = pontos[None] if unico else pontos
+
+    relativos = lote - lote[:, :1, :]
+    escala = np.linalg.norm(relativos, axis=2).max(axis=1)
+    escala[escala == 0] = 1.0
+    relativos /= escala[:, None, None]
+
+    flat = relativos.reshape(len(relativos), -1)
+    return flat[0] if unico else flat
+
+
+def process_landmarks(hand_landmarks):
+    """Processar landmarks normalizando pela mão e mantendo 63 features"""
+    try:
+        if not hand_landmarks or len(hand_landmarks.landmark) != N_PONTOS:
+            return None
+
+        points_flat = normalizar_pontos(landmarks_para_array(hand_landmarks))
+        if len(points_flat) == N_FEATURES:
+            return points_flat
+        else:
+            print(f"⚠️ Número incorreto de pontos após normalização: {len(points_flat)}")
+            return None
+
+    except Exception as e:
+        print(f"❌ Erro no processamento de landmarks: {e}")
+        return None
+
+
+def ordenar_maos(multi_hand_landmarks, multi_handedness=None):
+    """Mãos em ordem canônica: esquerda antes da direita
+
+    Usa a lateralidade do MediaPipe (com o frame espelhado, é a mão real
+    do sinalizador). Mãos com o mesmo rótulo, ou sem rótulo, são
+    desempatadas pela posição x do pulso na imagem.
+    """
+    return ordenar_maos_com_lados(multi_hand_landmarks, multi_handedness)[0]
+
+
+def ordenar_maos_com_lados(multi_hand_landmarks, multi_handedness=None):
+    """(mãos, lados) em ordem canônica; lado é 'Left', 'Right' ou '' (sem rótulo)"""
+    maos = list(multi_hand_landmarks or [])
+    lados = [c.classification[0].label if c is not None and c.classification else ''
+             for c in (multi_handedness or [None] * len(maos))]
+    ordem = sorted(range(len(maos)),
+                   key=lambda i: (lados[i] != 'Left', maos[i].landmark[0].x))
+    return [maos[i] for i in ordem], [lados[i] for i in ordem]
+
+
+def espelhar_pontos(X):
+    """Espelha horizontalmente vetores de 63 features normalizados (ou um lote N x 63)
+
+    Os pontos são relativos ao pulso, então espelhar é trocar o sinal de
+    x. Uma mão esquerda espelhada vira uma mão direita (canonização).
+    """
+    X = np.array(X, dtype=np.float32)
+    X[..., 0::3] *= -1
+    return X
+
+
+def normalizar_par(pontos_a, pontos_b):
+    """Normaliza duas mãos (21, 3) cada (ou lotes (N, 21, 3)) no mesmo referencial
+
+    Os pontos ficam relativos ao pulso da primeira mão e escalados pela
+    maior das duas mãos, preservando a posição de uma mão em relação à
+    outra. Retorna 126 features (ou uma matriz N x 126).
+    """
+    a = np.asarray(pontos_a, dtype=np.float32)
+    b = np.asarray(pontos_b, dtype=np.float32)
+    unico = a.ndim == 2
+    a, b = (a[None], b[None]) if unico else (a, b)
+
+    escala = np.maximum(np.linalg.norm(a - a[:, :1], axis=2).max(axis=1),
+                        np.linalg.norm(b - b[:, :1], axis=2).max(axis=1))
+    escala[escala == 0] = 1.0
+    par = np.concatenate([a, b], axis=1) - a[:, :1]
+    par /= escala[:, None, None]
+
+    flat = par.reshape(len(par), -1)
+    return flat[0] if unico else flat
+
+
+def process_duas_maos(maos):
+    """126 features de duas mãos já em ordem canônica (ordenar_maos)"""
+    try:
+        if len(maos) != 2 or any(len(m.landmark) != N_PONTOS for m in maos):
+            return None
+        return normalizar_par(landmarks_para_array(maos[0]), landmarks_para_array(maos[1]))
+    except Exception as e:
+        print(f"❌ Erro no processamento de landmarks: {e}")
+        return None
+
+
+def features_do_frame(maos, duas_maos=False, lados=None):
+    """Features de um frame a partir das mãos em ordem canônica
+
+    No modo duas mãos, um frame com duas mãos gera 126 features; com
+    uma só (ou fora do modo) são as 63 features da primeira mão. O
+    tamanho do vetor escolhe o classificador (ClassificadorPorMaos).
+    Com `lados` (lateralidade de cada mão, para modelos treinados com
+    mãos canonizadas), uma mão esquerda é espelhada para virar direita.
+    """
+    if not maos:
+        return None
+    if duas_maos and len(maos) == 2:
+        return process_duas_maos(maos)
+    features = process_landmarks(maos[0])
+    if features is not None and lados and lados[0] == 'Left':
+        features = espelhar_pontos(features)
+    return features
+
+
+# =========================================
+# Features invariantes (modo 'invariante')
+# =========================================
+# Cadeias pulso -> articulações -> ponta de cada dedo (polegar, indicador,
+# médio, anelar, mínimo), nos índices dos 21 landmarks do MediaPipe
+DEDOS = np.array([[0, 1, 2, 3, 4], [0, 5, 6, 7, 8], [0, 9, 10, 11, 12],
+                  [0, 13, 14, 15, 16], [0, 17, 18, 19, 20]])
+# Distâncias selecionadas: polegar às pontas e às falanges do indicador/médio,
+# pontas vizinhas e pontas ao pulso
+PARES_DISTANCIA = np.array([[4, 8], [4, 12], [4, 16], [4, 20], [4, 6], [4, 10],
+                            [8, 12], [12, 16], [16, 20],
+                            [0, 4], [0, 8], [0, 12], [0, 16], [0, 20]])
+# 15 ângulos de flexão + 4 de abertura entre dedos + 14 distâncias +
+# normal da palma (3) + direção da mão (3)
+N_FEATURES_INVARIANTES = 15 + 4 + len(PARES_DISTANCIA) + 6
+
+
+def _tabela_vetores():
+    """(origem, destino) de todos os vetores usados, para um único indexamento
+
+    Pares consecutivos formam os 19 ângulos (flexão entre ossos
+    seguidos de cada dedo; abertura entre os segundos ossos de dedos
+    vizinhos), depois vêm as distâncias e, por fim, pulso -> médio
+    (tamanho da palma e direção), pulso -> indicador e pulso -> mínimo
+    (plano da palma).
+    """
+    ossos = np.stack([DEDOS[:, :-1], DEDOS[:, 1:]], axis=-1)  # (5 dedos, 4 ossos, 2)
+    flexao = np.stack([ossos[:, :-1], ossos[:, 1:]], axis=2).reshape(-1, 2)
+    abertura = np.stack([ossos[:-1, 1], ossos[1:, 1]], axis=1).reshape(-1, 2)
+    return np.concatenate([flexao, abertura, PARES_DISTANCIA, [[0, 9], [0, 5], [0, 17]]])
+
+
+_VETORES = _tabela_vetores()
+_N_ANGULOS = 19
+_FIM_DISTANCIAS = 2 * _N_ANGULOS + len(PARES_DISTANCIA)
+
+
+def features_invariantes(X):
+    """Features invariantes a posição, escala e rotação a partir dos pontos
+
+    Recebe vetores de 63 features (normalizar_pontos) ou um lote N x 63 e
+    retorna N_FEATURES_INVARIANTES features (ou uma matriz): ângulos de
+    flexão das articulações, abertura entre dedos vizinhos, distâncias
+    selecionadas divididas pelo tamanho da palma (pulso ao médio) e, por
+    fim, a orientação da mão (normal da palma e direção pulso -> médio).
+    Só a orientação depende da mão ser esquerda ou direita; por isso os
+    modelos deste modo recebem mãos canonizadas (espelhar_pontos).
+    Poucas operações sobre arrays inteiros: uma amostra custa quase o
+    mesmo que um lote pequeno.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    unico = X.ndim == 1
+    pontos = (X[None] if unico else X).reshape(-1, N_PONTOS, 3)
+
+    vetores = pontos[:, _VETORES[:, 1]] - pontos[:, _VETORES[:, 0]]
+    normas = np.sqrt(np.einsum('nvi,nvi->nv', vetores, vetores))
+    a, b = vetores[:, 0:2 * _N_ANGULOS:2], vetores[:, 1:2 * _N_ANGULOS:2]
+    cossenos = np.einsum('nvi,nvi->nv', a, b) / (
+        normas[:, 0:2 * _N_ANGULOS:2] * normas[:, 1:2 * _N_ANGULOS:2] + 1e-9)
+    angulos = np.arccos(np.clip(cossenos, -1.0, 1.0))
+
+    palma = normas[:, _FIM_DISTANCIAS:_FIM_DISTANCIAS + 1]
+    palma = np.where(palma > 0, palma, 1.0)
+    distancias = normas[:, 2 * _N_ANGULOS:_FIM_DISTANCIAS] / palma
+    indicador, minimo = vetores[:, -2], vetores[:, -1]
+    normal = (indicador[:, [1, 2, 0]] * minimo[:, [2, 0, 1]]
+              - indicador[:, [2, 0, 1]] * minimo[:, [1, 2, 0]])
+    normal /= np.sqrt(np.einsum('ni,ni->n', normal, normal))[:, None] + 1e-9
+    direcao = vetores[:, _FIM_DISTANCIAS] / palma
+
+    resultado = np.concatenate([angulos, distancias, normal, direcao], axis=1).astype(np.float32)
+    return resultado[0] if unico else resultado
@@ -0,0 +1,202 @@
+"""
+Fontes de frames do TraduLibras
+
+O camera_worker lê frames de uma fonte em vez de abrir cv2.VideoCapture
+diretamente, o que permite rodar o servidor sem webcam (CI, máquinas de
+homologação sem monitor, testes de carga).
+
+A fonte é escolhida pela variável de ambiente TRADULIBRAS_FONTE:
+    camera                  webcam detectada (sondagem em cache, captura.py)
+    camera:1                webcam no índice 1
+    arquivo:video.mp4       vídeo em loop, no ritmo do próprio arquivo
+    sintetica               frames gerados (640x480, 30 FPS)
+    sintetica:1280x720@60   frames gerados com resolução e FPS próprios
+    landmarks:gravacao.npz  landmarks gravados (benchmark.py), sem MediaPipe
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from captura import CacheDispositivo, CapturaThread, abrir_camera, abrir_camera_em_cache
+from features import array_para_landmarks
+
+
+class FonteVideo:
+    """Interface comum das fontes de frames
+
+    Cada fonte define `ler()`, que retorna (sucesso, frame BGR); os demais
+    métodos têm comportamento padrão aqui.
+    """
+
+    # Fontes que já entregam landmarks dispensam o MediaPipe
+    fornece_landmarks = False
+    # Webcams entregam a imagem sem espelhar; o worker espelha como antes
+    espelhar = False
+
+    def landmarks_atuais(self):
+        """Landmarks do último frame lido (apenas se fornece_landmarks)"""
+        return None
+
+    def liberar(self):
+        pass
+
+    def estatisticas(self):
+        """Contadores da captura (frames lidos, descartados...)"""
+        return {}
+
+
+class _Ritmo:
+    """Espaça as leituras para imitar a taxa de quadros de uma câmera"""
+
+    def __init__(self, fps):
+        self.intervalo = 1.0 / fps if fps and fps > 0 else 0.0
+        self.proximo = time.monotonic()
+
+    def esperar(self):
+        if not self.intervalo:
+            return
+        agora = time.monotonic()
+        if self.proximo > agora:
+            time.sleep(self.proximo - agora)
+        self.proximo = max(self.proximo, agora) + self.intervalo
+
+
+class FonteCamera(FonteVideo):
+    """Webcam física lida por uma CapturaThread (sempre o frame mais novo)
+
+    Com indice=None o dispositivo vem do cache da sondagem; com um índice
+    explícito, só o formato/backend daquele índice é negociado.
+    """
+
+    espelhar = True
+
+    def __init__(self, indice=None, largura=640, altura=480, fps=30.0, formato=None,
+                 cache=None):
+        if indice is None:
+            captura, self.configuracao = abrir_camera_em_cache(
+                CacheDispositivo(cache) if cache else CacheDispositivo(),
+                largura, altura, fps, formato)
+        else:
+            captura, self.configuracao = abrir_camera(indice, formato=formato or 'MJPG',
+                                                      largura=largura, altura=altura, fps=fps)
+        if captura is None:
+            raise IOError("Nenhuma câmera disponível" if indice is None
+                          else f"Não foi possível abrir a câmera {indice}")
+        self.leitor = CapturaThread(captura)
+
+    def ler(self):
+        return self.leitor.ler()
+
+    def estatisticas(self):
+        return dict(self.leitor.estatisticas(), **self.configuracao)
+
+    def liberar(self):
+        self.leitor.liberar()
+
+
+class FonteArquivo(FonteVideo):
+    """Vídeo gravado, reiniciado ao chegar no fim quando loop=True"""
+
+    espelhar = True
+
+    def __init__(self, caminho, loop=True, fps=None):
+        self.caminho = caminho
+        self.loop = loop
+        self.captura = cv2.VideoCapture(caminho)
+        if not self.captura.isOpened():
+            raise IOError(f"Não foi possível abrir o vídeo {caminho}")
+        self.ritmo = _Ritmo(fps or self.captura.get(cv2.CAP_PROP_FPS) or 30.0)
+
+    def ler(self):
+        self.ritmo.esperar()
+        ret, frame = self.captura.read()
+        if (not ret or frame is None) and self.loop:
+            self.captura.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.captura.read()
+        return ret, frame
+
+    def liberar(self):
+        self.captura.release()
+
+
+class FonteSintetica(FonteVideo):
+    """Frames gerados em memória: gradiente em movimento e contador
+
+    Não contém mão; serve para medir captura, codificação e streaming.
+    """
+
+    def __init__(self, largura=640, altura=480, fps=30.0):
+        self.largura = largura
+        self.altura = altura
+        self.ritmo = _Ritmo(fps)
+        self.contador = 0
+        self.base = np.tile(
+            np.linspace(0, 255, largura, dtype=np.uint8)[None, :, None], (altura, 1, 3)
+        )
+
+    def ler(self):
+        self.ritmo.esperar()
+        self.contador += 1
+        frame = np.roll(self.base, self.contador * 4, axis=1)
+        cv2.putText(frame, f"TraduLibras sintetico #{self.contador}", (20, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+        return True, frame
+
+
+class FonteLandmarks(FonteVideo):
+    """Landmarks gravados (formato do benchmark.py) reproduzidos em loop
+
+    O worker usa os landmarks diretamente, sem MediaPipe, e o frame é
+    apenas um fundo preto para o desenho da mão.
+    """
+
+    fornece_landmarks = True
+
+    def __init__(self, caminho, loop=True, fps=None, largura=640, altura=480):
+        dados = np.load(caminho, allow_pickle=False)
+        pontos = dados['landmarks']
+        self.frames = [None if np.isnan(p).any() else array_para_landmarks(p) for p in pontos]
+        if not self.frames:
+            raise ValueError(f"Gravação vazia: {caminho}")
+        self.loop = loop
+        self.ritmo = _Ritmo(fps or (float(dados['fps']) if 'fps' in dados else 30.0))
+        self.fundo = np.zeros((altura, largura, 3), dtype=np.uint8)
+        self.posicao = -1
+
+    def ler(self):
+        self.ritmo.esperar()
+        self.posicao += 1
+        if self.posicao >= len(self.frames):
+            if not self.loop:
+                return False, None
+            self.posicao = 0
+        return True, self.fundo.copy()
+
+    def landmarks_atuais(self):
+        return self.frames[self.posicao] if 0 <= self.posicao < len(self.frames) else None
+
+
+def criar_fonte(especificacao='camera', camera_index=None, **opcoes_camera):
+    """Cria a fonte a partir de uma especificação como 'arquivo:video.mp4'
+
+    `opcoes_camera` (fps, formato, cache...) vão para a FonteCamera.
+    """
+    tipo, _, argumento = (especificacao or 'camera').partition(':')
+    tipo = tipo.strip().lower()
+
+    if tipo == 'camera':
+        return FonteCamera(int(argumento) if argumento else camera_index, **opcoes_camera)
+    if tipo == 'arquivo':
+        return FonteArquivo(argumento)
+    if tipo == 'sintetica':
+        largura, altura, fps = 640, 480, 30.0
+        if argumento:
+            resolucao, _, taxa = argumento.partition('@')
+            largura, altura = (int(v) for v in resolucao.lower().split('x'))
+            fps = float(taxa) if taxa else fps
+        return FonteSintetica(largura, altura, fps)
+    if tipo == 'landmarks':
+        return FonteLandmarks(argumento)
+    raise ValueError(f"Fonte de vídeo desconhecida: {especificacao}")
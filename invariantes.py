@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Modo de features 'invariante' do TraduLibras
+
+Os modelos do modo 'pontos' recebem as coordenadas xyz dos 21 pontos
+relativas ao pulso: a mesma letra com a mão inclinada, ou feita com a mão
+esquerda, vira outro vetor e a floresta cresce para absorver a variação
+(ou precisa de amostras de cada caso). No modo 'invariante' a primeira
+etapa do modelo (FeaturesInvariantes) converte os pontos em ângulos das
+articulações, distâncias selecionadas e orientação da mão
+(features.features_invariantes, vetorizado para lotes), e mãos esquerdas
+são espelhadas antes (canonização pela lateralidade do MediaPipe,
+model_info['canonizar_mao']).
+
+O modelo continua recebendo as 63 features de sempre, então app, caches,
+índice de vizinhos e roteamento de duas mãos não mudam; o dataset também
+é o mesmo (treinamento.py --features invariante).
+
+Uso (comparação dos dois modos no mesmo dataset):
+    python invariantes.py --dataset gestos_libras.csv
+"""
+
+import argparse
+import pickle
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from dataset import DATASET_PADRAO, DatasetStore
+from features import N_FEATURES_INVARIANTES, N_PONTOS, espelhar_pontos, features_invariantes
+
+MODOS_FEATURES = ('pontos', 'invariante')
+
+
+class FeaturesInvariantes(BaseEstimator, TransformerMixin):
+    """Etapa de pipeline: 63 features de pontos -> features invariantes"""
+
+    def fit(self, X, y=None):
+        self.n_features_in_ = np.asarray(X).shape[1]
+        return self
+
+    def transform(self, X):
+        return features_invariantes(X)
+
+
+def modelo_do_modo(estimador, modo='pontos'):
+    """O estimador como treinado/servido no modo de features dado"""
+    if modo == 'pontos':
+        return estimador
+    if modo == 'invariante':
+        return Pipeline([('invariantes', FeaturesInvariantes()), ('modelo', estimador)])
+    raise ValueError(f"Modo de features desconhecido: {modo}")
+
+
+def info_do_modo(modo='pontos'):
+    """Chaves do model_info que o app usa para montar as features do modo"""
+    return {'modo_features': modo, 'canonizar_mao': modo == 'invariante'}
+
+
+def inclinar(X, graus_max, semente=0):
+    """Gira cada mão no plano da imagem por um ângulo aleatório em ±graus_max"""
+    rng = np.random.default_rng(semente)
+    angulos = np.deg2rad(rng.uniform(-graus_max, graus_max, len(X)))
+    cos, sen = np.cos(angulos)[:, None], np.sin(angulos)[:, None]
+    pontos = np.asarray(X, dtype=np.float32).reshape(len(X), N_PONTOS, 3).copy()
+    x, y = pontos[:, :, 0].copy(), pontos[:, :, 1].copy()
+    pontos[:, :, 0] = cos * x - sen * y
+    pontos[:, :, 1] = sen * x + cos * y
+    return pontos.reshape(len(X), -1)
+
+
+def contar_nos(modelo):
+    """Nós de todas as árvores do modelo (0 se não for floresta/árvore)"""
+    estimador = modelo.steps[-1][1] if isinstance(modelo, Pipeline) else modelo
+    return int(sum(e.tree_.node_count for e in getattr(estimador, 'estimators_', [])))
+
+
+def comparar_modos(X, y, arvores=(10, 25, 50, 100), graus=20.0, repeticoes=200):
+    """Treina a mesma floresta nos dois modos e mede acurácia, tamanho e latência
+
+    Acurácias: teste, teste inclinado (±graus) e teste espelhado (mão
+    esquerda de um sinalizador canhoto). Cada modo recebe as mãos como o
+    servidor as entregaria: só o modo invariante canoniza a esquerda.
+    """
+    from backends import BACKENDS, medir_latencia_proba
+
+    X_treino, X_teste, y_treino, y_teste = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y)
+    inclinado = inclinar(X_teste, graus)
+    canhoto = espelhar_pontos(X_teste)
+
+    resultados = []
+    for modo in MODOS_FEATURES:
+        canhoto_servido = espelhar_pontos(canhoto) if info_do_modo(modo)['canonizar_mao'] else canhoto
+        for n in arvores:
+            modelo = modelo_do_modo(RandomForestClassifier(n_estimators=n, random_state=42,
+                                                           n_jobs=-1), modo)
+            modelo.fit(X_treino, y_treino)
+            modelo.set_params(**{('modelo__' if modo == 'invariante' else '') + 'n_jobs': 1})
+            try:
+                latencia_numpy = medir_latencia_proba(BACKENDS['numpy'](modelo), X_teste, repeticoes)
+            except Exception:
+                latencia_numpy = None
+            resultados.append({
+                'modo': modo,
+                'arvores': n,
+                'acuracia': float(np.mean(modelo.predict(X_teste) == y_teste)),
+                'acuracia_inclinada': float(np.mean(modelo.predict(inclinado) == y_teste)),
+                'acuracia_canhoto': float(np.mean(modelo.predict(canhoto_servido) == y_teste)),
+                'nos': contar_nos(modelo),
+                'tamanho_kb': len(pickle.dumps(modelo)) / 1024,
+                'latencia_ms': medir_latencia_proba(modelo, X_teste, repeticoes),
+                'latencia_numpy_ms': latencia_numpy,
+            })
+    return resultados
+
+
+def menor_modelo(resultados, modo, acuracia_alvo):
+    """Menor floresta do modo com acurácia >= alvo (ou None)"""
+    aceitos = [r for r in resultados if r['modo'] == modo and r['acuracia'] >= acuracia_alvo]
+    return min(aceitos, key=lambda r: r['nos'], default=None)
+
+
+def mostrar(resultados, tolerancia=0.005):
+    print(f"{'Modo':<11} {'Árvores':>7} {'Acurácia':>9} {'Inclinada':>10} {'Canhoto':>8} "
+          f"{'Nós':>8} {'KB':>8} {'ms':>7} {'ms numpy':>9}")
+    for r in resultados:
+        numpy_ms = f"{r['latencia_numpy_ms']:.3f}" if r['latencia_numpy_ms'] is not None else '-'
+        print(f"{r['modo']:<11} {r['arvores']:>7} {r['acuracia']:>9.2%} {r['acuracia_inclinada']:>10.2%} "
+              f"{r['acuracia_canhoto']:>8.2%} {r['nos']:>8} {r['tamanho_kb']:>8.0f} "
+              f"{r['latencia_ms']:>7.3f} {numpy_ms:>9}")
+
+    alvo = max(r['acuracia'] for r in resultados if r['modo'] == 'pontos') - tolerancia
+    pontos = menor_modelo(resultados, 'pontos', alvo)
+    invariante = menor_modelo(resultados, 'invariante', alvo)
+    print(f"\n🎯 Menor floresta com acurácia >= {alvo:.2%} (melhor do modo pontos - {tolerancia:.1%}):")
+    for modo, r in (('pontos', pontos), ('invariante', invariante)):
+        if r is None:
+            print(f"   {modo}: nenhuma")
+        else:
+            print(f"   {modo}: {r['arvores']} árvores, {r['nos']} nós, {r['tamanho_kb']:.0f} KB, "
+                  f"{r['latencia_ms']:.3f} ms")
+    if pontos and invariante:
+        print(f"📉 Invariante: {invariante['tamanho_kb'] / pontos['tamanho_kb']:.0%} do tamanho e "
+              f"{invariante['latencia_ms'] / pontos['latencia_ms']:.0%} da latência")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os modos de features pontos e invariante")
+    parser.add_argument('--dataset', default=DATASET_PADRAO, help="CSV de amostras (63 features)")
+    parser.add_argument('--arvores', type=int, nargs='+', default=[10, 25, 50, 100],
+                        help="Tamanhos de floresta avaliados")
+    parser.add_argument('--inclinacao', type=float, default=20.0,
+                        help="Inclinação máxima (graus) do teste com mãos inclinadas")
+    parser.add_argument('--tolerancia', type=float, default=0.005,
+                        help="Perda de acurácia aceita na comparação de tamanho")
+    args = parser.parse_args()
+
+    X, y = DatasetStore(args.dataset).carregar()
+    if len(X) == 0:
+        print(f"❌ Dataset vazio ou inexistente: {args.dataset}")
+        return
+    print(f"📊 {len(X)} amostras, {X.shape[1]} features de pontos -> "
+          f"{N_FEATURES_INVARIANTES} invariantes")
+    # Como script, as classes deste arquivo ficam em __main__: as do módulo
+    # importado são as que backends.py (e o pickle do app) reconhecem
+    import invariantes
+    invariantes.mostrar(invariantes.comparar_modos(X, y, args.arvores, args.inclinacao),
+                        args.tolerancia)
+
+
+if __name__ == "__main__":
+    main()
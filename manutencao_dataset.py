@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Manutenção do dataset do TraduLibras: quase-duplicatas e desbalanceamento
+
+O coletor grava uma amostra a cada ESPAÇO; segurando a pose, saem
+sequências de linhas quase iguais que alongam o treino e puxam a
+floresta para as letras com mais repetições. Este comando:
+
+1. Poda quase-duplicatas de cada classe (amostras a menos de `raio` de
+   uma já mantida, distância euclidiana nas features normalizadas), em
+   duas passadas vetorizadas: um hash de grade com célula raio/sqrt(d),
+   que só junta amostras a menos de `raio` e elimina as repetições
+   exatas e os tremores mínimos, e uma passada de distâncias em blocos
+   (produto de matrizes) sobre o que sobrou. Fica sempre a amostra mais
+   antiga.
+2. Relata o desbalanceamento (a mesma distribuição do
+   mostrar_estatisticas do expandir_vocabulario.py) e, com --balancear,
+   limita as classes grandes a um teto, mantendo amostras espalhadas
+   ao longo da coleta. Classes pequenas não têm como ganhar amostras
+   reais: são listadas com quantas faltam (o aumento de dados do
+   treinamento.py --aumento ajuda enquanto isso).
+3. Com --gravar, escreve uma nova versão compacta do dataset
+   (<dataset>_vN.csv, menos algarismos por feature) e registra origem,
+   parâmetros e contagens em <dataset>.versoes.json. O original nunca é
+   alterado.
+
+Uso:
+    # Só o relatório (nada é gravado)
+    python manutencao_dataset.py gestos_libras.csv --raio 0.05
+
+    # Nova versão podada e balanceada (teto = mediana das classes)
+    python manutencao_dataset.py gestos_libras.csv --raio 0.05 --balancear mediana --gravar
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from dataset import DatasetStore
+
+RAIO_PADRAO = 0.05
+# Classes com menos que esta fração da mediana são marcadas como pequenas
+FRACAO_MINIMA = 0.5
+DIGITOS_COMPACTO = 4
+
+
+def _primeiros_da_grade(X, passo):
+    """Índices (em ordem) da primeira amostra de cada célula da grade"""
+    celulas = np.rint(X / passo).astype(np.int32)
+    _, primeiros = np.unique(celulas, axis=0, return_index=True)
+    return np.sort(primeiros)
+
+
+def _podar_por_distancia(X, raio, bloco=512):
+    """Índices mantidos: cada amostra fica se estiver a mais de `raio` das anteriores mantidas"""
+    raio2 = raio * raio
+    mantidos = []
+    base = np.empty((0, X.shape[1]), dtype=np.float32)
+    normas_base = np.empty(0, dtype=np.float32)
+    for inicio in range(0, len(X), bloco):
+        B = X[inicio:inicio + bloco]
+        normas = np.einsum('ij,ij->i', B, B)
+        livres = np.ones(len(B), dtype=bool)
+        if len(base):
+            d2 = normas[:, None] + normas_base[None, :] - 2 * B @ base.T
+            livres &= d2.min(axis=1) > raio2
+        # Dentro do bloco, a decisão depende das anteriores: só o laço é sequencial
+        perto = (normas[:, None] + normas[None, :] - 2 * B @ B.T) <= raio2
+        for i in range(len(B)):
+            if livres[i]:
+                livres[i + 1:] &= ~perto[i, i + 1:]
+        novos = np.flatnonzero(livres)
+        mantidos.append(inicio + novos)
+        base = np.concatenate([base, B[novos]])
+        normas_base = np.concatenate([normas_base, normas[novos]])
+    return np.concatenate(mantidos) if mantidos else np.empty(0, dtype=int)
+
+
+def podar_duplicatas(X, y, raio=RAIO_PADRAO):
+    """Índices (em ordem) das amostras mantidas, classe a classe"""
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    if raio <= 0 or len(X) == 0:
+        return np.arange(len(X))
+    passo = raio / np.sqrt(X.shape[1])
+    mantidos = []
+    for classe in np.unique(y):
+        indices = np.flatnonzero(y == classe)
+        indices = indices[_primeiros_da_grade(X[indices], passo)]
+        mantidos.append(indices[_podar_por_distancia(X[indices], raio)])
+    return np.sort(np.concatenate(mantidos))
+
+
+def relatorio_classes(contagem, fracao_minima=FRACAO_MINIMA):
+    """Resumo do desbalanceamento a partir da contagem por classe"""
+    if not contagem:
+        return {'total': 0, 'classes': 0, 'contagem': {}}
+    valores = np.array(list(contagem.values()))
+    mediana = float(np.median(valores))
+    return {
+        'total': int(valores.sum()),
+        'classes': len(contagem),
+        'contagem': dict(sorted(contagem.items())),
+        'minimo': int(valores.min()),
+        'maximo': int(valores.max()),
+        'mediana': mediana,
+        'razao_max_min': float(valores.max() / max(valores.min(), 1)),
+        'pequenas': {c: int(np.ceil(mediana - n)) for c, n in sorted(contagem.items())
+                     if n < fracao_minima * mediana},
+    }
+
+
+def teto_balanceamento(contagem, balancear):
+    """Teto por classe: 'mediana', 'minimo' ou um número (None sem balancear)"""
+    if not balancear or not contagem:
+        return None
+    valores = np.array(list(contagem.values()))
+    if balancear == 'mediana':
+        return int(np.median(valores))
+    if balancear == 'minimo':
+        return int(valores.min())
+    return int(balancear)
+
+
+def balancear_classes(y, teto, indices=None):
+    """Índices (em ordem) com no máximo `teto` amostras por classe
+
+    As mantidas ficam espalhadas ao longo da coleta (passo constante),
+    não só as primeiras sessões.
+    """
+    y = np.asarray(y)
+    indices = np.arange(len(y)) if indices is None else np.asarray(indices)
+    if teto is None:
+        return indices
+    mantidos = []
+    for classe in np.unique(y[indices]):
+        da_classe = indices[y[indices] == classe]
+        if len(da_classe) > teto:
+            da_classe = da_classe[np.linspace(0, len(da_classe) - 1, teto).round().astype(int)]
+        mantidos.append(da_classe)
+    return np.sort(np.concatenate(mantidos))
+
+
+def mostrar_relatorio(relatorio, titulo):
+    """Imprime a distribuição por classe e os avisos de desbalanceamento"""
+    print(f"\n📊 {titulo}: {relatorio['total']} amostras, {relatorio['classes']} classes")
+    if not relatorio['total']:
+        return
+    largura = max(relatorio['contagem'].values())
+    for classe, n in relatorio['contagem'].items():
+        barra = '█' * max(1, round(30 * n / largura))
+        print(f"   {classe:>6} {n:>7} {barra}")
+    print(f"⚖️ Mínimo {relatorio['minimo']}, mediana {relatorio['mediana']:.0f}, "
+          f"máximo {relatorio['maximo']} (razão máx/mín {relatorio['razao_max_min']:.1f})")
+    for classe, faltam in relatorio['pequenas'].items():
+        print(f"⚠️  Classe '{classe}' pequena: colete mais {faltam} amostras para chegar à mediana")
+
+
+def _sha256(caminho):
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def caminho_versoes(caminho_dataset):
+    return os.path.splitext(caminho_dataset)[0] + '.versoes.json'
+
+
+def proxima_versao(caminho_dataset):
+    """(número, caminho) da próxima versão <dataset>_vN.csv"""
+    raiz, extensao = os.path.splitext(caminho_dataset)
+    n = 1
+    while os.path.exists(f"{raiz}_v{n}{extensao or '.csv'}"):
+        n += 1
+    return n, f"{raiz}_v{n}{extensao or '.csv'}"
+
+
+def gravar_versao(caminho_dataset, X, y, registro, digitos=DIGITOS_COMPACTO):
+    """Grava a versão compacta e acrescenta o registro ao <dataset>.versoes.json"""
+    versao, destino = proxima_versao(caminho_dataset)
+    DatasetStore(destino).adicionar(y, X, digitos)
+
+    caminho_log = caminho_versoes(caminho_dataset)
+    versoes = []
+    if os.path.exists(caminho_log):
+        with open(caminho_log, 'r', encoding='utf-8') as f:
+            versoes = json.load(f)
+    versoes.append(dict(registro, versao=versao, arquivo=destino,
+                        data=datetime.now().isoformat(timespec='seconds'),
+                        origem=caminho_dataset, sha256_origem=_sha256(caminho_dataset),
+                        sha256=_sha256(destino), digitos=digitos,
+                        bytes_origem=os.path.getsize(caminho_dataset),
+                        bytes=os.path.getsize(destino)))
+    with open(caminho_log, 'w', encoding='utf-8') as f:
+        json.dump(versoes, f, ensure_ascii=False, indent=2)
+    return destino
+
+
+def manter(caminho_dataset, raio=RAIO_PADRAO, balancear=None, gravar=False,
+           digitos=DIGITOS_COMPACTO):
+    """Relatório (e, com gravar, nova versão) de poda e balanceamento"""
+    store = DatasetStore(caminho_dataset)
+    X, y = store.carregar()
+    if len(X) == 0:
+        print(f"❌ Dataset vazio ou inexistente: {caminho_dataset}")
+        return None
+
+    antes = relatorio_classes(Counter(y.tolist()))
+    mostrar_relatorio(antes, caminho_dataset)
+
+    indices = podar_duplicatas(X, y, raio)
+    removidas = Counter(y.tolist()) - Counter(y[indices].tolist())
+    print(f"\n✂️ Quase-duplicatas (raio {raio}): {len(X) - len(indices)} de {len(X)} amostras")
+    for classe, n in sorted(removidas.items(), key=lambda item: -item[1])[:10]:
+        print(f"   {classe:>6} -{n} ({n / antes['contagem'][classe]:.0%})")
+
+    podado = Counter(y[indices].tolist())
+    teto = teto_balanceamento(podado, balancear)
+    indices = balancear_classes(y, teto, indices)
+    depois = relatorio_classes(Counter(y[indices].tolist()))
+    titulo = "Após a poda" + (f" e o teto de {teto} por classe" if teto is not None else "")
+    mostrar_relatorio(depois, titulo)
+
+    if not gravar:
+        print("\n💡 Nada foi gravado; use --gravar para escrever a nova versão")
+        return depois
+    destino = gravar_versao(caminho_dataset, X[indices], y[indices], {
+        'raio': raio, 'balancear': balancear, 'teto': teto,
+        'amostras_origem': antes['total'], 'amostras': depois['total'],
+        'duplicatas_removidas': int(len(X) - sum(podado.values())),
+        'contagem': depois['contagem'],
+    }, digitos)
+    print(f"\n✅ Nova versão: {destino} ({os.path.getsize(destino) / 1e6:.1f} MB, "
+          f"original {os.path.getsize(caminho_dataset) / 1e6:.1f} MB)")
+    print(f"📋 Histórico em {caminho_versoes(caminho_dataset)}")
+    return depois
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Poda quase-duplicatas e balanceia as classes do dataset")
+    parser.add_argument('dataset', nargs='?', default='gestos_libras.csv', help="CSV de amostras")
+    parser.add_argument('--raio', type=float, default=RAIO_PADRAO,
+                        help="Distância abaixo da qual amostras da mesma classe são duplicatas "
+                             "(0 desliga a poda)")
+    parser.add_argument('--balancear',
+                        help="Teto de amostras por classe: 'mediana', 'minimo' ou um número")
+    parser.add_argument('--gravar', action='store_true',
+                        help="Grava a nova versão (<dataset>_vN.csv); sem isso, só o relatório")
+    parser.add_argument('--digitos', type=int, default=DIGITOS_COMPACTO,
+                        help="Algarismos significativos por feature na versão gravada")
+    args = parser.parse_args()
+
+    if args.balancear not in (None, 'mediana', 'minimo') and not args.balancear.isdigit():
+        parser.error("--balancear deve ser 'mediana', 'minimo' ou um número")
+    print("🧹 TraduLibras - Manutenção do Dataset")
+    manter(args.dataset, args.raio, args.balancear, args.gravar, args.digitos)
+
+
+if __name__ == "__main__":
+    main()
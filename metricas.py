@@ -0,0 +1,190 @@
+"""
+Métricas do TraduLibras no formato de texto do Prometheus
+
+Contadores, medidores e histogramas simples, sem dependências externas.
+O registro de um valor é só uma operação curta sob um lock próprio de
+cada métrica (o bucket do histograma é escolhido com bisect fora do
+lock), então as métricas podem ficar sempre ligadas no camera_worker.
+A formatação acontece apenas quando /metrics é consultado.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Limites padrão dos histogramas de latência, em segundos
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                    0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    pares = ','.join(f'{k}="{str(v)}"' for k, v in sorted(rotulos.items()))
+    return '{' + pares + '}'
+
+
+def _formatar_valor(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    if valor != valor:
+        return 'NaN'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    """Base das métricas: nome, ajuda, rótulos fixos e o lock próprio
+
+    Cada subclasse define `tipo` e `amostras()`, a lista de
+    (nome, rotulos, valor) exportada em /metrics.
+    """
+
+    tipo = 'untyped'
+
+    def __init__(self, nome, ajuda, rotulos=None):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = dict(rotulos or {})
+        self._lock = threading.Lock()
+
+
+class Contador(_Metrica):
+    """Valor que só aumenta (frames, erros, acertos de cache)
+
+    Com `funcao`, o valor vem de um contador mantido por outro objeto e é
+    lido só na exportação.
+    """
+
+    tipo = 'counter'
+
+    def __init__(self, nome, ajuda, rotulos=None, funcao=None):
+        super().__init__(nome, ajuda, rotulos)
+        self.valor = 0
+        self.funcao = funcao
+
+    def inc(self, quantidade=1):
+        with self._lock:
+            self.valor += quantidade
+
+    def amostras(self):
+        valor = self.valor
+        if self.funcao is not None:
+            try:
+                valor = self.funcao()
+            except Exception:
+                valor = float('nan')
+        return [(self.nome, self.rotulos, valor)]
+
+
+class Medidor(_Metrica):
+    """Valor instantâneo; com `funcao`, calculado só na exportação"""
+
+    tipo = 'gauge'
+
+    def __init__(self, nome, ajuda, rotulos=None, funcao=None):
+        super().__init__(nome, ajuda, rotulos)
+        self.valor = 0
+        self.funcao = funcao
+
+    def set(self, valor):
+        self.valor = valor
+
+    def inc(self, quantidade=1):
+        with self._lock:
+            self.valor += quantidade
+
+    def dec(self, quantidade=1):
+        self.inc(-quantidade)
+
+    def amostras(self):
+        valor = self.valor
+        if self.funcao is not None:
+            try:
+                valor = self.funcao()
+            except Exception:
+                valor = float('nan')
+        return [(self.nome, self.rotulos, valor)]
+
+
+class Histograma(_Metrica):
+    """Distribuição em buckets fixos (latências em segundos)"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=None, limites=LIMITES_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+
+    def observar(self, valor):
+        indice = bisect_left(self.limites, valor)
+        with self._lock:
+            self.contagens[indice] += 1
+            self.soma += valor
+
+    @contextmanager
+    def cronometrar(self):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio)
+
+    def amostras(self):
+        with self._lock:
+            contagens = list(self.contagens)
+            soma = self.soma
+        resultado = []
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (float('inf'),), contagens):
+            acumulado += contagem
+            rotulos = dict(self.rotulos, le=_formatar_valor(float(limite)))
+            resultado.append((f'{self.nome}_bucket', rotulos, acumulado))
+        resultado.append((f'{self.nome}_sum', self.rotulos, soma))
+        resultado.append((f'{self.nome}_count', self.rotulos, acumulado))
+        return resultado
+
+
+class Registro:
+    """Conjunto de métricas exportadas juntas"""
+
+    def __init__(self):
+        self.metricas = []
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica):
+        with self._lock:
+            self.metricas.append(metrica)
+        return metrica
+
+    def contador(self, nome, ajuda, rotulos=None, funcao=None):
+        return self.registrar(Contador(nome, ajuda, rotulos, funcao))
+
+    def medidor(self, nome, ajuda, rotulos=None, funcao=None):
+        return self.registrar(Medidor(nome, ajuda, rotulos, funcao))
+
+    def histograma(self, nome, ajuda, rotulos=None, limites=LIMITES_LATENCIA):
+        return self.registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        with self._lock:
+            # Séries de mesmo nome precisam sair agrupadas
+            metricas = sorted(self.metricas, key=lambda m: m.nome)
+        linhas = []
+        vistos = set()
+        for metrica in metricas:
+            # HELP/TYPE uma vez por nome, mesmo com várias séries rotuladas
+            if metrica.nome not in vistos:
+                vistos.add(metrica.nome)
+                linhas.append(f'# HELP {metrica.nome} {metrica.ajuda}')
+                linhas.append(f'# TYPE {metrica.nome} {metrica.tipo}')
+            for nome, rotulos, valor in metrica.amostras():
+                linhas.append(f'{nome}{_formatar_rotulos(rotulos)} {_formatar_valor(valor)}')
+        return '\n'.join(linhas) + '\n'
+
+
+# Registro usado pelo servidor
+REGISTRO = Registro()
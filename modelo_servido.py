@@ -0,0 +1,80 @@
+"""
+Escolha do modelo servido pelo TraduLibras
+
+Decide quais arquivos de modelo e de model_info o servidor carrega, sem
+efeitos colaterais de importação (câmera, MediaPipe, Flask): app.py e
+benchmark.py usam a mesma escolha.
+
+TRADULIBRAS_MODELO seleciona o tipo:
+    compacto   aluno destilado (destilacao.py) quando foi destilado da
+               floresta atual; senão, a floresta (padrão)
+    completo   sempre a floresta original
+    cascata    a cascata do cascata.py, com a floresta como reserva
+"""
+
+import os
+import pickle
+
+from cascata import CAMINHO_INFO_CASCATA, CAMINHO_MODELO_CASCATA
+from destilacao import CAMINHO_INFO_COMPACTO, CAMINHO_MODELO_COMPACTO, aluno_atualizado
+
+CAMINHOS_MODELO = (
+    'modelos/modelo_libras_expandido.pkl',
+    'modelo_libras_expandido.pkl',
+    'modelos/modelo_libras.pkl',
+    'modelo_libras.pkl'
+)
+CAMINHOS_INFO = (
+    'modelos/modelo_info_expandido.pkl',
+    'modelo_info_expandido.pkl',
+    'modelos/modelo_info.pkl',
+    'modelo_info.pkl'
+)
+
+
+def tipo_modelo():
+    """Tipo pedido em TRADULIBRAS_MODELO ('compacto' por padrão)"""
+    return os.environ.get('TRADULIBRAS_MODELO', 'compacto')
+
+
+def compacto_atualizado():
+    """Se o modelo compacto foi destilado da floresta que está em disco"""
+    try:
+        with open(CAMINHO_INFO_COMPACTO, 'rb') as f:
+            atualizado, motivo = aluno_atualizado(pickle.load(f))
+    except Exception as e:
+        atualizado, motivo = False, str(e)
+    if not atualizado:
+        print(f"⚠️  Modelo compacto ignorado ({motivo}); rode destilacao.py para atualizá-lo")
+    return atualizado
+
+
+def _primeiro_existente(caminhos):
+    """Primeiro arquivo que existe e não está vazio (ou None)"""
+    for caminho in caminhos:
+        if os.path.exists(caminho) and os.path.getsize(caminho) > 0:
+            return caminho
+    return None
+
+
+def escolher_arquivos(tipo=None):
+    """(caminho do modelo, caminho do model_info) servidos para o tipo
+
+    Qualquer um dos dois é None quando nenhum arquivo válido existe.
+    """
+    tipo = tipo or tipo_modelo()
+    caminhos_modelo = list(CAMINHOS_MODELO)
+    # Aluno de uma floresta anterior (ex.: re-treino sem nova destilação) não é servido
+    if tipo != 'completo' and os.path.exists(CAMINHO_MODELO_COMPACTO) and compacto_atualizado():
+        caminhos_modelo.insert(0, CAMINHO_MODELO_COMPACTO)
+    if tipo == 'cascata':
+        caminhos_modelo.insert(0, CAMINHO_MODELO_CASCATA)
+    caminho_modelo = _primeiro_existente(caminhos_modelo)
+
+    # Info do aluno destilado/da cascata acompanha o próprio modelo
+    caminhos_info = list(CAMINHOS_INFO)
+    if caminho_modelo == CAMINHO_MODELO_COMPACTO:
+        caminhos_info.insert(0, CAMINHO_INFO_COMPACTO)
+    elif caminho_modelo == CAMINHO_MODELO_CASCATA:
+        caminhos_info.insert(0, CAMINHO_INFO_CASCATA)
+    return caminho_modelo, _primeiro_existente(caminhos_info)
@@ -0,0 +1,161 @@
+"""
+Lógica de reconhecimento do TraduLibras: classificação das features e
+confirmação de letras com cooldown
+
+Fica fora do camera_worker para poder ser reproduzida sem câmera
+(benchmark.py) com exatamente o mesmo comportamento do servidor.
+
+Predições abaixo do limiar de confiança da classe viram "sem letra":
+poses de transição entre letras não são confirmadas e não consomem o
+cooldown.
+
+O cooldown é medido com time.monotonic_ns (imune a ajustes do relógio
+do sistema, como NTP). Cada sessão de usuário tem o seu Reconhecedor
+(sessoes.py).
+"""
+
+import time
+
+import numpy as np
+
+# Resultado explícito de "nenhuma letra" (confiança abaixo do limiar)
+SEM_LETRA = ""
+
+
+def aprender_limiares(probabilidades, y, classes, precisao_alvo=0.95,
+                      limiar_minimo=0.4, limiar_maximo=0.9):
+    """Limiar de confiança por classe a partir de dados de validação
+
+    Para cada classe, o menor limiar em que as predições daquela classe
+    com confiança >= limiar atingem `precisao_alvo`, limitado a
+    [limiar_minimo, limiar_maximo]. O mínimo existe porque poses de
+    transição não aparecem na validação.
+    """
+    probabilidades = np.asarray(probabilidades)
+    classes = np.asarray(classes)
+    y = np.asarray(y)
+    preditas = classes[np.argmax(probabilidades, axis=1)]
+    confiancas = probabilidades.max(axis=1)
+
+    limiares = {}
+    for classe in classes:
+        mascara = preditas == classe
+        if not mascara.any():
+            limiares[str(classe)] = limiar_maximo
+            continue
+        ordem = np.argsort(-confiancas[mascara])
+        acertos = (y[mascara] == classe)[ordem]
+        precisao = np.cumsum(acertos) / np.arange(1, len(acertos) + 1)
+        validos = np.nonzero(precisao >= precisao_alvo)[0]
+        limiar = confiancas[mascara][ordem][validos[-1]] if len(validos) else limiar_maximo
+        limiares[str(classe)] = float(np.clip(limiar, limiar_minimo, limiar_maximo))
+    return limiares
+
+
+class Reconhecedor:
+    """Classifica landmarks e decide quando uma letra é confirmada"""
+
+    def __init__(self, model=None, cooldown=2.5, relogio=time.monotonic_ns,
+                 limiares=None, limiar_padrao=0.0):
+        self.model = model
+        self.cooldown = cooldown  # segundos
+        self.relogio = relogio  # nanossegundos monotônicos
+        self.ultima_predicao = relogio()
+        self.letra_atual = ""
+        self.detectada = False
+        # Distribuição do predict_proba da última letra confirmada
+        # (na ordem de model.classes_), usada pelo decodificador de palavras
+        self.probabilidades = None
+        # Confiança da última classificação e se ela virou "sem letra"
+        self.confianca = 0.0
+        self.rejeitada = False
+        # Se o último processar() chegou a rodar o classificador
+        self.classificou = False
+        self.definir_limiares(limiares, limiar_padrao)
+
+    def definir_modelo(self, model):
+        """Troca o modelo usado nas próximas predições"""
+        self.model = model
+
+    def definir_limiares(self, limiares=None, limiar_padrao=0.0):
+        """Limiares por classe (model_info['limiares']) e o usado nas demais"""
+        self.limiares = {str(c): float(v) for c, v in (limiares or {}).items()}
+        self.limiar_padrao = float(limiar_padrao)
+
+    def limiar(self, classe):
+        return self.limiares.get(str(classe), self.limiar_padrao)
+
+    @property
+    def cooldown(self):
+        return self._cooldown_ns / 1e9
+
+    @cooldown.setter
+    def cooldown(self, segundos):
+        self._cooldown_ns = int(segundos * 1e9)
+
+    def pronto(self, agora=None):
+        """Se o cooldown desde a última confirmação já passou"""
+        agora = agora if agora is not None else self.relogio()
+        return agora - self.ultima_predicao >= self._cooldown_ns
+
+    def usa_probabilidades(self):
+        return hasattr(self.model, 'predict_proba') and hasattr(self.model, 'classes_')
+
+    def calcular_probabilidades(self, landmarks):
+        """predict_proba de um vetor de features (compartilhável entre sessões)"""
+        return self.model.predict_proba(np.asarray(landmarks).reshape(1, -1))[0]
+
+    def classificar(self, landmarks, probabilidades=None):
+        """Roda o classificador em um vetor de features
+
+        Retorna a letra ou SEM_LETRA quando a confiança fica abaixo do
+        limiar da classe. Modelos sem predict_proba não são filtrados.
+        `probabilidades` já calculadas para o frame dispensam o modelo.
+        """
+        landmarks_np = np.asarray(landmarks).reshape(1, -1)
+        if self.usa_probabilidades():
+            if probabilidades is None:
+                probabilidades = self.calcular_probabilidades(landmarks_np)
+            self.probabilidades = probabilidades
+            indice = int(np.argmax(self.probabilidades))
+            letra = self.model.classes_[indice]
+            self.confianca = float(self.probabilidades[indice])
+            self.rejeitada = self.confianca < self.limiar(letra)
+            return SEM_LETRA if self.rejeitada else letra
+        self.probabilidades = None
+        self.confianca = 1.0
+        self.rejeitada = False
+        return self.model.predict(landmarks_np)[0]
+
+    def processar(self, landmarks, agora=None, probabilidades=None):
+        """Processa as features de um frame (None quando não há mão)
+
+        Retorna (letra_atual, detectada). A letra só é reclassificada
+        depois que o cooldown desde a última confirmação passou.
+        `agora` é um instante de time.monotonic_ns (ou do relógio dado).
+        """
+        self.classificou = False
+        if landmarks is None or self.model is None:
+            self.letra_atual = SEM_LETRA
+            self.detectada = False
+            self.confianca = 0.0
+            self.rejeitada = False
+            return self.letra_atual, self.detectada
+
+        agora = agora if agora is not None else self.relogio()
+        if not self.pronto(agora):
+            self.detectada = False
+            return self.letra_atual, self.detectada
+
+        try:
+            self.classificou = True
+            self.letra_atual = self.classificar(landmarks, probabilidades)
+            # "Sem letra" não confirma nada e não reinicia o cooldown
+            self.detectada = self.letra_atual != SEM_LETRA
+            if self.detectada:
+                self.ultima_predicao = agora
+        except Exception as e:
+            print(f"❌ Erro na predição: {e}")
+            self.letra_atual = SEM_LETRA
+            self.detectada = False
+        return self.letra_atual, self.detectada
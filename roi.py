@@ -0,0 +1,122 @@
+"""
+Detecção da mão com recorte na região de interesse (ROI)
+
+Com max_num_hands=1 a mão ocupa uma parte pequena do frame, mas o
+MediaPipe recebe o frame inteiro. No modo ROI, os landmarks do frame
+anterior definem um quadrado em volta da mão (com margem); só esse
+recorte é convertido para RGB, ampliado para um tamanho fixo e
+processado. Os landmarks voltam para as coordenadas do frame inteiro,
+então features, desenho e classificador não mudam.
+
+Quando a mão não é encontrada no recorte (rastreamento perdido), o
+mesmo frame é processado inteiro. Opcionalmente o frame inteiro é
+reduzido para `largura_deteccao` antes da detecção (landmarks são
+normalizados, então não há conversão de coordenadas).
+
+Com max_num_hands=2 (modo duas mãos) o recorte não é usado: todas as
+mãos do frame ficam em `maos`, em ordem canônica (features.ordenar_maos).
+A lateralidade de cada uma fica em `lados` (canonização do modo invariante).
+"""
+
+import cv2
+
+from features import ordenar_maos_com_lados
+
+
+class DetectorMao:
+    """Envolve um mp.solutions.hands.Hands com recorte ROI opcional"""
+
+    def __init__(self, hands, roi=False, margem=0.3, tamanho_roi=224, largura_deteccao=None):
+        self.hands = hands
+        self.roi = roi
+        self.margem = margem
+        self.tamanho_roi = tamanho_roi
+        self.largura_deteccao = largura_deteccao
+        self.janela = None  # (x0, y0, lado) em pixels do frame, a partir da última mão
+        self.maos = []  # mãos do último frame, em ordem canônica
+        self.lados = []  # 'Left'/'Right'/'' de cada mão em `maos`
+        self.frames_duas_maos = 0
+        self.frames_roi = 0
+        self.frames_inteiros = 0
+        self.perdas_roi = 0
+
+    def _janela_da_mao(self, hand_landmarks, largura, altura):
+        """Quadrado em volta dos landmarks (coordenadas do frame inteiro)"""
+        xs = [lm.x * largura for lm in hand_landmarks.landmark]
+        ys = [lm.y * altura for lm in hand_landmarks.landmark]
+        lado = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * self.margem)
+        lado = int(min(max(lado, 32), largura, altura))
+        cx = (max(xs) + min(xs)) / 2
+        cy = (max(ys) + min(ys)) / 2
+        x0 = int(min(max(cx - lado / 2, 0), largura - lado))
+        y0 = int(min(max(cy - lado / 2, 0), altura - lado))
+        return x0, y0, lado
+
+    def _inteiro(self, frame):
+        if self.largura_deteccao and frame.shape[1] > self.largura_deteccao:
+            escala = self.largura_deteccao / frame.shape[1]
+            frame = cv2.resize(frame, (self.largura_deteccao, int(frame.shape[0] * escala)),
+                               interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def preparar(self, frame):
+        """Imagem RGB a processar (recorte ou frame inteiro) e sua janela"""
+        if self.roi and self.janela is not None:
+            x0, y0, lado = self.janela
+            recorte = cv2.resize(frame[y0:y0 + lado, x0:x0 + lado],
+                                 (self.tamanho_roi, self.tamanho_roi),
+                                 interpolation=cv2.INTER_LINEAR)
+            return cv2.cvtColor(recorte, cv2.COLOR_BGR2RGB), self.janela, frame
+        return self._inteiro(frame), None, frame
+
+    def detectar(self, entrada):
+        """Roda o MediaPipe na entrada de preparar()
+
+        Retorna os landmarks (coordenadas do frame inteiro) da primeira
+        mão em ordem canônica, ou None; todas as mãos ficam em `maos`.
+        """
+        rgb, janela, frame = entrada
+        altura, largura = frame.shape[:2]
+        maos, lados = [], []
+        if janela is not None:
+            self.frames_roi += 1
+            maos, lados = self._processar(rgb)
+            if maos:
+                x0, y0, lado = janela
+                for mao in maos:
+                    for lm in mao.landmark:
+                        lm.x = (lm.x * lado + x0) / largura
+                        lm.y = (lm.y * lado + y0) / altura
+                        lm.z = lm.z * lado / largura
+            else:
+                # Rastreamento perdido: o mesmo frame é processado inteiro
+                self.perdas_roi += 1
+                rgb, janela = self._inteiro(frame), None
+
+        if janela is None and not maos:
+            self.frames_inteiros += 1
+            maos, lados = self._processar(rgb)
+
+        self.maos = maos
+        self.lados = lados
+        self.frames_duas_maos += int(len(maos) >= 2)
+        # Recorte só faz sentido rastreando uma mão
+        self.janela = (self._janela_da_mao(maos[0], largura, altura)
+                       if self.roi and len(maos) == 1 else None)
+        return maos[0] if maos else None
+
+    def _processar(self, rgb):
+        resultado = self.hands.process(rgb)
+        if not resultado or not resultado.multi_hand_landmarks:
+            return [], []
+        return ordenar_maos_com_lados(resultado.multi_hand_landmarks, resultado.multi_handedness)
+
+    def estatisticas(self):
+        return {
+            'roi': self.roi,
+            'frames_roi': self.frames_roi,
+            'frames_inteiros': self.frames_inteiros,
+            'perdas_roi': self.perdas_roi,
+            'frames_duas_maos': self.frames_duas_maos,
+            'largura_deteccao': self.largura_deteccao,
+        }
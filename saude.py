@@ -0,0 +1,100 @@
+"""
+Saúde do servidor do TraduLibras
+
+O autoteste do modelo (predict/predict_proba em um vetor de zeros) roda
+quando o modelo é carregado e, opcionalmente, em um agendamento em
+segundo plano. O resultado fica em cache: /status, /test_prediction e
+as sondas de prontidão só leem o cache, sem rodar inferência a cada
+consulta. O teste roda numa cópia sem contadores (sem_contadores) da
+cascata e do índice de vizinhos: o vetor sintético não entra nas
+estatísticas do /status e do /metrics.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+def autoteste_modelo(model):
+    """Roda uma predição de teste e descreve o modelo"""
+    resultado = {
+        'ok': False,
+        'model_loaded': model is not None,
+        'model_classes': [],
+        'model_features': 0,
+        'prediction': None,
+        'confidence': None,
+        'latencia_ms': None,
+        'model_has_classes': hasattr(model, 'classes_'),
+        'model_has_proba': hasattr(model, 'predict_proba'),
+        'error': None,
+        'checked_at': time.time(),
+    }
+    if model is None:
+        resultado['error'] = 'Modelo não carregado'
+        return resultado
+
+    if hasattr(model, 'classes_'):
+        resultado['model_classes'] = [str(c) for c in model.classes_]
+    features = int(getattr(model, 'n_features_in_', 63))
+    resultado['model_features'] = features
+
+    try:
+        if hasattr(model, 'sem_contadores'):
+            model = model.sem_contadores()
+        dados = np.zeros((1, features))
+        inicio = time.perf_counter()
+        if hasattr(model, 'predict_proba'):
+            probabilidades = model.predict_proba(dados)[0]
+            indice = int(np.argmax(probabilidades))
+            resultado['prediction'] = (resultado['model_classes'][indice]
+                                       if resultado['model_classes'] else f"Classe {indice}")
+            resultado['confidence'] = float(probabilidades[indice])
+        else:
+            resultado['prediction'] = str(model.predict(dados)[0])
+            resultado['confidence'] = 0.5
+        resultado['latencia_ms'] = (time.perf_counter() - inicio) * 1000
+        resultado['ok'] = True
+    except Exception as e:
+        resultado['error'] = str(e)
+    return resultado
+
+
+class MonitorSaude:
+    """Guarda o último autoteste e o repete em segundo plano"""
+
+    def __init__(self):
+        self._resultado = autoteste_modelo(None)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._parar = threading.Event()
+
+    def atualizar(self, model):
+        """Roda o autoteste agora e guarda o resultado"""
+        resultado = autoteste_modelo(model)
+        with self._lock:
+            self._resultado = resultado
+        if not resultado['ok']:
+            print(f"⚠️  Autoteste do modelo falhou: {resultado['error']}")
+        return resultado
+
+    def resultado(self):
+        with self._lock:
+            return dict(self._resultado)
+
+    def iniciar_agendamento(self, obter_modelo, intervalo=300):
+        """Repete o autoteste a cada `intervalo` segundos (0 desliga)"""
+        if not intervalo or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        def _laco():
+            while not self._parar.wait(intervalo):
+                self.atualizar(obter_modelo())
+
+        self._parar.clear()
+        self._thread = threading.Thread(target=_laco, name='autoteste', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
@@ -0,0 +1,358 @@
+"""
+Estado de reconhecimento por sessão do TraduLibras
+
+Cada usuário logado tem a própria letra atual, cooldown, texto formado e
+correção; visitantes sem login compartilham a sessão "anonimo". O
+camera_worker extrai as features uma vez por frame e as entrega ao
+GerenciadorSessoes, que roda o classificador no máximo uma vez por frame
+e distribui as probabilidades para as sessões ativas.
+
+As configurações de cada usuário (intervalo entre letras, voz) ficam em
+configuracoes_usuarios.json e são editadas pela página de configurações.
+
+Sessões de usuários de uma escola (cache_modelos.py) usam o modelo da
+escola, e uma fração das demais pode ser servida por um candidato em
+teste A/B (sombra.py); o classificador roda uma vez por frame para cada
+modelo em uso. Predições do modelo global alimentam a avaliação em sombra.
+O modelo da escola é reservado quando a sessão é criada e carregado numa
+thread; até a carga terminar a sessão usa o modelo global.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from cache_predicoes import CachePredicoes
+from correcao import CorretorIncremental
+from reconhecimento import SEM_LETRA, Reconhecedor
+
+SESSAO_ANONIMA = 'anonimo'
+
+CONFIGURACOES_PADRAO = {
+    'cooldown': 2.5,     # segundos entre letras confirmadas
+    'voice': 'pt-br',    # idioma do gTTS
+    'slow': False,       # fala mais devagar
+}
+COOLDOWN_MINIMO = 0.3
+COOLDOWN_MAXIMO = 10.0
+VOZES = ('pt-br', 'en', 'es')
+
+
+def validar_configuracoes(dados, base=None):
+    """Mescla `dados` sobre `base`, validando tipos e limites
+
+    Levanta ValueError com uma mensagem para o usuário se algo for inválido.
+    """
+    resultado = dict(base or CONFIGURACOES_PADRAO)
+    if 'letras_por_minuto' in dados and 'cooldown' not in dados:
+        letras = float(dados['letras_por_minuto'])
+        if letras <= 0:
+            raise ValueError("letras_por_minuto deve ser positivo")
+        dados = dict(dados, cooldown=60.0 / letras)
+    if 'cooldown' in dados:
+        cooldown = float(dados['cooldown'])
+        if not COOLDOWN_MINIMO <= cooldown <= COOLDOWN_MAXIMO:
+            raise ValueError(f"O intervalo entre letras deve ficar entre "
+                             f"{COOLDOWN_MINIMO} e {COOLDOWN_MAXIMO} segundos")
+        resultado['cooldown'] = cooldown
+    if 'voice' in dados:
+        if dados['voice'] not in VOZES:
+            raise ValueError(f"Voz desconhecida: {dados['voice']}")
+        resultado['voice'] = dados['voice']
+    if 'slow' in dados:
+        resultado['slow'] = bool(dados['slow'])
+    return resultado
+
+
+class ConfiguracoesUsuarios:
+    """Configurações por usuário persistidas em JSON"""
+
+    def __init__(self, caminho='configuracoes_usuarios.json', cooldown_padrao=2.5):
+        self.caminho = caminho
+        self.padrao = dict(CONFIGURACOES_PADRAO, cooldown=cooldown_padrao)
+        self.usuarios = {}
+        self._lock = threading.Lock()
+        self.carregar()
+
+    def carregar(self):
+        if not os.path.exists(self.caminho):
+            return
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                self.usuarios = json.load(f).get('usuarios', {})
+        except Exception as e:
+            print(f"❌ Erro ao carregar configurações: {e}")
+
+    def obter(self, usuario):
+        with self._lock:
+            return dict(self.padrao, **self.usuarios.get(usuario, {}))
+
+    def salvar(self, usuario, dados):
+        """Valida, grava e retorna as configurações completas do usuário"""
+        configuracoes = validar_configuracoes(dados, self.obter(usuario))
+        with self._lock:
+            self.usuarios[usuario] = configuracoes
+            try:
+                with open(self.caminho, 'w', encoding='utf-8') as f:
+                    json.dump({'usuarios': self.usuarios,
+                               'last_updated': datetime.now().isoformat()},
+                              f, indent=2, ensure_ascii=False)
+            except Exception as e:
+                print(f"❌ Erro ao salvar configurações: {e}")
+        return configuracoes
+
+
+class EstadoSessao:
+    """Letra, cooldown e texto de uma sessão"""
+
+    def __init__(self, chave, configuracoes, corretor, decodificador=None, escola=None):
+        self.chave = chave
+        self.escola = escola
+        # ModeloEscola em uso (escola ou candidato A/B; None: modelo global)
+        self.modelo_proprio = None
+        self.configuracoes = dict(configuracoes)
+        self.reconhecedor = Reconhecedor(cooldown=self.configuracoes['cooldown'])
+        self.corretor = corretor
+        self.decodificador = decodificador
+        self.lock = threading.Lock()
+        self.letra_atual = SEM_LETRA
+        # Última letra que entrou no texto (volta a SEM_LETRA quando a mão sai)
+        self.letra_registrada = SEM_LETRA
+        self.detectada = False
+        self.texto = ''
+        self.texto_corrigido = ''
+        self.confianca_texto = 0.0
+        self.ultimo_acesso_ns = time.monotonic_ns()
+
+    def tocar(self):
+        """Marca a sessão como ativa (chamado a cada consulta do navegador)"""
+        self.ultimo_acesso_ns = time.monotonic_ns()
+
+    def aplicar_configuracoes(self, configuracoes):
+        self.configuracoes = dict(configuracoes)
+        self.reconhecedor.cooldown = self.configuracoes['cooldown']
+
+    def processar(self, landmarks, agora, probabilidades=None):
+        """Processa um frame; retorna True se uma letra nova entrou no texto"""
+        self.letra_atual, self.detectada = self.reconhecedor.processar(
+            landmarks, agora, probabilidades)
+        if landmarks is None:
+            # Só abaixar a mão permite repetir a letra
+            self.letra_registrada = SEM_LETRA
+            return False
+        # Mesma regra da página: cada troca de letra entra no texto. A comparação
+        # é com a última registrada: um frame rejeitado (sem letra) no meio da
+        # mesma pose não a digita de novo
+        if self.letra_atual and self.letra_atual != self.letra_registrada:
+            self.letra_registrada = self.letra_atual
+            self.registrar_letra(self.letra_atual, self.reconhecedor.probabilidades)
+            return True
+        return False
+
+    def registrar_letra(self, letra, probabilidades=None):
+        """Acrescenta uma letra ao texto formado e atualiza a correção
+
+        Com a distribuição do predict_proba, o texto corrigido vem do
+        decodificador por beam search; sem ela, da correção pelo léxico.
+        """
+        with self.lock:
+            self.texto += str(letra)
+            self.texto_corrigido = self.corretor.adicionar_letra(letra)
+            self.confianca_texto = 0.0
+            if self.decodificador is not None and probabilidades is not None:
+                self.texto_corrigido, self.confianca_texto = self.decodificador.adicionar(probabilidades)
+
+    def limpar_texto(self):
+        with self.lock:
+            self.texto = ''
+            self.texto_corrigido = ''
+            self.confianca_texto = 0.0
+            self.corretor.limpar()
+            if self.decodificador is not None:
+                self.decodificador.limpar()
+        self.letra_atual = SEM_LETRA
+        self.letra_registrada = SEM_LETRA
+        self.detectada = False
+
+    def estado(self):
+        """Estado devolvido por /letra_atual e /eventos"""
+        letra = self.letra_atual if self.letra_atual and str(self.letra_atual).strip() else "-"
+        with self.lock:
+            return {
+                'letra': str(letra),
+                'detectada': self.detectada,
+                'confianca': self.reconhecedor.confianca,
+                'sem_letra': self.reconhecedor.rejeitada,
+                'texto': self.texto,
+                'texto_corrigido': self.texto_corrigido,
+                'confianca_texto': self.confianca_texto,
+            }
+
+
+class GerenciadorSessoes:
+    """Sessões ativas e distribuição dos frames entre elas"""
+
+    def __init__(self, lexico, configuracoes, inatividade=60.0, cache=None, modelos=None):
+        self.lexico = lexico
+        self.configuracoes = configuracoes
+        # Modelos por escola (CacheModelos); None: todos usam o modelo global
+        self.modelos = modelos
+        # Candidato em sombra/A-B (sombra.AvaliadorSombra) ou None
+        self.sombra = None
+        # predict_proba memoizado por vetor quantizado (passo 0: sem cache)
+        self.cache = cache if cache is not None else CachePredicoes(passo=0)
+        self.inatividade_ns = int(inatividade * 1e9)
+        self.sessoes = {}
+        self._lock = threading.Lock()
+        self.model = None
+        self.limiares = None
+        self.limiar_padrao = 0.0
+        self.criar_decodificador = None
+        self.fabrica_decodificador = None
+
+    def definir_modelo(self, model, limiares=None, limiar_padrao=0.0, criar_decodificador=None,
+                       fabrica_decodificador=None):
+        """Troca modelo, limiares e decodificador de todas as sessões
+
+        `fabrica_decodificador(model, model_info)` cria a fábrica de
+        decodificadores dos modelos de escola.
+        """
+        self.cache.definir_modelo(model)
+        with self._lock:
+            self.model = model
+            self.limiares = limiares
+            self.limiar_padrao = limiar_padrao
+            self.criar_decodificador = criar_decodificador
+            self.fabrica_decodificador = fabrica_decodificador
+            for sessao in self.sessoes.values():
+                self._configurar(sessao, sessao.modelo_proprio)
+
+    def definir_sombra(self, sombra):
+        """Liga (ou desliga, com None) o candidato em sombra/A-B"""
+        self.sombra = sombra
+        # Sessões A/B trocam de modelo no próximo frame (processar)
+
+    def _modelo_da_sessao(self, sessao):
+        """ModeloEscola da sessão, ou None para o modelo global
+
+        Escola tem prioridade; sessões sem escola sorteadas para o A/B
+        usam o candidato. Nunca bloqueia: enquanto o modelo da escola
+        carrega (ou recarrega depois de um descarregar), a sessão fica com
+        o que já usa.
+        """
+        if sessao.escola is not None and self.modelos is not None:
+            modelo = self.modelos.consultar(sessao.escola)
+            return modelo if modelo is not None else sessao.modelo_proprio
+        sombra = self.sombra
+        if sombra is not None and sessao.escola is None and sombra.roteia(sessao.chave):
+            return sombra.modelo
+        return None
+
+    def _configurar(self, sessao, modelo_proprio=None):
+        sessao.modelo_proprio = modelo_proprio
+        if modelo_proprio is None:
+            model, limiares, criar_decodificador = self.model, self.limiares, self.criar_decodificador
+        else:
+            model = modelo_proprio.model
+            limiares = modelo_proprio.info.get('limiares')
+            criar_decodificador = (self.fabrica_decodificador(model, modelo_proprio.info)
+                                   if self.fabrica_decodificador else None)
+        sessao.reconhecedor.definir_modelo(model)
+        sessao.reconhecedor.definir_limiares(limiares, self.limiar_padrao)
+        with sessao.lock:
+            sessao.decodificador = criar_decodificador() if criar_decodificador else None
+
+    def obter(self, chave=SESSAO_ANONIMA, escola=None):
+        """Sessão do usuário (criada na primeira consulta)"""
+        with self._lock:
+            sessao = self.sessoes.get(chave)
+        if sessao is None or sessao.escola != escola:
+            nova = EstadoSessao(chave, self.configuracoes.obter(chave),
+                                CorretorIncremental(self.lexico), escola=escola)
+            if escola is not None and self.modelos is not None:
+                # Reservado enquanto a sessão existir; se ainda não estiver
+                # carregado, a carga vai para uma thread e fica o modelo global
+                modelo_proprio = self.modelos.reservar(escola)
+            else:
+                modelo_proprio = self._modelo_da_sessao(nova)
+            self._configurar(nova, modelo_proprio)
+            with self._lock:
+                sessao = self.sessoes.get(chave)
+                if sessao is None or sessao.escola != escola:
+                    substituida, sessao = sessao, nova
+                    self.sessoes[chave] = nova
+                else:
+                    substituida = nova  # outra thread criou a sessão antes
+            self._liberar(substituida)
+        sessao.tocar()
+        return sessao
+
+    def _liberar(self, sessao):
+        """Devolve a reserva do modelo da escola de uma sessão encerrada"""
+        if sessao is not None and sessao.escola is not None and self.modelos is not None:
+            self.modelos.liberar(sessao.escola)
+
+    def salvar_configuracoes(self, chave, dados):
+        """Grava as configurações do usuário e aplica na sessão dele"""
+        configuracoes = self.configuracoes.salvar(chave, dados)
+        with self._lock:
+            sessao = self.sessoes.get(chave)
+        if sessao is not None:
+            sessao.aplicar_configuracoes(configuracoes)
+        return configuracoes
+
+    def ativas(self):
+        """Sessões consultadas recentemente (a anônima nunca expira)"""
+        agora = time.monotonic_ns()
+        with self._lock:
+            expiradas = [self.sessoes.pop(c) for c, s in list(self.sessoes.items())
+                         if c != SESSAO_ANONIMA and agora - s.ultimo_acesso_ns > self.inatividade_ns]
+            ativas = list(self.sessoes.values())
+        for sessao in expiradas:
+            self._liberar(sessao)
+        return ativas
+
+    def processar(self, landmarks, agora=None):
+        """Entrega as features de um frame a todas as sessões ativas
+
+        Retorna (classificou, rejeicoes, letras_registradas). O
+        predict_proba roda uma única vez por modelo em uso (o global vem
+        do cache), e só se alguma sessão dele estiver fora do cooldown.
+        """
+        agora = agora if agora is not None else time.monotonic_ns()
+        grupos = {}  # id do modelo -> (função de predição, sessões)
+        for sessao in self.ativas():
+            modelo_proprio = self._modelo_da_sessao(sessao)
+            # Modelo da escola terminou de carregar ou foi recarregado, candidato A/B
+            # ligado ou desligado
+            if modelo_proprio is not sessao.modelo_proprio:
+                self._configurar(sessao, modelo_proprio)
+            if modelo_proprio is None:
+                chave, prever = None, self.cache.predict_proba
+            else:
+                chave, prever = id(modelo_proprio), modelo_proprio.predict_proba
+            grupos.setdefault(chave, (prever, []))[1].append(sessao)
+
+        classificou = False
+        rejeicoes = 0
+        letras = 0
+        for chave, (prever, sessoes) in grupos.items():
+            probabilidades = None
+            if landmarks is not None and (chave is not None or self.model is not None):
+                prontas = [s for s in sessoes if s.reconhecedor.pronto(agora)]
+                if prontas and prontas[0].reconhecedor.usa_probabilidades():
+                    try:
+                        probabilidades = prever(landmarks)
+                    except Exception as e:
+                        print(f"❌ Erro na predição: {e}")
+                    sombra = self.sombra
+                    if chave is None and sombra is not None and probabilidades is not None:
+                        sombra.amostrar(landmarks, probabilidades, self.model)
+
+            for sessao in sessoes:
+                letras += int(sessao.processar(landmarks, agora, probabilidades))
+                classificou = classificou or sessao.reconhecedor.classificou
+                rejeicoes += int(sessao.reconhecedor.classificou and sessao.reconhecedor.rejeitada)
+        return classificou, rejeicoes, letras
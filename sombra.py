@@ -0,0 +1,219 @@
+"""
+Avaliação de um modelo candidato no tráfego real (sombra e A/B)
+
+Sombra: uma fração dos vetores de features classificados pelo modelo
+principal entra em uma fila limitada; uma thread em segundo plano roda
+o candidato (e o principal de novo, para cronometrar os dois nas mesmas
+condições, numa cópia que não mexe nos contadores da cascata e do índice
+de vizinhos mostrados no /status) e acumula a concordância entre as letras e a diferença de
+latência. O camera_worker só faz um sorteio e um put_nowait: fila cheia
+descarta a amostra em vez de esperar.
+
+A/B: opcionalmente uma fração das sessões (sorteada pelo hash da chave
+da sessão, então o usuário fica sempre no mesmo grupo) é servida pelo
+candidato (GerenciadorSessoes).
+
+A cada `intervalo_log` segundos um resumo vai para um arquivo JSONL,
+a evidência para promover (ou não) o candidato.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from cache_modelos import ModeloEscola
+
+CAMINHO_MODELO_CANDIDATO = 'modelos/modelo_libras_candidato.pkl'
+CAMINHO_INFO_CANDIDATO = 'modelos/modelo_info_candidato.pkl'
+LOG_PADRAO = 'sombra.jsonl'
+PASTA_MODELOS = 'modelos'
+
+
+def _percentil(valores, p):
+    return float(np.percentile(valores, p)) if valores else None
+
+
+class AvaliadorSombra:
+    """Roda um candidato em sombra e decide quais sessões vão para ele"""
+
+    def __init__(self, candidato, info=None, fracao=0.1, fracao_sessoes=0.0, fila_max=256,
+                 caminho_log=LOG_PADRAO, intervalo_log=60.0, origem=None, backend=None):
+        self.fracao = float(fracao)
+        self.fracao_sessoes = float(fracao_sessoes)
+        self.origem = origem
+        self.caminho_log = caminho_log
+        self.intervalo_log = intervalo_log
+        # O candidato servido às sessões A/B (mesma interface dos modelos de escola)
+        self.modelo = ModeloEscola('candidato', candidato, info or {},
+                                   backend or type(candidato).__name__,
+                                   0.0, 0.0, compartilhado=False)
+        self.n_features = getattr(candidato, 'n_features_in_', None)
+        self.fila = queue.Queue(maxsize=fila_max)
+        self._lock = threading.Lock()
+        self.amostradas = 0
+        self.descartadas = 0
+        self.comparadas = 0
+        self.concordancias = 0
+        self.erros = 0
+        self._divergencias = Counter()  # (principal, candidato) -> n
+        self._lat_principal = []
+        self._lat_candidato = []
+        self._conf_principal = 0.0
+        self._conf_candidato = 0.0
+        self.inicio = time.time()
+        self._ultimo_log = time.monotonic()
+        # (modelo servido, cópia sem contadores) cronometrada na thread
+        self._principal = (None, None)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._trabalhar, name='sombra', daemon=True)
+        self._thread.start()
+
+    def roteia(self, chave_sessao):
+        """Se a sessão é servida pelo candidato (sorteio estável pela chave)"""
+        if self.fracao_sessoes <= 0:
+            return False
+        resumo = hashlib.sha1(str(chave_sessao).encode('utf-8')).digest()
+        return int.from_bytes(resumo[:8], 'big') / 2 ** 64 < self.fracao_sessoes
+
+    def amostrar(self, features, probabilidades, model):
+        """Chamado no camera_worker com a predição do modelo principal"""
+        if self.fracao <= 0 or random.random() >= self.fracao:
+            return
+        # Vetores de duas mãos (126 features) não servem a um candidato de uma mão
+        if self.n_features and len(features) != self.n_features:
+            return
+        try:
+            self.fila.put_nowait((np.asarray(features, dtype=np.float32), probabilidades, model))
+            self.amostradas += 1
+        except queue.Full:
+            self.descartadas += 1
+
+    def _trabalhar(self):
+        while not self._parar.is_set():
+            try:
+                features, probabilidades, model = self.fila.get(timeout=0.5)
+            except queue.Empty:
+                self._registrar_resumo()
+                continue
+            try:
+                self._comparar(features.reshape(1, -1), probabilidades, model)
+            except Exception as e:
+                with self._lock:
+                    self.erros += 1
+                if self.erros <= 3:
+                    print(f"❌ Erro na avaliação em sombra: {e}")
+            self._registrar_resumo()
+
+    def _sem_contadores(self, model):
+        servido, copia = self._principal
+        if servido is not model:
+            copia = model.sem_contadores() if hasattr(model, 'sem_contadores') else model
+            self._principal = (model, copia)
+        return copia
+
+    def _comparar(self, X, probabilidades, model):
+        inicio = time.perf_counter()
+        self._sem_contadores(model).predict_proba(X)
+        lat_principal = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        prob_candidato = self.modelo.model.predict_proba(X)[0]
+        lat_candidato = (time.perf_counter() - inicio) * 1000
+
+        i_principal = int(np.argmax(probabilidades))
+        i_candidato = int(np.argmax(prob_candidato))
+        letra_principal = str(model.classes_[i_principal])
+        letra_candidato = str(self.modelo.model.classes_[i_candidato])
+        with self._lock:
+            self.comparadas += 1
+            if letra_principal == letra_candidato:
+                self.concordancias += 1
+            else:
+                self._divergencias[(letra_principal, letra_candidato)] += 1
+            self._conf_principal += float(probabilidades[i_principal])
+            self._conf_candidato += float(prob_candidato[i_candidato])
+            for tempos, valor in ((self._lat_principal, lat_principal),
+                                  (self._lat_candidato, lat_candidato)):
+                tempos.append(valor)
+                if len(tempos) > 5000:
+                    del tempos[:2500]
+
+    def _registrar_resumo(self):
+        if not self.caminho_log or time.monotonic() - self._ultimo_log < self.intervalo_log:
+            return
+        self._ultimo_log = time.monotonic()
+        resumo = self.estatisticas()
+        if not resumo['comparadas']:
+            return
+        try:
+            with open(self.caminho_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(dict(resumo, data=datetime.now().isoformat(timespec='seconds')),
+                                   ensure_ascii=False) + '\n')
+        except Exception as e:
+            print(f"⚠️  Não foi possível gravar o log da sombra: {e}")
+
+    def estatisticas(self):
+        with self._lock:
+            comparadas = self.comparadas
+            p50_principal = _percentil(self._lat_principal, 50)
+            p50_candidato = _percentil(self._lat_candidato, 50)
+            return {
+                'candidato': self.origem,
+                'fracao': self.fracao,
+                'fracao_sessoes': self.fracao_sessoes,
+                'desde': self.inicio,
+                'amostradas': self.amostradas,
+                'descartadas': self.descartadas,
+                'fila': self.fila.qsize(),
+                'comparadas': comparadas,
+                'erros': self.erros,
+                'concordancia': self.concordancias / comparadas if comparadas else None,
+                'divergencias': [{'principal': p, 'candidato': c, 'n': n}
+                                 for (p, c), n in self._divergencias.most_common(10)],
+                'confianca_principal': self._conf_principal / comparadas if comparadas else None,
+                'confianca_candidato': self._conf_candidato / comparadas if comparadas else None,
+                'latencia_principal_p50_ms': p50_principal,
+                'latencia_candidato_p50_ms': p50_candidato,
+                'latencia_principal_p95_ms': _percentil(self._lat_principal, 95),
+                'latencia_candidato_p95_ms': _percentil(self._lat_candidato, 95),
+                'diferenca_latencia_p50_ms': (p50_candidato - p50_principal
+                                              if comparadas else None),
+                'ab': self.modelo.estatisticas(),
+            }
+
+    def parar(self):
+        """Encerra a thread (o resumo final vai para o log)"""
+        self._parar.set()
+        self._thread.join(timeout=2)
+        self._ultimo_log = float('-inf')
+        self._registrar_resumo()
+
+
+def validar_caminho(caminho, pasta=PASTA_MODELOS):
+    """O caminho, se estiver dentro de `pasta`; o pickle de fora não é carregado"""
+    base = os.path.realpath(pasta)
+    if os.path.commonpath([base, os.path.realpath(caminho)]) != base:
+        raise ValueError(f"O candidato precisa ficar em {pasta}/: {caminho!r}")
+    return caminho
+
+
+def carregar_candidato(caminho_modelo=CAMINHO_MODELO_CANDIDATO, caminho_info=None):
+    """(modelo, model_info) do candidato; o info é opcional"""
+    with open(caminho_modelo, 'rb') as f:
+        model = pickle.load(f)
+    if caminho_info is None:
+        caminho_info = (CAMINHO_INFO_CANDIDATO if caminho_modelo == CAMINHO_MODELO_CANDIDATO
+                        else None)
+    info = {}
+    if caminho_info and os.path.exists(caminho_info):
+        with open(caminho_info, 'rb') as f:
+            info = pickle.load(f)
+    return model, info
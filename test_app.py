@@ -24,9 +24,9 @@ def test_app():
             status_data = response.json()
             print(f"✅ Status: {status_data['status']}")
             print(f"📊 Modelo carregado: {status_data['model_loaded']}")
-            print(f"🎤 Voz: {status_data['voice']}")
-            print(f"📱 Versão: {status_data['version']}")
-            print(f"🤖 Classes: {status_data['model_classes']}")
+            print(f"📹 Câmera: {status_data.get('camera_available')}")
+            print(f"⏱️ Cooldown: {status_data.get('prediction_cooldown')}")
+            print(f"🤖 Classes: {status_data.get('model_classes')}")
         else:
             print(f"❌ Erro no status: {response.status_code}")
             return False
@@ -71,7 +71,7 @@ def test_app():
     # Teste 5: Limpeza de texto
     print("\n5️⃣ Testando limpeza de texto...")
     try:
-        response = requests.get(f"{base_url}/clear_text", timeout=5)
+        response = requests.post(f"{base_url}/clear_text", timeout=5)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ Texto limpo: {data.get('message', 'OK')}")
@@ -90,12 +90,10 @@ def test_app():
             timeout=10
         )
         if response.status_code == 200:
-            data = response.json()
-            if data.get('status') == 'success':
-                print(f"✅ Síntese de voz funcionando: '{data.get('text_spoken')}'")
-                print(f"🎤 Voz: {data.get('voice')}")
+            if response.headers.get('Content-Type', '').startswith('audio/'):
+                print(f"✅ Síntese de voz funcionando: {len(response.content)} bytes de áudio")
             else:
-                print(f"⚠️ Aviso na síntese: {data.get('error')}")
+                print(f"⚠️ Aviso na síntese: {response.json().get('error')}")
         else:
             print(f"❌ Erro na síntese: {response.status_code}")
     except Exception as e:
@@ -104,13 +102,16 @@ def test_app():
     # Teste 7: Stream de vídeo (verificar se existe)
     print("\n7️⃣ Testando stream de vídeo...")
     try:
-        response = requests.get(f"{base_url}/video_feed", timeout=5)
+        response = requests.get(f"{base_url}/video_feed", timeout=5, stream=True)
         if response.status_code == 200:
             print("✅ Stream de vídeo disponível")
         else:
             print(f"❌ Erro no stream: {response.status_code}")
+        response.close()
     except Exception as e:
         print(f"❌ Erro: {e}")
+
+    print("\n📊 Para medir latência e FPS sem câmera use: python benchmark.py rodar gravacoes/")
     
     print("\n" + "=" * 50)
     print("🎉 Testes concluídos!")
@@ -123,6 +124,157 @@ def test_app():
     
     return True
 
+def test_correcao_digitos():
+    """Dígitos confundidos com letras (0/O, 1/I, 5/S, 8/B) são corrigidos no servidor"""
+    from correcao import Lexico, corrigir_texto
+
+    lexico = Lexico.carregar()
+    assert corrigir_texto('O1A B0M D1A', lexico) == 'OLA BOM DIA'
+    assert corrigir_texto('0LA', lexico) == 'OLA'
+    assert corrigir_texto('5IM', lexico) == 'SIM'
+    assert corrigir_texto('8OM', lexico) == 'BOM'
+
+def test_cache_modelos_lru(tmp_path):
+    """O LRU de modelos por escola respeita o orçamento e as reservas das sessões"""
+    import os
+    import joblib
+    import numpy as np
+    from sklearn.linear_model import LogisticRegression
+    from cache_modelos import CacheModelos, caminhos_escola
+
+    X = np.random.default_rng(0).normal(size=(20, 63))
+    modelo = LogisticRegression(max_iter=200).fit(X, ['A', 'B'] * 10)
+    for escola in ('a', 'b', 'c', 'd'):
+        caminho_modelo, _ = caminhos_escola(escola, str(tmp_path))
+        os.makedirs(os.path.dirname(caminho_modelo))
+        joblib.dump(modelo, caminho_modelo)
+    tamanho_mb = os.path.getsize(caminho_modelo) / 1e6
+
+    # Cabem dois modelos: o menos usado recentemente sai
+    cache = CacheModelos(orcamento_mb=2.5 * tamanho_mb, pasta=str(tmp_path))
+    cache.obter('a')
+    cache.obter('b')
+    cache.obter('a')
+    cache.obter('c')
+    assert list(cache.estatisticas()['modelos']) == ['a', 'c']
+    assert cache.descartes == 1 and cache.acertos == 1
+
+    # Modelo reservado fica mesmo com o orçamento estourado
+    cache.reservar('a')
+    cache.reservar('a')
+    cache.obter('b')
+    cache.obter('d')
+    assert list(cache.estatisticas()['modelos']) == ['a', 'd']
+    assert cache.estatisticas()['reservas'] == {'a': 2}
+    cache.liberar('a')
+    assert 'a' in cache.estatisticas()['modelos']
+    cache.obter('b')
+    assert list(cache.estatisticas()['modelos']) == ['a', 'b']
+    cache.liberar('a')
+    assert list(cache.estatisticas()['modelos']) == ['a', 'b']
+    cache.obter('c')
+    assert list(cache.estatisticas()['modelos']) == ['b', 'c']
+
+def test_vizinhos_mistura_e_capacidade():
+    """O voto dos vizinhos pesa a fração dos k que estão perto; o índice descarta as mais antigas"""
+    import numpy as np
+    from sklearn.dummy import DummyClassifier
+    from vizinhos import ClassificadorComVizinhos, IndiceVizinhos
+
+    principal = DummyClassifier(strategy='prior').fit(np.zeros((4, 3)), ['A', 'B'] * 2)
+    indice = IndiceVizinhos(n_features=3, k=5, minimo_por_classe=5)
+    indice.adicionar('Z', [[0.1 * i, 0, 0] for i in range(5)])
+    indice.adicionar('Y', [[5, 5, 5], [5, 5, 5.1]])
+    classificador = ClassificadorComVizinhos(principal, indice, raio=0.25)
+    assert list(classificador.classes_) == ['A', 'B', 'Y', 'Z']
+
+    probabilidades = classificador.predict_proba(np.array([
+        [0.2, 0, 0],  # os 5 vizinhos perto: só o índice
+        [0, 0, 0],    # 3 dos 5 perto: 60% índice, 40% modelo
+        [9, 9, 9],    # longe de tudo: só o modelo
+        [5, 5, 5],    # perto de Y, que tem poucas amostras e não vota
+    ]))
+    np.testing.assert_allclose(probabilidades, [
+        [0, 0, 0, 1],
+        [0.2, 0.2, 0, 0.6],
+        [0.5, 0.5, 0, 0],
+        [0.5, 0.5, 0, 0],
+    ])
+    assert indice.atendidas == 1
+    classificador.sem_contadores().predict_proba(np.zeros((1, 3)))
+    assert indice.atendidas == 1
+
+    # Acima de por_classe sai a mais antiga da letra; acima da capacidade,
+    # a mais antiga da letra com mais amostras
+    indice = IndiceVizinhos(n_features=3, capacidade=6, por_classe=4)
+    indice.adicionar('A', np.arange(15).reshape(5, 3))
+    assert indice.amostras()[2].tolist() == [1, 2, 3, 4]
+    indice.adicionar('B', np.ones((3, 3)))
+    assert indice.amostras()[2].tolist() == [2, 3, 4, 5, 6, 7]
+    indice.adicionar('B', np.ones((1, 3)))
+    _, rotulos, ids = indice.amostras()
+    assert ids.tolist() == [2, 3, 4, 6, 7, 8]
+    assert rotulos.tolist() == ['A', 'A', 'A', 'B', 'B', 'B']
+    assert indice.descartadas == 3
+
+def test_manutencao_poda_e_balanceamento():
+    """Quase-duplicatas saem por classe (fica a mais antiga) e o balanceamento espalha as mantidas"""
+    import numpy as np
+    from manutencao_dataset import (_podar_por_distancia, balancear_classes, podar_duplicatas,
+                                    teto_balanceamento)
+
+    X = np.zeros((8, 4), dtype=np.float32)
+    X[:, 0] = [0, 0, 0.001, 0.04, 0.2, 0.23, 0, 0.5]
+    y = np.array(['A', 'A', 'A', 'A', 'A', 'A', 'B', 'A'])
+    # Repetição exata e tremor saem na grade, 0.04 e 0.23 na passada de distâncias;
+    # a mesma pose em outra classe fica
+    assert podar_duplicatas(X, y, raio=0.05).tolist() == [0, 4, 6, 7]
+    assert podar_duplicatas(X, y, raio=0).tolist() == list(range(8))
+
+    # Em blocos, o resultado é o mesmo da poda gulosa amostra a amostra
+    aleatorio = np.random.default_rng(0).normal(scale=0.1, size=(200, 3)).astype(np.float32)
+    esperado = []
+    for i, amostra in enumerate(aleatorio):
+        if all(np.linalg.norm(amostra - aleatorio[j]) > 0.1 for j in esperado):
+            esperado.append(i)
+    assert _podar_por_distancia(aleatorio, 0.1, bloco=16).tolist() == esperado
+
+    y = np.array(['A'] * 10 + ['B'] * 3)
+    assert balancear_classes(y, 4).tolist() == [0, 3, 6, 9, 10, 11, 12]
+    assert balancear_classes(y, None).tolist() == list(range(13))
+    assert balancear_classes(y, 2, indices=[1, 2, 5, 8, 10, 12]).tolist() == [1, 8, 10, 12]
+    assert teto_balanceamento({'A': 10, 'B': 3, 'C': 5}, 'mediana') == 5
+    assert teto_balanceamento({'A': 10, 'B': 3}, 'minimo') == 3
+
+def test_aumento_numero_de_arvores():
+    """Treinar com aumento em rodadas (warm_start) deixa exatamente n_estimators árvores"""
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from aumento import AumentoLandmarks, ajustar
+
+    X = np.random.default_rng(0).normal(size=(60, 63)).astype(np.float32)
+    y = np.repeat(['A', 'B', 'C'], 20)
+    for arvores, multiplicador in ((10, 3), (7, 3), (2, 5), (5, 1)):
+        floresta = RandomForestClassifier(n_estimators=arvores, random_state=0)
+        ajustar(floresta, X, y, AumentoLandmarks(multiplicador))
+        assert len(floresta.estimators_) == arvores
+        assert floresta.get_params()['n_estimators'] == arvores
+        assert not floresta.get_params()['warm_start']
+        # Re-treinar a mesma floresta não acumula árvores
+        ajustar(floresta, X, y, AumentoLandmarks(multiplicador))
+        assert len(floresta.estimators_) == arvores
+
+    pipeline = make_pipeline(StandardScaler(), RandomForestClassifier(n_estimators=9, random_state=0))
+    ajustar(pipeline, X, y, AumentoLandmarks(4))
+    assert len(pipeline.steps[-1][1].estimators_) == 9
+
+    # Estimadores que não são florestas treinam só no dataset base
+    linear = ajustar(LogisticRegression(max_iter=500), X, y, AumentoLandmarks(4))
+    assert linear.predict(X[:1]).shape == (1,)
+
 def check_dependencies():
     """Verifica se as dependências estão instaladas"""
     print("🔍 Verificando dependências...")
@@ -0,0 +1,166 @@
+"""
+Rastreamento por frame e profiler por amostragem do TraduLibras
+
+- Rastreador: cada frame do camera_worker vira uma linha do tempo com a
+  duração de cada estágio (leitura, cvtColor, MediaPipe, features,
+  classificador, desenho). As últimas N linhas ficam em um buffer
+  circular e podem ser exportadas no formato Chrome Trace (abre em
+  chrome://tracing, Perfetto ou speedscope).
+- ProfilerAmostragem: thread que lê sys._current_frames() em intervalos
+  fixos e acumula as pilhas no formato "collapsed" (flamegraph.pl,
+  speedscope). Liga e desliga com o servidor rodando.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+
+class LinhaTempo:
+    """Estágios de um frame: lista de (nome, início_ns, fim_ns)"""
+
+    __slots__ = ('numero', 'thread', 'inicio_ns', 'fim_ns', 'spans', 'anotacoes')
+
+    def __init__(self, numero):
+        self.numero = numero
+        self.thread = threading.get_ident()
+        self.inicio_ns = time.perf_counter_ns()
+        self.fim_ns = None
+        self.spans = []
+        self.anotacoes = {}
+
+    @contextmanager
+    def span(self, nome):
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.spans.append((nome, inicio, time.perf_counter_ns()))
+
+    def anotar(self, **valores):
+        """Informações extras do frame (letra, mão detectada...)"""
+        self.anotacoes.update(valores)
+
+
+class Rastreador:
+    """Buffer circular com as linhas do tempo dos últimos frames"""
+
+    def __init__(self, capacidade=300):
+        self.frames = deque(maxlen=capacidade)
+        self.contador = 0
+        # Referência de tempo para os timestamps exportados
+        self.origem_ns = time.perf_counter_ns()
+        self.origem_epoch_us = time.time() * 1e6
+
+    def iniciar_frame(self):
+        self.contador += 1
+        return LinhaTempo(self.contador)
+
+    def finalizar(self, linha):
+        linha.fim_ns = time.perf_counter_ns()
+        # deque com maxlen descarta o frame mais antigo sem lock
+        self.frames.append(linha)
+
+    def resumo(self):
+        """Média e máximo por estágio (ms) nos frames do buffer"""
+        duracoes = {}
+        for linha in list(self.frames):
+            for nome, inicio, fim in linha.spans:
+                duracoes.setdefault(nome, []).append((fim - inicio) / 1e6)
+        return {nome: {'n': len(v), 'media_ms': sum(v) / len(v), 'max_ms': max(v)}
+                for nome, v in duracoes.items()}
+
+    def exportar_chrome(self):
+        """Dicionário no formato Chrome Trace Event (eventos completos 'X')"""
+        def _us(ns):
+            return self.origem_epoch_us + (ns - self.origem_ns) / 1e3
+
+        eventos = []
+        for linha in list(self.frames):
+            eventos.append({
+                'name': 'frame', 'cat': 'frame', 'ph': 'X', 'pid': os.getpid(), 'tid': linha.thread,
+                'ts': _us(linha.inicio_ns), 'dur': (linha.fim_ns - linha.inicio_ns) / 1e3,
+                'args': dict(linha.anotacoes, frame=linha.numero),
+            })
+            for nome, inicio, fim in linha.spans:
+                eventos.append({
+                    'name': nome, 'cat': 'estagio', 'ph': 'X', 'pid': os.getpid(), 'tid': linha.thread,
+                    'ts': _us(inicio), 'dur': (fim - inicio) / 1e3, 'args': {'frame': linha.numero},
+                })
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+
+class ProfilerAmostragem:
+    """Profiler estatístico: amostra as pilhas de todas as threads"""
+
+    def __init__(self):
+        self.pilhas = Counter()
+        self.amostras = 0
+        self.intervalo = 0.005
+        self.inicio = None
+        self.fim = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    @property
+    def ativo(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self, intervalo=0.005, duracao=None):
+        """Começa a amostrar (zera as pilhas anteriores); duracao em segundos"""
+        if self.ativo:
+            return False
+        self.pilhas = Counter()
+        self.amostras = 0
+        self.intervalo = intervalo
+        self.inicio = time.time()
+        self.fim = None
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._amostrar, args=(duracao,),
+                                        name='profiler', daemon=True)
+        self._thread.start()
+        return True
+
+    def parar(self):
+        if not self.ativo:
+            return False
+        self._parar.set()
+        self._thread.join(timeout=2)
+        return True
+
+    def _amostrar(self, duracao):
+        proprio = threading.get_ident()
+        limite = time.monotonic() + duracao if duracao else None
+        while not self._parar.wait(self.intervalo):
+            nomes = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                pilha = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                    frame = frame.f_back
+                pilha.append(f"thread:{nomes.get(ident, ident)}")
+                self.pilhas[';'.join(reversed(pilha))] += 1
+            self.amostras += 1
+            if limite and time.monotonic() >= limite:
+                break
+        self.fim = time.time()
+
+    def estado(self):
+        return {
+            'ativo': self.ativo,
+            'amostras': self.amostras,
+            'intervalo_ms': self.intervalo * 1000,
+            'inicio': self.inicio,
+            'fim': self.fim,
+            'pilhas_distintas': len(self.pilhas),
+        }
+
+    def collapsed(self):
+        """Pilhas no formato "a;b;c contagem", uma por linha"""
+        return ''.join(f"{pilha} {n}\n" for pilha, n in self.pilhas.most_common())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Treinamento paralelo do TraduLibras com busca de hiperparâmetros
+
+Lê o dataset em float32, avalia candidatos com validação cruzada usando
+todos os núcleos e escolhe o modelo pelo par acurácia + latência de uma
+predição isolada (que é o que o servidor faz a cada frame).
+
+Uso:
+    python treinamento.py --dataset gestos_libras.csv --folds 5
+
+    # Modelo de duas mãos (gestos_libras_duas_maos.csv -> modelo_libras_duas_maos.pkl)
+    python treinamento.py --duas-maos
+
+    # Vocabulário de uma escola (-> modelos/escolas/<escola>/, servido por cache_modelos.py)
+    python treinamento.py --dataset gestos_escola_norte.csv --escola escola_norte
+
+    # Candidato avaliado em sombra/A-B antes de substituir o modelo (sombra.py)
+    python treinamento.py --candidato
+
+    # Modelo sobre features invariantes (ângulos/distâncias, mão esquerda espelhada)
+    python treinamento.py --features invariante
+
+    # Aumento de dados: cada floresta vê 5 versões do dataset (aumento.py)
+    python treinamento.py --aumento 5 --semente 42
+"""
+
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+
+from aumento import AumentoLandmarks, ajustar, usa_aumento
+from cache_modelos import caminhos_escola
+from classificador_maos import CAMINHO_INFO_DUAS_MAOS, CAMINHO_MODELO_DUAS_MAOS, DATASET_DUAS_MAOS
+from dataset import DATASET_PADRAO, DatasetStore
+from decodificador import matriz_confusao
+from invariantes import MODOS_FEATURES, info_do_modo, modelo_do_modo
+from reconhecimento import aprender_limiares
+from sombra import CAMINHO_INFO_CANDIDATO, CAMINHO_MODELO_CANDIDATO
+
+CAMINHO_MODELO = 'modelos/modelo_libras_expandido.pkl'
+CAMINHO_INFO = 'modelos/modelo_info_expandido.pkl'
+
+
+def gerar_candidatos(rapido=False):
+    """Lista (nome, estimador) dos modelos avaliados na busca"""
+    tamanhos = [50, 100] if rapido else [50, 100, 200]
+    profundidades = [10, None] if rapido else [10, 15, None]
+
+    candidatos = []
+    for n in tamanhos:
+        for profundidade in profundidades:
+            candidatos.append((
+                f"RandomForest(n={n}, depth={profundidade})",
+                RandomForestClassifier(n_estimators=n, max_depth=profundidade,
+                                       min_samples_split=3, random_state=42)
+            ))
+    for profundidade in ([None] if rapido else [15, None]):
+        candidatos.append((
+            f"ExtraTrees(n=100, depth={profundidade})",
+            ExtraTreesClassifier(n_estimators=100, max_depth=profundidade, random_state=42)
+        ))
+    candidatos.append(("LogisticRegression", LogisticRegression(max_iter=2000)))
+    candidatos.append(("KNN(k=5)", KNeighborsClassifier(n_neighbors=5)))
+    return candidatos
+
+
+def _avaliar_fold(estimador, X, y, idx_treino, idx_val, aumento=None):
+    """Treina um clone em um fold e retorna a acurácia de validação"""
+    modelo = clone(estimador)
+    ajustar(modelo, X[idx_treino], y[idx_treino], aumento)
+    return modelo.score(X[idx_val], y[idx_val])
+
+
+def medir_latencia(modelo, X, repeticoes=200):
+    """Mediana e p95 (ms) de uma predição com uma única amostra"""
+    amostras = X[np.arange(repeticoes) % len(X)]
+    tempos = np.empty(repeticoes)
+    modelo.predict(amostras[:1])  # aquecimento
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo.predict(amostras[i:i + 1])
+        tempos[i] = time.perf_counter() - inicio
+    return float(np.median(tempos) * 1000), float(np.percentile(tempos, 95) * 1000)
+
+
+def definir_n_jobs(modelo, n_jobs):
+    """Ajusta o paralelismo dos modelos que o usam (florestas e KNN)
+
+    Para servir, use n_jobs=1: com uma amostra por vez o pool só atrasa.
+    """
+    if isinstance(modelo, Pipeline):
+        definir_n_jobs(modelo.steps[-1][1], n_jobs)
+    elif isinstance(modelo, (RandomForestClassifier, ExtraTreesClassifier, KNeighborsClassifier)):
+        modelo.set_params(n_jobs=n_jobs)
+    return modelo
+
+
+def buscar_modelo(X, y, candidatos, folds=5, n_jobs=-1, tolerancia=0.005, precisao_alvo=0.95,
+                  aumento=None):
+    """Validação cruzada paralela de todos os candidatos
+
+    Todos os pares (candidato, fold) rodam no mesmo pool de processos.
+    Entre os candidatos a até `tolerancia` da melhor acurácia, vence o
+    de menor latência. Retorna o ranking ordenado (melhor primeiro).
+    Os limiares de confiança por classe vêm do mesmo conjunto de validação.
+    Com `aumento` (AumentoLandmarks), só os dados de treino são aumentados.
+    """
+    X_treino, X_val, y_treino, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    divisoes = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+                    .split(X_treino, y_treino))
+
+    print(f"🔎 Avaliando {len(candidatos)} candidatos × {folds} folds em paralelo...")
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_avaliar_fold)(estimador, X_treino, y_treino, idx_t, idx_v, aumento)
+        for _, estimador in candidatos
+        for idx_t, idx_v in divisoes
+    )
+    scores = np.array(scores).reshape(len(candidatos), folds)
+
+    def _ajustar(estimador):
+        modelo = definir_n_jobs(clone(estimador), -1)
+        ajustar(modelo, X_treino, y_treino, aumento)
+        return definir_n_jobs(modelo, 1)
+
+    ranking = []
+    for (nome, estimador), score in zip(candidatos, scores):
+        modelo = _ajustar(estimador)
+        latencia, latencia_p95 = medir_latencia(modelo, X_val)
+        pred_val = modelo.predict(X_val)
+        ranking.append({
+            'nome': nome,
+            'estimador': estimador,
+            'cv_accuracy': float(score.mean()),
+            'cv_std': float(score.std()),
+            'test_accuracy': float(np.mean(pred_val == y_val)),
+            'latencia_ms': latencia,
+            'latencia_p95_ms': latencia_p95,
+            'confusion_matrix': matriz_confusao(y_val, pred_val, modelo.classes_),
+            'limiares': (aprender_limiares(modelo.predict_proba(X_val), y_val, modelo.classes_,
+                                           precisao_alvo)
+                         if hasattr(modelo, 'predict_proba') else {}),
+        })
+
+    limite = max(r['cv_accuracy'] for r in ranking) - tolerancia
+
+    def _chave(r):
+        if r['cv_accuracy'] >= limite:
+            return (0, r['latencia_ms'])
+        return (1, -r['cv_accuracy'])
+
+    ranking.sort(key=_chave)
+    return ranking
+
+
+def mostrar_ranking(ranking):
+    """Imprime a tabela de candidatos"""
+    print("\n🏆 Ranking (acurácia CV, depois latência de 1 amostra):")
+    print(f"{'#':>2}  {'Modelo':<36} {'CV':>8} {'±':>6} {'Teste':>8} {'ms':>8} {'p95':>8}")
+    for i, r in enumerate(ranking, 1):
+        print(f"{i:>2}  {r['nome']:<36} {r['cv_accuracy']:>8.2%} {r['cv_std']:>6.2%} "
+              f"{r['test_accuracy']:>8.2%} {r['latencia_ms']:>8.3f} {r['latencia_p95_ms']:>8.3f}")
+
+
+def salvar_modelo(modelo, model_info, caminho_modelo=CAMINHO_MODELO, caminho_info=CAMINHO_INFO):
+    """Salva modelo e model_info nos caminhos que o app procura"""
+    pasta = os.path.dirname(caminho_modelo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho_modelo, 'wb') as f:
+        pickle.dump(modelo, f)
+    with open(caminho_info, 'wb') as f:
+        pickle.dump(model_info, f)
+    print(f"✅ Modelo salvo em {caminho_modelo}")
+    print(f"📋 Informações salvas em {caminho_info}")
+
+
+def treinar(caminho_dataset=DATASET_PADRAO, folds=5, rapido=False, tolerancia=0.005,
+            caminho_modelo=CAMINHO_MODELO, caminho_info=CAMINHO_INFO, precisao_alvo=0.95,
+            modo_features='pontos', aumento=None):
+    """Busca o melhor modelo, re-treina com todo o dataset e exporta"""
+    inicio = time.perf_counter()
+    X, y = DatasetStore(caminho_dataset).carregar()
+    if len(X) == 0:
+        print(f"❌ Dataset vazio ou inexistente: {caminho_dataset}")
+        return None
+
+    print(f"📊 Dados: {len(X)} amostras, {X.shape[1]} features "
+          f"({X.nbytes / 1e6:.1f} MB em float32)")
+    print(f"🏷️ Classes: {sorted(set(y))}")
+    if modo_features != 'pontos' and X.shape[1] != 63:
+        print(f"❌ O modo de features '{modo_features}' só existe para uma mão (63 features)")
+        return None
+    if aumento is not None and X.shape[1] != 63:
+        print("⚠️  Aumento de dados só existe para uma mão (63 features): desligado")
+        aumento = None
+    if aumento is not None:
+        print(f"🔁 Aumento de dados: {aumento.multiplicador} versões do dataset por floresta "
+              f"(semente {aumento.semente})")
+    candidatos = [(nome if modo_features == 'pontos' else f"{nome} [{modo_features}]",
+                   modelo_do_modo(estimador, modo_features))
+                  for nome, estimador in gerar_candidatos(rapido)]
+
+    ranking = buscar_modelo(X, y, candidatos, folds=folds, tolerancia=tolerancia,
+                            precisao_alvo=precisao_alvo, aumento=aumento)
+    mostrar_ranking(ranking)
+
+    melhor = ranking[0]
+    print(f"\n🧠 Re-treinando {melhor['nome']} com todas as amostras...")
+    modelo = definir_n_jobs(clone(melhor['estimador']), -1)
+    ajustar(modelo, X, y, aumento)
+    definir_n_jobs(modelo, 1)
+
+    model_info = {
+        'classes': modelo.classes_.tolist(),
+        'n_features': X.shape[1],
+        'train_accuracy': float(modelo.score(X, y)),
+        'test_accuracy': melhor['test_accuracy'],
+        'cv_accuracy': melhor['cv_accuracy'],
+        'n_samples': len(X),
+        'vocabulary_type': 'expanded',
+        'model_name': melhor['nome'],
+        'params': (modelo.steps[-1][1] if isinstance(modelo, Pipeline) else modelo).get_params(),
+        'latencia_ms': melhor['latencia_ms'],
+        'confusion_matrix': melhor['confusion_matrix'],
+        'limiares': melhor['limiares'],
+        'ranking': [{k: v for k, v in r.items()
+                     if k not in ('estimador', 'confusion_matrix', 'limiares')}
+                    for r in ranking],
+        'aumento': aumento.parametros() if usa_aumento(modelo, aumento) else None,
+        **info_do_modo(modo_features),
+    }
+    salvar_modelo(modelo, model_info, caminho_modelo, caminho_info)
+    print(f"⏱️ Treinamento concluído em {time.perf_counter() - inicio:.1f}s")
+    return modelo, model_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treinamento com busca de hiperparâmetros")
+    parser.add_argument('--duas-maos', action='store_true',
+                        help="Treina o classificador de duas mãos (dataset e arquivos próprios)")
+    parser.add_argument('--escola',
+                        help="Salva o modelo da escola em modelos/escolas/<escola>/ (multi-escola)")
+    parser.add_argument('--candidato', action='store_true',
+                        help=f"Salva como candidato ({CAMINHO_MODELO_CANDIDATO}) para avaliação em sombra")
+    parser.add_argument('--features', choices=MODOS_FEATURES, default='pontos',
+                        help="Features do modelo: pontos (xyz) ou invariante (invariantes.py)")
+    parser.add_argument('--aumento', type=int, default=1,
+                        help="Versões aumentadas do dataset por floresta (1 = sem aumento)")
+    parser.add_argument('--semente', type=int, default=42, help="Semente do aumento de dados")
+    parser.add_argument('--dataset', help=f"CSV de amostras (padrão: {DATASET_PADRAO})")
+    parser.add_argument('--folds', type=int, default=5, help="Folds da validação cruzada")
+    parser.add_argument('--rapido', action='store_true', help="Grade reduzida de candidatos")
+    parser.add_argument('--tolerancia', type=float, default=0.005,
+                        help="Perda de acurácia aceita em troca de menor latência")
+    parser.add_argument('--precisao-alvo', type=float, default=0.95,
+                        help="Precisão por classe usada para aprender os limiares de confiança")
+    parser.add_argument('--modelo', help=f"Arquivo do modelo exportado (padrão: {CAMINHO_MODELO})")
+    parser.add_argument('--info', help=f"Arquivo do model_info exportado (padrão: {CAMINHO_INFO})")
+    args = parser.parse_args()
+
+    if args.duas_maos:
+        padroes = (DATASET_DUAS_MAOS, CAMINHO_MODELO_DUAS_MAOS, CAMINHO_INFO_DUAS_MAOS)
+    elif args.escola:
+        padroes = (DATASET_PADRAO,) + caminhos_escola(args.escola)
+    elif args.candidato:
+        padroes = (DATASET_PADRAO, CAMINHO_MODELO_CANDIDATO, CAMINHO_INFO_CANDIDATO)
+    else:
+        padroes = (DATASET_PADRAO, CAMINHO_MODELO, CAMINHO_INFO)
+    dataset, caminho_modelo, caminho_info = (valor or padrao for valor, padrao in
+                                             zip((args.dataset, args.modelo, args.info), padroes))
+
+    # Mãos já canonizadas no modo invariante: espelhar não acrescenta nada
+    aumento = (AumentoLandmarks(args.aumento, semente=args.semente,
+                                espelhar=0.0 if info_do_modo(args.features)['canonizar_mao'] else 0.5)
+               if args.aumento > 1 else None)
+
+    print("🚀 TraduLibras - Treinamento com Busca de Hiperparâmetros")
+    treinar(dataset, args.folds, args.rapido, args.tolerancia, caminho_modelo, caminho_info,
+            args.precisao_alvo, args.features, aumento)
+
+
+if __name__ == "__main__":
+    main()
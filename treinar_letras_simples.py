@@ -3,9 +3,15 @@ import mediapipe as mp
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
+import argparse
 import pickle
 import os
 
+from aumento import AumentoLandmarks, ajustar
+from autocaptura import TAXA_PADRAO, CapturaAutomatica, desenhar_progresso
+from manutencao_dataset import RAIO_PADRAO
+from features import process_landmarks
+
 # Frases para treinar
 FRASES = [
     "Oi Conselho Britanico",
@@ -20,6 +26,8 @@ print(f"Total de letras únicas: {len(letras)}")
 
 # Configurações
 AMOSTRAS_POR_LETRA = 30  # Número de amostras para cada letra
+# Com tão poucas amostras, cada floresta vê versões giradas/esticadas/espelhadas delas
+MULTIPLICADOR_AUMENTO = 5
 
 # Inicializa MediaPipe Hands
 mp_hands = mp.solutions.hands
@@ -31,21 +39,24 @@ hands = mp_hands.Hands(
 mp_drawing = mp.solutions.drawing_utils
 
 def extrair_caracteristicas(landmarks):
-    """Extrai as características dos pontos de referência da mão"""
-    p0 = landmarks.landmark[0]  # Ponto de referência do pulso
-    dados = []
-    for lm in landmarks.landmark:
-        dados.extend([
-            lm.x - p0.x,
-            lm.y - p0.y,
-            lm.z - p0.z
-        ])
-    return dados
+    """Extrai as características dos pontos de referência da mão
+
+    Mesma normalização do servidor (relativa ao pulso e pelo tamanho da
+    mão), que é também a que o aumento de dados reproduz.
+    """
+    caracteristicas = process_landmarks(landmarks)
+    return [] if caracteristicas is None else list(caracteristicas)
+
+def coletar_dados(automatico=False, taxa=TAXA_PADRAO, diversidade=RAIO_PADRAO):
+    """Coleta dados para todas as letras necessárias
 
-def coletar_dados():
-    """Coleta dados para todas as letras necessárias"""
+    No modo automático (autocaptura.py) não há tecla por amostra: frames
+    com a mão parada e pose nova viram amostra.
+    """
     dados_treinamento = []
     labels = []
+    progresso = {letra: 0 for letra in sorted(letras)}
+    captura = CapturaAutomatica(taxa, diversidade) if automatico else None
     
     # Criar diretório para o modelo se não existir
     if not os.path.exists('modelos'):
@@ -57,7 +68,11 @@ def coletar_dados():
         amostras_coletadas = 0
         print(f"\n=== Coletando dados para a letra '{letra}' ===")
         print(f"Objetivo: {AMOSTRAS_POR_LETRA} amostras")
-        print("Pressione 'ESPAÇO' para capturar uma amostra")
+        if automatico:
+            print("Captura automática: segure a mão parada e varie a pose devagar")
+            captura.reiniciar()
+        else:
+            print("Pressione 'ESPAÇO' para capturar uma amostra")
         print("Pressione 'ESC' para pular esta letra")
         
         while amostras_coletadas < AMOSTRAS_POR_LETRA:
@@ -72,6 +87,15 @@ def coletar_dados():
             rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = hands.process(rgb)
             
+            if automatico:
+                caracteristicas = (extrair_caracteristicas(results.multi_hand_landmarks[0])
+                                   if results.multi_hand_landmarks else [])
+                if captura.oferecer(caracteristicas if len(caracteristicas) == 63 else None):
+                    dados_treinamento.append(caracteristicas)
+                    labels.append(letra)
+                    amostras_coletadas += 1
+                    progresso[letra] += 1
+            
             # Desenha as informações na tela
             cv2.putText(frame, f"Letra: {letra}", (10, 50),
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
@@ -82,13 +106,16 @@ def coletar_dados():
             if results.multi_hand_landmarks:
                 for hand_landmarks in results.multi_hand_landmarks:
                     mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            desenhar_progresso(frame, progresso, AMOSTRAS_POR_LETRA, letra,
+                               captura.estado if automatico else None,
+                               captura.taxa_atual() if automatico else None)
             
             cv2.imshow('Coleta de Dados', frame)
             
             key = cv2.waitKey(1)
             if key == 27:  # ESC
                 break
-            elif key == 32 and results.multi_hand_landmarks:  # ESPAÇO
+            elif key == 32 and results.multi_hand_landmarks and not automatico:  # ESPAÇO
                 # Extrai características e salva
                 for hand_landmarks in results.multi_hand_landmarks:
                     caracteristicas = extrair_caracteristicas(hand_landmarks)
@@ -96,6 +123,7 @@ def coletar_dados():
                         dados_treinamento.append(caracteristicas)
                         labels.append(letra)
                         amostras_coletadas += 1
+                        progresso[letra] += 1
                         print(f"Amostra {amostras_coletadas} coletada!")
             
             if amostras_coletadas >= AMOSTRAS_POR_LETRA:
@@ -117,8 +145,9 @@ def treinar_modelo(X, y):
     )
     
     # Cria e treina o modelo
-    modelo = RandomForestClassifier(n_estimators=100, random_state=42)
-    modelo.fit(X_train, y_train)
+    modelo = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    ajustar(modelo, X_train, y_train, AumentoLandmarks(MULTIPLICADOR_AUMENTO))
+    modelo.set_params(n_jobs=1)
     
     # Avalia o modelo
     acuracia = modelo.score(X_test, y_test)
@@ -127,6 +156,15 @@ def treinar_modelo(X, y):
     return modelo
 
 def main():
+    parser = argparse.ArgumentParser(description="Coleta e treino das letras das frases")
+    parser.add_argument('--automatico', action='store_true',
+                        help="Captura sem tecla: mão parada e pose nova viram amostra")
+    parser.add_argument('--taxa', type=float, default=TAXA_PADRAO,
+                        help="Máximo de amostras por segundo na captura automática")
+    parser.add_argument('--diversidade', type=float, default=RAIO_PADRAO,
+                        help="Distância mínima entre amostras da mesma letra na captura automática")
+    args = parser.parse_args()
+
     print("=== Treinamento de Reconhecimento de Letras ===")
     print("\nFrases de referência:")
     for frase in FRASES:
@@ -135,7 +173,7 @@ def main():
     input("\nPressione ENTER para começar a coleta de dados...")
     
     # Coleta os dados
-    X, y = coletar_dados()
+    X, y = coletar_dados(args.automatico, args.taxa, args.diversidade)
     
     if len(X) > 0:
         # Treina o modelo
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Vocabulário instantâneo do TraduLibras: índice de vizinhos mais próximos
+
+Acrescentar uma letra ou sinal ao modelo exige coletar centenas de
+amostras por classe e re-treinar a floresta. O IndiceVizinhos guarda
+algumas amostras rotuladas (vetores de features já normalizados, ver
+features.normalizar_pontos) adicionadas pelo admin com o servidor
+rodando, e o ClassificadorComVizinhos as serve na hora, junto do modelo
+principal. Só votam amostras de letras com pelo menos
+`minimo_por_classe` amostras no índice, a até `raio` do frame; o voto
+(peso 1/distância) entra na distribuição com peso igual à fração dos k
+vizinhos que votou, e o resto vem do modelo principal. Um frame no meio
+de um grupo de amostras (os k vizinhos perto) é resolvido só pelo índice
+e o modelo principal nem roda; um frame perto de uma ou duas amostras
+mistura as duas distribuições, e o limiar de confiança ainda pode
+rejeitá-lo.
+
+O índice é limitado (capacidade total e por classe; sai a amostra mais
+antiga da letra com mais amostras) e a busca é exata e vetorizada: as distâncias de
+um lote inteiro de consultas saem de um único produto de matrizes.
+Escritas trocam os arrays inteiros, então consultas não esperam lock.
+
+Depois, incorporar_amostras() acrescenta ao dataset as amostras das
+classes com exemplos suficientes e re-treina o modelo
+(treinamento.treinar); as amostras incorporadas ficam marcadas e saem do
+índice quando o modelo servido passa a reconhecê-las.
+
+Uso:
+    python vizinhos.py listar
+    # Com o servidor parado (com ele rodando, use /admin/vocabulario)
+    python vizinhos.py incorporar --dataset gestos_libras.csv
+"""
+
+import argparse
+import copy
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from dataset import DATASET_PADRAO, DatasetStore
+from features import N_FEATURES
+
+CAMINHO_INDICE = 'modelos/indice_vizinhos.npz'
+# Classes com menos amostras ficam só no índice (a validação cruzada precisa de exemplos)
+MINIMO_PARA_INCORPORAR = 10
+# Amostras de uma letra no índice antes de ela começar a receber frames
+MINIMO_PARA_SERVIR = 5
+# Raio usado enquanto o índice não tem duas amostras de uma mesma classe
+# (um décimo da mão normalizada: só frames quase iguais a uma amostra)
+RAIO_PADRAO = 0.1
+
+
+class IndiceVizinhos:
+    """Amostras rotuladas em memória com busca exata dos k vizinhos mais próximos"""
+
+    def __init__(self, n_features=N_FEATURES, capacidade=2000, por_classe=200, k=5,
+                 fator_raio=2.0, caminho=None, minimo_por_classe=MINIMO_PARA_SERVIR):
+        self.n_features = n_features
+        self.capacidade = int(capacidade)
+        self.por_classe = int(por_classe)
+        self.k = int(k)
+        self.minimo_por_classe = int(minimo_por_classe)
+        self.fator_raio = float(fator_raio)
+        self.caminho = caminho
+        # (X, rótulos, ids, normas², raio, letras servidas): trocado inteiro a cada escrita
+        self._dados = (np.empty((0, n_features), dtype=np.float32), np.empty(0, dtype=str),
+                       np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), RAIO_PADRAO,
+                       np.empty(0, dtype=str))
+        self._lock = threading.Lock()
+        self._proximo_id = 0
+        # ids já gravados no dataset (não entram de novo numa próxima incorporação)
+        self.incorporadas = set()
+        self.descartadas = 0
+        self.atendidas = 0  # frames resolvidos só pelo índice
+
+    def __len__(self):
+        return len(self._dados[0])
+
+    @property
+    def raio(self):
+        return self._dados[4]
+
+    @property
+    def servidas(self):
+        """Letras com amostras suficientes para receber frames"""
+        return self._dados[5]
+
+    def classes(self):
+        return sorted(set(self._dados[1].tolist()))
+
+    def amostras(self):
+        """(X, rótulos, ids) das amostras atuais"""
+        X, y, ids = self._dados[:3]
+        return X, y, ids
+
+    def adicionar(self, letra, X):
+        """Acrescenta amostras de uma letra; retorna quantas entraram"""
+        letra = str(letra or '').strip()
+        if not letra:
+            raise ValueError("Letra vazia")
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None]
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Amostras com {X.shape[-1]} features, esperado {self.n_features}")
+        if not len(X):
+            return 0
+        if not np.isfinite(X).all():
+            raise ValueError("Amostras com valores não finitos")
+
+        with self._lock:
+            X_atual, y_atual, ids_atual = self._dados[:3]
+            ids = np.arange(self._proximo_id, self._proximo_id + len(X), dtype=np.int64)
+            self._proximo_id += len(X)
+            X_novo = np.concatenate([X_atual, X])
+            y_novo = np.concatenate([y_atual.astype(object), np.full(len(X), letra, dtype=object)])
+            ids_novo = np.concatenate([ids_atual, ids])
+
+            # Acima dos limites saem as mais antigas da letra e, depois, as
+            # mais antigas da letra com mais amostras (letras raras ficam)
+            manter = np.ones(len(X_novo), dtype=bool)
+            da_letra = np.flatnonzero(y_novo == letra)
+            manter[da_letra[:max(0, len(da_letra) - self.por_classe)]] = False
+            for _ in range(int(manter.sum()) - self.capacidade):
+                maior = Counter(y_novo[manter].tolist()).most_common(1)[0][0]
+                manter[np.flatnonzero(manter & (y_novo == maior))[0]] = False
+            self.descartadas += int((~manter).sum())
+            self._trocar(X_novo[manter], y_novo[manter], ids_novo[manter])
+        self.salvar()
+        return len(X)
+
+    def remover(self, letra=None, ids=None):
+        """Remove as amostras de uma letra ou com os ids dados; retorna quantas saíram"""
+        with self._lock:
+            X, y, atuais = self._dados[:3]
+            sair = np.zeros(len(X), dtype=bool)
+            if letra is not None:
+                sair |= y == str(letra)
+            if ids is not None:
+                sair |= np.isin(atuais, np.asarray(ids, dtype=np.int64))
+            if sair.any():
+                self._trocar(X[~sair], y[~sair], atuais[~sair])
+        if sair.any():
+            self.salvar()
+        return int(sair.sum())
+
+    def marcar_incorporadas(self, ids):
+        with self._lock:
+            self.incorporadas |= {int(i) for i in ids}
+        self.salvar()
+
+    def _trocar(self, X, y, ids):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=str)
+        self.incorporadas &= set(ids.tolist())
+        letras, contagens = np.unique(y, return_counts=True)
+        self._dados = (X, y, ids, np.einsum('ij,ij->i', X, X), self._calcular_raio(X, y),
+                       letras[contagens >= self.minimo_por_classe])
+
+    def _calcular_raio(self, X, y):
+        """`fator_raio` × p95 da distância de cada amostra à vizinha mais próxima da mesma letra"""
+        distancias = []
+        for letra in set(y.tolist()):
+            grupo = X[y == letra]
+            if len(grupo) < 2:
+                continue
+            d2 = _distancias2(grupo, grupo, np.einsum('ij,ij->i', grupo, grupo))
+            np.fill_diagonal(d2, np.inf)
+            distancias.append(np.sqrt(d2.min(axis=1)))
+        if not distancias:
+            return RAIO_PADRAO
+        return float(self.fator_raio * np.percentile(np.concatenate(distancias), 95))
+
+    def kneighbors(self, X, k=None):
+        """(distâncias, rótulos) dos k vizinhos de cada linha, do mais próximo ao mais distante"""
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features)
+        amostras, rotulos, _, normas = self._dados[:4]
+        k = min(k or self.k, len(amostras))
+        if k == 0:
+            return np.empty((len(X), 0)), np.empty((len(X), 0), dtype=str)
+        d2 = _distancias2(X, amostras, normas)
+        if k < len(amostras):
+            vizinhos = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        else:
+            vizinhos = np.broadcast_to(np.arange(len(amostras)), d2.shape)
+        ordem = np.take_along_axis(d2, vizinhos, axis=1).argsort(axis=1)
+        vizinhos = np.take_along_axis(vizinhos, ordem, axis=1)
+        return np.sqrt(np.take_along_axis(d2, vizinhos, axis=1)), rotulos[vizinhos]
+
+    def salvar(self):
+        """Grava as amostras em `caminho` (arquivo temporário e troca)"""
+        if not self.caminho:
+            return
+        X, y, ids = self.amostras()
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        temporario = f"{self.caminho}.{os.getpid()}.tmp.npz"
+        np.savez(temporario, X=X, y=y, ids=ids, proximo_id=self._proximo_id,
+                 incorporadas=np.array(sorted(self.incorporadas), dtype=np.int64))
+        os.replace(temporario, self.caminho)
+
+    @classmethod
+    def carregar(cls, caminho=CAMINHO_INDICE, **opcoes):
+        """Índice com as amostras gravadas em `caminho` (vazio se não existir)"""
+        indice = cls(caminho=caminho, **opcoes)
+        if os.path.exists(caminho):
+            with np.load(caminho) as dados:
+                X, y, ids = dados['X'], dados['y'], dados['ids']
+                indice._proximo_id = int(dados['proximo_id'])
+                if 'incorporadas' in dados.files:
+                    indice.incorporadas = set(dados['incorporadas'].tolist())
+            if X.shape[1] != indice.n_features:
+                raise ValueError(f"Índice com {X.shape[1]} features, esperado {indice.n_features}")
+            indice._trocar(X, y, ids)
+        return indice
+
+    def estatisticas(self):
+        _, y, _, _, raio, servidas = self._dados
+        return {
+            'amostras': len(y),
+            'capacidade': self.capacidade,
+            'por_classe': self.por_classe,
+            'k': self.k,
+            'raio': round(raio, 4),
+            'minimo_por_classe': self.minimo_por_classe,
+            'classes': dict(sorted(Counter(y.tolist()).items())),
+            'servidas': servidas.tolist(),
+            'incorporadas': len(self.incorporadas),
+            'descartadas': self.descartadas,
+            'atendidas': self.atendidas,
+        }
+
+
+def _distancias2(X, amostras, normas):
+    """Distâncias euclidianas² de cada linha de X a cada amostra (||x||² - 2x·a + ||a||²)"""
+    d2 = np.einsum('ij,ij->i', X, X)[:, None] - 2.0 * (X @ amostras.T) + normas[None, :]
+    return np.maximum(d2, 0.0, out=d2)
+
+
+class ClassificadorComVizinhos:
+    """Modelo principal + IndiceVizinhos com a interface do sklearn
+
+    As classes são a união das do modelo e as do índice no momento da
+    criação; com amostras de uma letra nova, crie outro classificador.
+    Vetores com outro número de features (duas mãos) vão direto ao modelo.
+    """
+
+    def __init__(self, principal, indice, raio=None):
+        self.principal = principal
+        self.indice = indice
+        self.raio = raio
+        # Frames resolvidos entram em indice.atendidas (False nas cópias da sombra)
+        self.contar = True
+        self.classes_ = np.array(sorted({str(c) for c in principal.classes_} | set(indice.classes())),
+                                 dtype=object)
+        self.n_features_in_ = getattr(principal, 'n_features_in_', None)
+        self._nomes = self.classes_.astype(str)
+        self._indices = np.searchsorted(self._nomes, [str(c) for c in principal.classes_])
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        probabilidades = np.zeros((len(X), len(self.classes_)))
+        pesos = np.zeros(len(X))
+        if X.shape[1] == self.indice.n_features and len(self.indice):
+            pesos = self._votar(X, probabilidades)
+        resto = pesos < 1
+        if resto.any():
+            probabilidades[np.ix_(resto, self._indices)] += (
+                (1 - pesos[resto, None]) * self.principal.predict_proba(X[resto]))
+        return probabilidades
+
+    def _votar(self, X, probabilidades):
+        """Grava o voto dos vizinhos (já ponderado) e retorna o peso do voto em cada linha
+
+        Peso = fração dos k vizinhos a até `raio` e de letras servidas; o
+        voto de cada um vale 1/distância.
+        """
+        distancias, rotulos = self.indice.kneighbors(X)
+        raio = self.raio or self.indice.raio
+        posicoes = np.minimum(np.searchsorted(self._nomes, rotulos), len(self._nomes) - 1)
+        # Letras adicionadas depois da criação deste classificador, ou com
+        # poucas amostras, não votam
+        perto = ((distancias <= raio) & (self._nomes[posicoes] == rotulos)
+                 & np.isin(rotulos, self.indice.servidas))
+        pesos = perto.sum(axis=1) / max(self.indice.k, 1)
+        votaram = pesos > 0
+        if votaram.any():
+            linhas, colunas = np.nonzero(perto)
+            votos = np.zeros_like(probabilidades)
+            np.add.at(votos, (linhas, posicoes[linhas, colunas]),
+                      1.0 / (distancias[linhas, colunas] + 1e-6))
+            probabilidades[votaram] = (pesos[votaram, None] * votos[votaram]
+                                       / votos[votaram].sum(axis=1, keepdims=True))
+            if self.contar:
+                self.indice.atendidas += int((pesos >= 1).sum())
+        return pesos
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def sem_contadores(self):
+        """Cópia para predições fora do tráfego (sombra): não mexe nos contadores"""
+        copia = copy.copy(self)
+        copia.contar = False
+        if hasattr(self.principal, 'sem_contadores'):
+            copia.principal = self.principal.sem_contadores()
+        return copia
+
+
+def combinar_info_vizinhos(classificador, info):
+    """model_info do ClassificadorComVizinhos
+
+    Letras novas entram sem limiar aprendido (vale o limiar padrão) e com
+    linhas zeradas na matriz de confusão (o decodificador as trata como
+    sem confusões).
+    """
+    classes = [str(c) for c in classificador.classes_]
+    posicao = {c: i for i, c in enumerate(classes)}
+    classes_info = [str(c) for c in info.get('classes', [])]
+    matriz = info.get('confusion_matrix')
+    confusao = None
+    if matriz and len(matriz) == len(classes_info) and all(c in posicao for c in classes_info):
+        confusao = np.zeros((len(classes), len(classes)))
+        indices = [posicao[c] for c in classes_info]
+        confusao[np.ix_(indices, indices)] = np.asarray(matriz)
+    return dict(info, classes=classes,
+                confusion_matrix=confusao.tolist() if confusao is not None else None)
+
+
+class CapturaAmostras:
+    """Guarda os próximos vetores do camera_worker como amostras de uma letra
+
+    Frames seguidos são quase iguais: só um a cada `intervalo` segundos entra.
+    """
+
+    def __init__(self, letra, quantidade=30, intervalo=0.1):
+        self.letra = str(letra)
+        self.quantidade = int(quantidade)
+        self.intervalo = float(intervalo)
+        self.amostras = []
+        self.inicio = time.time()
+        self._ultima = float('-inf')
+
+    @property
+    def completa(self):
+        return len(self.amostras) >= self.quantidade
+
+    def oferecer(self, features, agora=None):
+        """Retorna True quando a captura acabou de se completar"""
+        agora = time.monotonic() if agora is None else agora
+        if self.completa or len(features) != N_FEATURES or agora - self._ultima < self.intervalo:
+            return False
+        self._ultima = agora
+        self.amostras.append(np.asarray(features, dtype=np.float32))
+        return self.completa
+
+    def estado(self):
+        return {'letra': self.letra, 'capturadas': len(self.amostras),
+                'quantidade': self.quantidade, 'desde': self.inicio}
+
+
+def incorporar_amostras(indice, caminho_dataset=DATASET_PADRAO, minimo=MINIMO_PARA_INCORPORAR,
+                        **opcoes_treino):
+    """Acrescenta ao dataset as amostras do índice e re-treina o modelo
+
+    Só entram as letras com pelo menos `minimo` amostras ainda fora do
+    dataset. As amostras incorporadas ficam marcadas no índice (saem dele
+    quando o modelo servido passa a reconhecê-las). Retorna um resumo ou
+    None se nenhuma letra tinha amostras suficientes. `opcoes_treino` vão
+    para treinamento.treinar.
+    """
+    from treinamento import treinar
+
+    X, y, ids = indice.amostras()
+    novas = ~np.isin(ids, np.array(sorted(indice.incorporadas), dtype=np.int64))
+    X, y, ids = X[novas], y[novas], ids[novas]
+    contagem = Counter(y.tolist())
+    letras = sorted(letra for letra, n in contagem.items() if n >= minimo)
+    if not letras:
+        print(f"⚠️  Nenhuma letra do índice tem {minimo} amostras para incorporar")
+        return None
+    selecionadas = np.isin(y, letras)
+
+    store = DatasetStore(caminho_dataset)
+    if store.existe() and len(store.colunas()) != X.shape[1]:
+        raise ValueError(f"Dataset {caminho_dataset} tem {len(store.colunas())} features, "
+                         f"o índice tem {X.shape[1]}")
+    store.adicionar(y[selecionadas], X[selecionadas])
+    indice.marcar_incorporadas(ids[selecionadas])
+    print(f"📥 {int(selecionadas.sum())} amostras do índice adicionadas a {caminho_dataset}: "
+          f"{', '.join(f'{letra} ({contagem[letra]})' for letra in letras)}")
+
+    opcoes_treino.setdefault('rapido', True)
+    resultado = treinar(caminho_dataset, **opcoes_treino)
+    if resultado is None:
+        raise RuntimeError("Re-treinamento falhou")
+    modelo, _ = resultado
+    return {
+        'letras': letras,
+        'amostras': int(selecionadas.sum()),
+        'classes_modelo': [str(c) for c in modelo.classes_],
+        'data': time.time(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de vizinhos do vocabulário instantâneo")
+    parser.add_argument('--indice', default=CAMINHO_INDICE, help="Arquivo do índice")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    sub.add_parser('listar', help="Amostras por letra")
+
+    p_incorporar = sub.add_parser('incorporar', help="Acrescenta ao dataset e re-treina")
+    p_incorporar.add_argument('--dataset', default=DATASET_PADRAO, help="CSV de amostras")
+    p_incorporar.add_argument('--minimo', type=int, default=MINIMO_PARA_INCORPORAR,
+                              help="Amostras por letra para incorporar")
+    p_incorporar.add_argument('--completo', action='store_true',
+                              help="Grade completa de candidatos (padrão: reduzida)")
+    args = parser.parse_args()
+
+    indice = IndiceVizinhos.carregar(args.indice)
+    if args.comando == 'listar':
+        estatisticas = indice.estatisticas()
+        print(f"🗂️ {estatisticas['amostras']} amostras (raio {estatisticas['raio']:.3f})")
+        for letra, n in estatisticas['classes'].items():
+            espera = ("" if letra in estatisticas['servidas']
+                      else f" (recebe frames com {estatisticas['minimo_por_classe']})")
+            print(f"   {letra}: {n}{espera}")
+        return
+
+    resumo = incorporar_amostras(indice, args.dataset, args.minimo, rapido=not args.completo)
+    if resumo is not None:
+        indice.remover(ids=sorted(indice.incorporadas))
+        print(f"✅ Letras incorporadas ao modelo: {', '.join(resumo['letras'])}")
+
+
+if __name__ == "__main__":
+    main()